@@ -0,0 +1,197 @@
+"""
+Compare read throughput of the WSGI deployment (gunicorn sync workers) with
+the ASGI one (gunicorn + uvicorn workers, async list/retrieve views).
+
+    python -m benchmarks.asgi_reads --workers 2 --concurrency 64 --duration 20
+
+Both servers run with the same number of workers so their memory is
+comparable; the resident set size of each server is reported next to its
+requests per second and latency percentiles. Needs gunicorn and uvicorn
+(requirements/prod.txt) and a migrated database; a seller with sales and a
+token is created for the run and deleted afterwards.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+
+SERVERS = {
+    "wsgi": ["config.wsgi", "-k", "sync"],
+    "asgi": ["config.asgi", "-k", "uvicorn.workers.UvicornWorker"],
+}
+
+
+def seed(sales):
+    from django.contrib.auth import get_user_model
+    from model_bakery import baker
+    from rest_framework.authtoken.models import Token
+    from store.models import Sale
+
+    User = get_user_model()
+    user = User.objects.create_user(email=f"bench{time.time_ns()}@example.com")
+    baker.make(Sale, seller=user.seller, _quantity=sales)
+    token = Token.objects.create(user=user)
+    return user, token.key
+
+
+def get_paths(user):
+    seller_id, credit_id = user.seller.id, user.seller.credit.id
+    return [
+        f"/store/sellers/{seller_id}/",
+        f"/store/sellers/{seller_id}/sales/",
+        f"/store/sellers/{seller_id}/deposits/",
+        f"/store/credits/{credit_id}/",
+    ]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on port {port}.")
+
+
+def get_rss(pid):
+    pids = [pid]
+    children = f"/proc/{pid}/task/{pid}/children"
+    if os.path.exists(children):
+        with open(children) as file:
+            pids += [int(child) for child in file.read().split()]
+
+    total = 0
+    for process in pids:
+        with open(f"/proc/{process}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+    return total / 1024
+
+
+async def client(port, paths, token, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    requests = [
+        (
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Authorization: Token {token}\r\n\r\n"
+        ).encode()
+        for path in paths
+    ]
+
+    index = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        writer.write(requests[index % len(requests)])
+        index += 1
+
+        status = await reader.readline()
+        length = 0
+        keep_alive = True
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            if name.lower() == "connection" and value.strip().lower() == "close":
+                keep_alive = False
+        await reader.readexactly(length)
+
+        # Sync workers close the connection after every response.
+        if not keep_alive:
+            writer.close()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        latencies.append(time.perf_counter() - started)
+        if b" 200 " not in status:
+            errors.append(status)
+
+    writer.close()
+
+
+async def load(port, paths, token, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *[
+            client(port, paths, token, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ]
+    )
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(name, args, paths, token):
+    port = args.port
+    env = {**os.environ, "ASYNC_READS": "1" if name == "asgi" else "0"}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *SERVERS[name],
+            "--workers",
+            str(args.workers),
+            "--bind",
+            f"127.0.0.1:{port}",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        asyncio.run(load(port, paths, token, args.concurrency, 2))
+        latencies, errors = asyncio.run(
+            load(port, paths, token, args.concurrency, args.duration)
+        )
+        rss = get_rss(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    latencies.sort()
+    print(
+        f"{name}: {len(latencies) / args.duration:8.0f} req/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.1f}ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f}ms  "
+        f"rss {rss:6.0f}MB  errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=int, default=20)
+    parser.add_argument("--sales", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    django.setup()
+    user, token = seed(args.sales)
+    try:
+        paths = get_paths(user)
+        for name in SERVERS:
+            run(name, args, paths, token)
+    finally:
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from store import response_cache
+from store.authentication import Principal
+from store.models import (
+    CreditStripe,
+    CreditTransactionLog,
+    Deposit,
+    Sale,
+    SellerSummary,
+)
+from store.permissions import IsOwnerOrAdmin
+from store.serializers import SaleSerializer, SellerSerializer
+from store.views import SellerViewSet
+
+User = get_user_model()
+
+SALE = {"amount": 1, "phone_number": "09123456789"}
+
+CASES = {}
+
+
+def case(name):
+    """
+    Register ``setup(options)`` under ``name``. It builds the case's data and
+    returns the function to measure, which may return a query count when its
+    queries run on connections other than the default one.
+    """
+
+    def register(setup):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def make_user(balance=0, is_staff=False):
+    user = User.objects.create_user(
+        email=f"bench-{uuid4().hex}@example.com", is_staff=is_staff
+    )
+    credit = user.seller.credit
+    credit.balance = balance
+    credit.save(update_fields=["balance"])
+    return user
+
+
+def make_client(user):
+    client = APIClient()
+    token = Token.objects.create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def make_history(user, sales=200, deposits=50):
+    Sale.objects.bulk_create([Sale(seller=user.seller, **SALE) for _ in range(sales)])
+    Deposit.objects.bulk_create(
+        [
+            Deposit(credit=user.seller.credit, amount=Decimal("10.00"))
+            for _ in range(deposits)
+        ]
+    )
+    CreditTransactionLog.objects.bulk_create(
+        [
+            CreditTransactionLog(
+                credit=user.seller.credit,
+                amount=-1,
+                type=CreditTransactionLog.TYPE_SALE,
+            )
+            for _ in range(sales)
+        ]
+    )
+
+
+@case("seller_serializer_history")
+def seller_serializer_history(options):
+    users = [make_user(balance=1000) for _ in range(50)]
+    for user in users:
+        CreditStripe.objects.bulk_create(
+            [CreditStripe(credit=user.seller.credit, index=i) for i in range(16)]
+        )
+        SellerSummary.objects.bulk_create(
+            [SellerSummary(seller=user.seller, slot=slot) for slot in range(16)]
+        )
+    queryset = SellerViewSet.queryset.filter(user__in=users)
+
+    def run():
+        SellerSerializer(list(queryset.all()), many=True).data
+
+    return run
+
+
+@case("sale_serializer_create_threads")
+def sale_serializer_create_threads(options):
+    user = make_user(balance=Decimal("90000000.00"))
+    per_thread = max(1, options.sales // options.threads)
+    factory = APIRequestFactory()
+
+    def create_sales():
+        request = Request(factory.post("/"))
+        request.user = user
+        try:
+            with CaptureQueriesContext(connection) as captured:
+                for _ in range(per_thread):
+                    serializer = SaleSerializer(data=SALE, context={"request": request})
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save()
+            return len(captured)
+        finally:
+            connection.close()
+
+    def run():
+        with ThreadPoolExecutor(max_workers=options.threads) as pool:
+            futures = [pool.submit(create_sales) for _ in range(options.threads)]
+        return sum(future.result() for future in futures)
+
+    return run
+
+
+@case("is_owner_or_admin")
+def is_owner_or_admin(options):
+    user = make_user()
+    seller = user.seller
+    principal = Principal(user, ids=(seller.id, seller.credit.id))
+    request = SimpleNamespace(method="GET", user=user, principal=principal)
+    view = SimpleNamespace(kwargs={"seller_pk": str(seller.id)})
+    sale = SimpleNamespace(seller_id=seller.id)
+    permission = IsOwnerOrAdmin()
+
+    def run():
+        for _ in range(10_000):
+            permission.has_permission(request, view)
+            permission.has_object_permission(request, view, sale)
+
+    return run
+
+
+def list_case(name, url, staff=False, cold=True):
+    @case(name)
+    def setup(options):
+        user = make_user(balance=1000, is_staff=staff)
+        make_history(user)
+        for _ in range(20):
+            make_history(make_user(balance=1000), sales=10, deposits=5)
+        client = make_client(user)
+        path = url(user)
+
+        def run():
+            if cold:
+                response_cache.bump(user.seller.id)
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+
+        return run
+
+    return setup
+
+
+list_case("list_sellers", lambda user: reverse("seller-list"), staff=True)
+list_case("list_credits", lambda user: reverse("credit-list"), staff=True)
+list_case(
+    "list_sales",
+    lambda user: reverse("seller-sales-list", kwargs={"seller_pk": user.seller.id}),
+)
+list_case(
+    "list_sales_cached",
+    lambda user: reverse("seller-sales-list", kwargs={"seller_pk": user.seller.id}),
+    cold=False,
+)
+list_case(
+    "list_sales_cursor",
+    lambda user: reverse("seller-sales-list", kwargs={"seller_pk": user.seller.id})
+    + "?pagination=cursor",
+)
+list_case(
+    "list_deposits",
+    lambda user: reverse("seller-deposits-list", kwargs={"seller_pk": user.seller.id}),
+)
+list_case(
+    "list_transaction_logs",
+    lambda user: reverse(
+        "credit-transaction-logs-list", kwargs={"credit_pk": user.seller.credit.id}
+    ),
+    staff=True,
+)
+
+
+@case("sales_single_posts")
+def sales_single_posts(options):
+    user = make_user(balance=Decimal("90000000.00"))
+    client = make_client(user)
+    url = reverse("seller-sales-list", kwargs={"seller_pk": user.seller.id})
+
+    def run():
+        for _ in range(options.sales):
+            client.post(url, SALE, format="json")
+
+    return run
+
+
+@case("sales_bulk_post")
+def sales_bulk_post(options):
+    user = make_user(balance=Decimal("90000000.00"))
+    client = make_client(user)
+    url = reverse("seller-sales-bulk", kwargs={"seller_pk": user.seller.id})
+
+    def run():
+        response = client.post(url, {"sales": [SALE] * options.sales}, format="json")
+        assert response.status_code == 201, response.status_code
+
+    return run
@@ -0,0 +1,113 @@
+"""
+Measure what opening Postgres connections costs the /store/ reads under each
+DATABASE_CONNECTION_MODE.
+
+    python -m benchmarks.connections --workers 2 --concurrency 32 --duration 15
+    python -m benchmarks.connections --modes direct,pooled --servers asgi
+
+Every mode is run behind both the WSGI and the ASGI server with the same
+load as benchmarks.asgi_reads. Next to requests per second and latency
+percentiles, the number of Postgres sessions the server opened per request is
+read from pg_stat_database: 1.00 means a new connection for every request.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import django
+
+from .asgi_reads import SERVERS, get_paths, load, percentile, seed, wait_for_port
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+
+MODES = ["direct", "persistent", "pooled"]
+
+
+def get_sessions():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(
+            "SELECT sessions FROM pg_stat_database WHERE datname = current_database()"
+        )
+        return cursor.fetchone()[0]
+
+
+def run(server, mode, args, paths, token):
+    env = {
+        **os.environ,
+        "ASYNC_READS": "1" if server == "asgi" else "0",
+        "DATABASE_CONNECTION_MODE": mode,
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *SERVERS[server],
+            "--workers",
+            str(args.workers),
+            "--bind",
+            f"127.0.0.1:{args.port}",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(args.port)
+        asyncio.run(load(args.port, paths, token, args.concurrency, 2))
+        sessions = get_sessions()
+        latencies, errors = asyncio.run(
+            load(args.port, paths, token, args.concurrency, args.duration)
+        )
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait()
+
+    # Sessions are counted once their backends have reported their exit.
+    time.sleep(1)
+    sessions = get_sessions() - sessions
+
+    latencies.sort()
+    print(
+        f"{server} {mode:10}: {len(latencies) / args.duration:8.0f} req/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.1f}ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f}ms  "
+        f"sessions/req {sessions / max(len(latencies), 1):5.2f}  "
+        f"errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--servers", default=",".join(SERVERS))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=int, default=15)
+    parser.add_argument("--sales", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    django.setup()
+    user, token = seed(args.sales)
+    try:
+        paths = get_paths(user)
+        for server in args.servers.split(","):
+            for mode in args.modes.split(","):
+                # The settings refuse persistent connections under ASGI.
+                if server == "asgi" and mode == "persistent":
+                    continue
+                run(server, mode, args, paths, token)
+    finally:
+        user.delete()
+
+
+if __name__ == "__main__":
+    main()
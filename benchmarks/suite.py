@@ -0,0 +1,151 @@
+"""
+In-process micro-benchmarks for serializers, permissions and views.
+
+    python -m benchmarks.suite                       # run and print
+    python -m benchmarks.suite --save                # store as the baseline
+    python -m benchmarks.suite --compare             # fail on regressions
+    python -m benchmarks.suite --only sales_ --repeat 10
+
+Each case builds its data once in a throwaway test database on the configured
+Postgres, emptied between cases, runs once to warm up and is then timed
+``--repeat`` times. The median wall time, the query count and the peak traced
+allocation of one run are recorded. ``--compare`` exits with status 1 when a
+case issues more queries than the baseline, or its wall time or allocations
+grow by more than ``--threshold`` (a fraction). Wall times depend on the
+machine, so refresh the baseline with ``--save`` on the machine that runs the
+comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def measure(run, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    run()
+    with CaptureQueriesContext(connection) as captured:
+        counted = run()
+    queries = len(captured) if counted is None else counted
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+
+    return {
+        "wall_ms": round(statistics.median(times) * 1000, 3),
+        "queries": queries,
+        "alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        if result["queries"] > expected["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries, "
+                f"baseline {expected['queries']}"
+            )
+        for metric in ("wall_ms", "alloc_kb"):
+            limit = expected[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]}, "
+                    f"baseline {expected[metric]} (limit {limit:.1f})"
+                )
+    return regressions
+
+
+def run(options):
+    from django.core.cache import cache
+    from django.core.management import call_command
+
+    from .cases import CASES
+
+    results = {}
+    for name, setup in CASES.items():
+        if options.only and not any(name.startswith(p) for p in options.only):
+            continue
+
+        # Every case starts from empty tables so its numbers do not depend on
+        # which other cases ran before it.
+        call_command("flush", interactive=False, verbosity=0)
+        cache.clear()
+        result = measure(setup(options), options.repeat)
+        results[name] = result
+        print(
+            f"{name:<32} {result['wall_ms']:>10.2f}ms "
+            f"{result['queries']:>6} queries {result['alloc_kb']:>10.1f}KB"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="*", default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sales", type=int, default=200)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    options = parser.parse_args()
+
+    django.setup()
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+    )
+
+    setup_test_environment(debug=False)
+    databases = setup_databases(verbosity=0, interactive=False)
+    try:
+        results = run(options)
+    finally:
+        teardown_databases(databases, verbosity=0)
+
+    if options.save:
+        baseline = {}
+        if options.baseline.exists():
+            baseline = json.loads(options.baseline.read_text())
+        baseline.update(results)
+        options.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+
+    if options.compare:
+        regressions = compare(
+            results, json.loads(options.baseline.read_text()), options.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from config.handlers import ASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+os.environ.setdefault("ASYNC_READS", "1")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+application = ASGIHandler()
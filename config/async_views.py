@@ -0,0 +1,133 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+
+from rest_framework import exceptions
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    """
+    Serves the ``list`` and ``retrieve`` actions of a viewset from an async
+    view when ``settings.ASYNC_READS`` is on, so GET requests wait on Postgres
+    without holding a worker thread. Other methods, and list requests whose
+    paginator has no async counterpart, go through the regular sync view.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READS or view.actions.get("get") not in cls.async_actions:
+            return view
+
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method != "GET":
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = view.actions
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aauthenticate(request)
+            self.initial(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aauthenticate(self, request):
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+            if authenticate is None:
+                authenticate = sync_to_async(authenticator.authenticate)
+
+            try:
+                user_auth_tuple = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    def get_async_paginator(self, request):
+        paginator = self.paginator
+        if paginator is None or isinstance(paginator, LimitOffsetPagination):
+            return paginator, True
+        return None, False
+
+    async def apaginate_queryset(self, paginator, queryset, request):
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        if paginator.limit is None:
+            return None
+
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await queryset.acount()
+        if paginator.count > paginator.limit and paginator.template is not None:
+            paginator.display_page_controls = True
+
+        if paginator.count == 0 or paginator.offset > paginator.count:
+            return []
+        page = queryset[paginator.offset : paginator.offset + paginator.limit]
+        return [obj async for obj in page]
+
+    async def alist(self, request, *args, **kwargs):
+        paginator, is_supported = self.get_async_paginator(request)
+        if not is_supported:
+            return await sync_to_async(super().list)(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if paginator is not None:
+            page = await self.apaginate_queryset(paginator, queryset, request)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return paginator.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
@@ -0,0 +1,40 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as BaseASGIHandler
+
+
+class ASGIHandler(BaseASGIHandler):
+    """
+    Django 4.1 iterates streaming responses on the event loop, where the ORM
+    refuses to run and every chunk would block other requests. Here each part
+    is produced on the request's own thread, the one its view ran on, and
+    only sent from the loop.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        parts = iter(response)
+        response.streaming_content = []
+        next_part = sync_to_async(next, thread_sensitive=True)
+
+        async def send_with_body(message):
+            # The base class sends the headers, then the closing message; the
+            # body goes in between.
+            if message["type"] == "http.response.body":
+                while (part := await next_part(parts, None)) is not None:
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": chunk,
+                                "more_body": True,
+                            }
+                        )
+            await send(message)
+
+        try:
+            await super().send_response(response, send_with_body)
+        except BaseException:
+            await sync_to_async(response.close, thread_sensitive=True)()
+            raise
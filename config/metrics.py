@@ -0,0 +1,256 @@
+import asyncio
+import os
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route.",
+    ["route", "method", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries",
+    "SQL statements run per request by route.",
+    ["route", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, float("inf")),
+)
+REQUEST_SQL_SECONDS = Histogram(
+    "http_request_sql_seconds",
+    "Time spent in SQL per request by route.",
+    ["route", "method"],
+)
+STATEMENT_CALLS = Counter(
+    "sql_statement_calls",
+    "Executions of each normalized SQL statement by route.",
+    ["route", "statement"],
+)
+STATEMENT_SECONDS = Counter(
+    "sql_statement_seconds",
+    "Time spent in each normalized SQL statement by route.",
+    ["route", "statement"],
+)
+STATEMENT_MAX_SECONDS = Gauge(
+    "sql_statement_max_seconds",
+    "Slowest single execution of each normalized SQL statement by route.",
+    ["route", "statement"],
+    multiprocess_mode="max",
+)
+
+SAVEPOINT_RE = re.compile(r'"s\d+_x\d+"')
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMS_RE = re.compile(r"%s(?:, %s)+")
+GROUPS_RE = re.compile(r"(\(%s(?:, \.\.\.)?\))(?:, \1)+")
+SELECT_LIST_RE = re.compile(r"^SELECT (DISTINCT )?(.+?) FROM ")
+
+current = ContextVar("metrics_request", default=None)
+
+# The slowest execution this process has seen for each (route, statement).
+slowest_seen = {}
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = {}
+
+    def add(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        count, total, slowest = self.statements.get(sql, (0, 0.0, 0.0))
+        self.statements[sql] = (count + 1, total + seconds, max(slowest, seconds))
+
+
+def collapse_select_list(match):
+    distinct, columns = match.groups()
+    if len(columns) > 60:
+        columns = "..."
+    return f"SELECT {distinct or ''}{columns} FROM "
+
+
+@lru_cache(maxsize=1024)
+def normalize(sql):
+    # Literals, IN lists and VALUES rows of any length map to one statement so
+    # the label set stays bounded by the code rather than by the data.
+    # Savepoint names carry the thread id and a counter.
+    sql = SAVEPOINT_RE.sub('"%s"', " ".join(sql.split()))
+    sql = NUMBER_RE.sub("%s", sql)
+    sql = PARAMS_RE.sub("%s, ...", sql)
+    sql = GROUPS_RE.sub(r"\1, ...", sql)
+    sql = SELECT_LIST_RE.sub(collapse_select_list, sql, count=1)
+    return sql[: settings.METRICS_STATEMENT_LENGTH]
+
+
+def record_sql(execute, sql, params, many, context):
+    stats = current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - started)
+
+
+def install(connection, **kwargs):
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+# The async views run the ORM on executor threads, each with its own
+# connection, so the wrapper goes on every connection as it is opened. The
+# context variable follows the request onto those threads.
+connection_created.connect(install, dispatch_uid="config.metrics.install")
+
+
+def install_all():
+    # Connections this thread opened before this module was imported.
+    for connection in connections.all():
+        install(connection)
+
+
+def observe(request, response, stats, seconds):
+    match = request.resolver_match
+    route = match.view_name if match else "unmatched"
+    method = request.method
+
+    REQUEST_SECONDS.labels(route, method, response.status_code).observe(seconds)
+    REQUEST_QUERIES.labels(route, method).observe(stats.queries)
+    REQUEST_SQL_SECONDS.labels(route, method).observe(stats.sql_seconds)
+    for sql, (count, total, slowest) in stats.statements.items():
+        statement = normalize(sql)
+        STATEMENT_CALLS.labels(route, statement).inc(count)
+        STATEMENT_SECONDS.labels(route, statement).inc(total)
+        key = (route, statement)
+        if slowest > slowest_seen.get(key, 0):
+            slowest_seen[key] = slowest
+            STATEMENT_MAX_SECONDS.labels(route, statement).set(slowest)
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Records latency, SQL statement count, SQL time and per-statement timings
+    for every request under the name of the route it resolved to.
+    """
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            stats = RequestStats()
+            token = current.set(stats)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                current.reset(token)
+            observe(request, response, stats, time.perf_counter() - started)
+            return response
+
+    else:
+
+        def middleware(request):
+            install_all()
+            stats = RequestStats()
+            token = current.set(stats)
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                current.reset(token)
+            observe(request, response, stats, time.perf_counter() - started)
+            return response
+
+    return middleware
+
+
+class StoreCollector:
+    """
+    Response cache, lock contention and reconciliation figures, read at
+    scrape time.
+    """
+
+    def collect(self):
+        from store import contention, reconciliation, response_cache
+
+        outcomes = CounterMetricFamily(
+            "store_response_cache",
+            "Cached list and detail responses served by outcome.",
+            labels=["view", "outcome"],
+        )
+        for field, count in response_cache.get_stats().items():
+            view, _, outcome = field.rpartition(":")
+            outcomes.add_metric([view, outcome], count)
+        yield outcomes
+
+        for by, name, documentation in [
+            ("wait", "wait_seconds", "Lock wait seconds"),
+            ("failed", "failures", "Failed locks"),
+        ]:
+            sellers = GaugeMetricFamily(
+                f"store_lock_contended_seller_{name}",
+                f"{documentation} over the last hour for the most contended sellers.",
+                labels=["seller"],
+            )
+            for seller_id, total in contention.top(count=10, hours=1, by=by):
+                sellers.add_metric([str(seller_id)], total)
+            yield sellers
+
+        metrics = reconciliation.get_cached_metrics()
+        yield GaugeMetricFamily(
+            "store_reconciliation_mismatched_credits",
+            "Credits whose balance differs from their ledger.",
+            value=metrics["mismatched_credits"],
+        )
+        yield GaugeMetricFamily(
+            "store_reconciliation_last_pass_mismatches",
+            "Mismatches found by the last finished reconciliation pass.",
+            value=metrics["last_pass_mismatches"],
+        )
+
+
+def get_registry():
+    # Under gunicorn every worker writes its samples to files in
+    # PROMETHEUS_MULTIPROC_DIR, and a scrape of any worker merges them all.
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        is_allowed = request.headers.get("Authorization") == f"Bearer {token}"
+    else:
+        # Without a token the endpoint is only open on a DEBUG server.
+        is_allowed = settings.DEBUG
+    if not is_allowed:
+        return HttpResponseForbidden()
+
+    store = CollectorRegistry()
+    store.register(StoreCollector())
+    output = generate_latest(get_registry()) + generate_latest(store)
+    return HttpResponse(output, content_type=CONTENT_TYPE_LATEST)
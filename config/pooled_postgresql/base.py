@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+
+import psycopg2
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+# Connections left idle for longer than this are checked with a query before
+# they are handed out again; busier ones are trusted.
+CHECK_AFTER_SECONDS = 5
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def is_alive(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+class Pool:
+    """
+    Open connections of one process to one database. At most ``size`` are
+    checked out at once and further checkouts wait up to ``timeout`` seconds.
+    Returned connections are rolled back if a transaction was left open, and
+    closed once they are older than ``lifetime`` seconds (None keeps them).
+    """
+
+    def __init__(self, size, timeout, lifetime):
+        self.timeout = timeout
+        self.lifetime = lifetime
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.opened_at = {}
+
+    def get(self, connect):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f"No pooled database connection was free within {self.timeout}s."
+            )
+
+        try:
+            while True:
+                with self.lock:
+                    if not self.idle:
+                        break
+                    connection, returned_at = self.idle.pop()
+                if time.monotonic() - returned_at < CHECK_AFTER_SECONDS:
+                    return connection
+                if is_alive(connection):
+                    return connection
+                self.discard(connection)
+
+            connection = connect()
+            with self.lock:
+                self.opened_at[connection] = time.monotonic()
+            return connection
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def put(self, connection):
+        try:
+            status = connection.info.transaction_status
+            if connection.closed or status == TRANSACTION_STATUS_UNKNOWN:
+                self.discard(connection)
+                return
+            if status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+
+            opened_at = self.opened_at.get(connection, 0)
+            age = time.monotonic() - opened_at
+            if self.lifetime is not None and age >= self.lifetime:
+                self.discard(connection)
+                return
+
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        except psycopg2.Error:
+            self.discard(connection)
+        finally:
+            self.slots.release()
+
+    def discard(self, connection):
+        with self.lock:
+            self.opened_at.pop(connection, None)
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def clear(self):
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+def get_pool(alias, settings_dict, conn_params):
+    key = (alias, repr(sorted(conn_params.items())))
+    with pools_lock:
+        if key not in pools:
+            options = settings_dict.get("POOL", {})
+            pools[key] = Pool(
+                size=options.get("SIZE", 20),
+                timeout=options.get("TIMEOUT", 10),
+                lifetime=options.get("LIFETIME"),
+            )
+        return pools[key]
+
+
+def clear_pools():
+    with pools_lock:
+        for pool in pools.values():
+            pool.clear()
+
+
+def forget_inherited_pools():
+    # Idle connections copied into a forked child still belong to the parent.
+    # Pointing their descriptors at /dev/null keeps the child from ending the
+    # parent's sessions when the copies are freed.
+    global pools_lock
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for pool in pools.values():
+        for connection, _ in pool.idle:
+            os.dup2(devnull, connection.fileno())
+    os.close(devnull)
+    pools.clear()
+    pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=forget_inherited_pools)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The PostgreSQL backend with connections taken from a per-process pool on
+    connect and handed back to it on close, so a request that closes its
+    connection does not pay for opening the next one. Pool settings come from
+    the ``POOL`` entry of the database settings: ``SIZE``, ``TIMEOUT`` and
+    ``LIFETIME``.
+    """
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connect = partial(super().get_new_connection, conn_params)
+        connection = self.pool.get(connect)
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.put(self.connection)
+
+    @contextmanager
+    def _nodb_cursor(self):
+        # Databases cannot be created or dropped while pooled connections to
+        # them are open.
+        clear_pools()
+        with super()._nodb_cursor() as cursor:
+            yield cursor
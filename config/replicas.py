@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = "replicas:sticky:{}"
+
+reads = ContextVar("replica_reads", default=False)
+
+
+class ReplicaRouter:
+    """
+    Sends reads made inside ``replica_reads()`` to a random replica from
+    DATABASE_REPLICAS and everything else, writes and ``select_for_update``
+    included, to the primary. Replicas are copies of the primary and are
+    never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = reads.set(enabled)
+    try:
+        yield
+    finally:
+        reads.reset(token)
+
+
+def primary_reads():
+    return replica_reads(enabled=False)
+
+
+def get_sticky_key(request):
+    # The Authorization header or session cookie identifies the client before
+    # authentication has run; only its hash is stored.
+    credential = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credential:
+        return None
+    return STICKY_KEY.format(hashlib.sha256(credential.encode()).hexdigest())
+
+
+def stick(request):
+    key = get_sticky_key(request)
+    if key is not None:
+        cache.set(key, 1, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(request):
+    key = get_sticky_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def can_read_replica(request):
+    return bool(settings.DATABASE_REPLICAS) and not is_sticky(request)
+
+
+def wrote(request, response):
+    return request.method not in SAFE_METHODS and response.status_code < 400
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Keeps the reads of a client on the primary for
+    DATABASE_REPLICA_STICKY_SECONDS after any write it made, so it never reads
+    a replica that has not caught up with its own changes yet.
+    """
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            response = await get_response(request)
+            if settings.DATABASE_REPLICAS and wrote(request, response):
+                await sync_to_async(stick, thread_sensitive=False)(request)
+            return response
+
+    else:
+
+        def middleware(request):
+            response = get_response(request)
+            if settings.DATABASE_REPLICAS and wrote(request, response):
+                stick(request)
+            return response
+
+    return middleware
+
+
+class ReplicaReadMixin:
+    """
+    Serves the ``list`` and ``retrieve`` actions of a viewset from a read
+    replica, unless the client wrote something in the last
+    DATABASE_REPLICA_STICKY_SECONDS. Authentication and the other actions
+    stay on the primary.
+    """
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads(can_read_replica(request)):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with replica_reads(can_read_replica(request)):
+            return super().retrieve(request, *args, **kwargs)
+
+    async def acan_read_replica(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return False
+        return not await sync_to_async(is_sticky, thread_sensitive=False)(request)
+
+    async def alist(self, request, *args, **kwargs):
+        with replica_reads(await self.acan_read_replica(request)):
+            return await super().alist(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        with replica_reads(await self.acan_read_replica(request)):
+            return await super().aretrieve(request, *args, **kwargs)
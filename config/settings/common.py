@@ -2,6 +2,7 @@ import os
 import dj_database_url
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from config.minio import *
 
@@ -29,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.metrics.metrics_middleware",
+    "config.replicas.replica_middleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,7 +101,7 @@ REST_FRAMEWORK = {
     "COERCE_DECIMAL_TO_STRING": False,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "store.authentication.PrincipalTokenAuthentication",
     ),
 }
 
@@ -116,6 +119,29 @@ CACHES = {
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 
+CELERY_BEAT_SCHEDULE = {
+    "flush_hot_ledger": {
+        "task": "store.tasks.flush_hot_ledger",
+        "schedule": 1.0,
+    },
+    "manage_partitions": {
+        "task": "store.tasks.manage_partitions",
+        "schedule": 24 * 60 * 60.0,
+    },
+    "reconcile_credits": {
+        "task": "store.tasks.reconcile_credits",
+        "schedule": 5 * 60.0,
+    },
+    "relay_outbox": {
+        "task": "store.tasks.relay_outbox",
+        "schedule": 1.0,
+    },
+    "prune_outbox": {
+        "task": "store.tasks.prune_outbox",
+        "schedule": 60 * 60.0,
+    },
+}
+
 # Swagger
 SPECTACULAR_SETTINGS = {
     "TITLE": "interview API",
@@ -125,4 +151,141 @@ SPECTACULAR_SETTINGS = {
 
 BASE_BACKEND_URL = os.environ.get("BASE_BACKEND_URL")
 
+# Serve list and retrieve GETs from async views on the async ORM. config.asgi
+# turns this on; under WSGI every async view would need its own event loop.
+ASYNC_READS = os.environ.get("ASYNC_READS", "0") == "1"
+
+# Read replicas, as comma-separated database URLs. The list and retrieve
+# actions of the store viewsets read from a random replica, except for clients
+# that wrote anything in the last DATABASE_REPLICA_STICKY_SECONDS. Tests point
+# the replicas at the test database of the primary.
+DATABASE_REPLICA_URLS = os.environ.get("DATABASE_REPLICA_URLS", "")
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", 10)
+)
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, DATABASE_REPLICA_URLS.split(","))):
+    DATABASE_REPLICAS.append(f"replica{index}")
+    DATABASES[f"replica{index}"] = {
+        **dj_database_url.parse(url),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["config.replicas.ReplicaRouter"]
+
+# How each process connects to Postgres:
+# - "direct" opens a connection per request or Celery task and closes it after;
+# - "persistent" keeps a connection open for DATABASE_CONN_MAX_AGE seconds and
+#   checks it still works before a new request reuses it. Under config.asgi
+#   (ASYNC_READS) every request queries on a thread of its own and could never
+#   reuse it, so the combination is refused; use "pooled" there;
+# - "pooled" hands connections back to a pool of at most DATABASE_POOL_SIZE per
+#   process after each request or task, for any thread to reuse. Checkouts
+#   wait up to DATABASE_POOL_TIMEOUT seconds for a free connection, and
+#   connections are replaced after DATABASE_CONN_MAX_AGE seconds;
+# - "pgbouncer" is "persistent" for a DATABASE_URL pointing at PgBouncer in
+#   transaction pooling mode. Django's server-side cursors are disabled since
+#   they cannot outlive a transaction there; store.exports declares its own
+#   inside one. Under config.asgi connections to
+#   PgBouncer are closed after each request.
+DATABASE_CONNECTION_MODE = os.environ.get("DATABASE_CONNECTION_MODE", "direct")
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", 600))
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 20))
+DATABASE_POOL_TIMEOUT = int(os.environ.get("DATABASE_POOL_TIMEOUT", 10))
+
+if DATABASE_CONNECTION_MODE == "persistent" and ASYNC_READS:
+    raise ImproperlyConfigured(
+        'DATABASE_CONNECTION_MODE "persistent" cannot reuse connections under '
+        'ASYNC_READS; use "pooled" instead.'
+    )
+
+for database in DATABASES.values():
+    if DATABASE_CONNECTION_MODE in ("persistent", "pgbouncer"):
+        database["CONN_MAX_AGE"] = 0 if ASYNC_READS else DATABASE_CONN_MAX_AGE
+        database["CONN_HEALTH_CHECKS"] = True
+    if DATABASE_CONNECTION_MODE == "pgbouncer":
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    if DATABASE_CONNECTION_MODE == "pooled":
+        database["ENGINE"] = "config.pooled_postgresql"
+        database["CONN_MAX_AGE"] = 0
+        database["POOL"] = {
+            "SIZE": DATABASE_POOL_SIZE,
+            "TIMEOUT": DATABASE_POOL_TIMEOUT,
+            "LIFETIME": DATABASE_CONN_MAX_AGE,
+        }
+
 AUTH_USER_MODEL = "users.User"
+
+# /metrics serves Prometheus metrics per route, including normalized SQL
+# statements cut to METRICS_STATEMENT_LENGTH characters. Scrapes must send
+# METRICS_TOKEN as a bearer token; without one the endpoint answers 403 unless
+# DEBUG is on. Under gunicorn, gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR
+# at a shared directory so every worker reports the metrics of all of them.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+METRICS_STATEMENT_LENGTH = int(os.environ.get("METRICS_STATEMENT_LENGTH", 300))
+
+# Password hashes for bulk onboarding are computed in a pool of this many
+# processes per web process (0 shares the CPUs out among the WEB_CONCURRENCY
+# web processes, at least one each).
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 0))
+
+# Logins check passwords on the request's own thread, not in the onboarding
+# pool. Each web process runs at most this many checks at once and answers
+# further logins with a 429. Each check keeps a CPU busy for the length of one
+# hash, so keep it near the CPUs available to one web process.
+PASSWORD_CHECK_CONCURRENCY = int(os.environ.get("PASSWORD_CHECK_CONCURRENCY", 4))
+
+# Number of sub-balance rows backing each seller's credit under the striped
+# engine; up to N sales for one seller can debit concurrently.
+STORE_CREDIT_STRIPES = int(os.environ.get("STORE_CREDIT_STRIPES", 0))
+
+# How SaleSerializer.create debits a seller: "locking" (select_for_update on the
+# Credit row), "striped" (STORE_CREDIT_STRIPES sub-balances), "statement"
+# (guarded UPDATE plus ledger and sale inserts in a single CTE) or "redis"
+# (Lua check-and-decrement, flushed to Postgres by store.tasks.flush_hot_ledger).
+# Run collapse_credit_stripes after switching away from "striped".
+STORE_SALE_ENGINE = os.environ.get(
+    "STORE_SALE_ENGINE", "striped" if STORE_CREDIT_STRIPES else "locking"
+)
+
+# Waits for and holds of row locks on seller balances are timed per path
+# (sale, deposit, approval). With STORE_LOCK_NOWAIT a lock held by another
+# transaction fails at once; with STORE_LOCK_TIMEOUT_MS it is waited for at most
+# that long. Either way the request gets a 503 instead of queueing behind a hot
+# seller. Waits of at least STORE_LOCK_CONTENTION_MS are added to per-seller
+# totals in Redis, kept for STORE_LOCK_CONTENTION_HOURS.
+STORE_LOCK_NOWAIT = os.environ.get("STORE_LOCK_NOWAIT", "0") == "1"
+STORE_LOCK_TIMEOUT_MS = int(os.environ.get("STORE_LOCK_TIMEOUT_MS", 0))
+STORE_LOCK_CONTENTION_MS = int(os.environ.get("STORE_LOCK_CONTENTION_MS", 5))
+STORE_LOCK_CONTENTION_HOURS = int(os.environ.get("STORE_LOCK_CONTENTION_HOURS", 24))
+
+# Sales and ledger rows are range-partitioned by month on created_at. Monthly
+# partitions are created this many months ahead; partitions older than the
+# retention window are detached (0 keeps every partition attached). Detached
+# sales stay counted in seller summaries through ArchivedSales.
+STORE_PARTITION_MONTHS_AHEAD = int(os.environ.get("STORE_PARTITION_MONTHS_AHEAD", 3))
+STORE_PARTITION_RETENTION_MONTHS = int(
+    os.environ.get("STORE_PARTITION_RETENTION_MONTHS", 0)
+)
+
+# Credits with new ledger rows are checked against their checkpoint in chunks
+# of this many credits, one Celery task per chunk. Rows younger than the
+# settle window are verified but not yet folded into checkpoints.
+STORE_RECONCILE_CHUNK_SIZE = int(os.environ.get("STORE_RECONCILE_CHUNK_SIZE", 500))
+STORE_RECONCILE_SETTLE_SECONDS = int(
+    os.environ.get("STORE_RECONCILE_SETTLE_SECONDS", 60)
+)
+
+# Sale and deposit events are written to an outbox table in the same
+# transaction and relayed to this Redis stream, capped at roughly MAXLEN
+# entries. Sellers are split over STORE_OUTBOX_PARTITIONS and only one relay
+# at a time drains a partition, in id order. Each seller's events are in commit
+# order only under the locking and statement engines.
+# Relayed rows are deleted after STORE_OUTBOX_RETENTION_HOURS.
+STORE_OUTBOX_STREAM = os.environ.get("STORE_OUTBOX_STREAM", "store:events")
+STORE_OUTBOX_STREAM_MAXLEN = int(os.environ.get("STORE_OUTBOX_STREAM_MAXLEN", 1000000))
+STORE_OUTBOX_PARTITIONS = int(os.environ.get("STORE_OUTBOX_PARTITIONS", 8))
+STORE_OUTBOX_RETENTION_HOURS = int(os.environ.get("STORE_OUTBOX_RETENTION_HOURS", 72))
+
+# Exports stream CSV or NDJSON from a server-side cursor inside one
+# repeatable-read transaction, fetching and sending this many rows at a time.
+STORE_EXPORT_CHUNK_SIZE = int(os.environ.get("STORE_EXPORT_CHUNK_SIZE", 2000))
@@ -3,12 +3,15 @@ from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 
+from config.metrics import metrics_view
+
 urlpatterns = [
     path("swagger/", include("config.urls.swagger")),
     path("admin/", admin.site.urls),
     path("auth/", include("users.urls")),
     path("auth/", include("users.urls.token")),
     path("store/", include("store.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,27 @@
+import os
+import shutil
+
+# Workers are forked from this process, so they inherit the directory and
+# write their metric samples there; /metrics on any worker merges them. It
+# must be set before prometheus_client is first imported.
+multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc"
+)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+# Workers size their password hashing pools by it.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+
+
+def on_starting(server):
+    # Files left by a previous run would add stale samples to every scrape.
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
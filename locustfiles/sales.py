@@ -1,63 +1,320 @@
+"""
+Sales, deposits, approvals and reads against sellers created by
+``python manage.py seed_loadtest``.
+
+    python manage.py seed_loadtest --sellers 100 --balance 1000000
+    locust -f locustfiles/sales.py --host http://localhost:8000 --headless \
+        --users 200 --spawn-rate 50 --run-time 2m \
+        --profile zipf --mix mixed --report-file report.json
+
+--profile picks the seller behind each request:
+- hot: every request targets the first seller;
+- uniform: any seller with equal probability;
+- zipf: seller k with weight 1 / k ** --zipf-s.
+
+--mix sets the task weights (see MIXES). Staff users approve the deposits
+that sellers request. When the run stops, p50/p95/p99 latency, requests per
+second and failures are printed for each endpoint. Every seller touched is
+then re-read to check that no balance went negative, that the balance equals
+approved deposits minus sales, and that the server recorded at least the sales
+the clients saw accepted.
+"""
 import json
-from random import randint
-from locust import HttpUser, task, between
+import random
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from itertools import accumulate
 
+import requests
+from locust import HttpUser, between, events
 
-class WebsiteUser(HttpUser):
-    wait_time = between(1, 5)
+MIXES = {
+    "sales": {"sale": 10, "bulk_sale": 1, "list_sales": 1, "retrieve_seller": 1},
+    "mixed": {
+        "sale": 6,
+        "bulk_sale": 1,
+        "deposit": 2,
+        "list_sales": 2,
+        "retrieve_seller": 1,
+        "balance": 1,
+    },
+    "reads": {"list_sales": 3, "retrieve_seller": 2, "balance": 1, "list_deposits": 1},
+}
+
+SALE_AMOUNT = Decimal("10.00")
+DEPOSIT_AMOUNT = Decimal("50.00")
+BULK_SIZE = 20
+
+
+class Ledger:
+    """What the clients saw accepted, compared with the server at the end."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sales = defaultdict(Decimal)
+        self.pending = defaultdict(list)
+        self.touched = set()
+
+    def add_sales(self, seller_id, amount):
+        with self.lock:
+            self.sales[seller_id] += amount
+            self.touched.add(seller_id)
+
+    def add_deposit(self, seller_id, deposit_id):
+        with self.lock:
+            self.pending[seller_id].append(deposit_id)
+            self.touched.add(seller_id)
+
+    def take_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(list)
+        return pending
+
+
+seed = {}
+ledger = Ledger()
+pick_seller = None
 
-    def on_start(self):
-        self.login()
 
-    def login(self):
-        email = f"user{randint(20, 100)}@example.com"
-        password = "123321mmp"
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--seed-file", default="locustfiles/seed.json")
+    parser.add_argument(
+        "--profile", choices=["hot", "uniform", "zipf"], default="uniform"
+    )
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--report-file", default="")
 
-        register_payload = {"email": email, "password": password}
-        response = self.client.post("/auth/users", register_payload)
-        print(response.error)
 
-        if response.status_code == 201:
-            login_payload = {"email": email, "password": password}
-            response = self.client.post("/auth/token/login/", json=login_payload)
+def make_picker(sellers, profile, zipf_s):
+    if profile == "hot":
+        return lambda: sellers[0]
+    if profile == "uniform":
+        return lambda: random.choice(sellers)
+
+    weights = list(
+        accumulate(1 / rank**zipf_s for rank in range(1, len(sellers) + 1))
+    )
+    return lambda: random.choices(sellers, cum_weights=weights)[0]
+
+
+@events.init.add_listener
+def on_init(environment, **kwargs):
+    global pick_seller
+    options = environment.parsed_options
+    if options is None:
+        return
+
+    with open(options.seed_file) as file:
+        seed.update(json.load(file))
+    pick_seller = make_picker(seed["sellers"], options.profile, options.zipf_s)
+
+    SellerUser.tasks = [
+        getattr(SellerUser, name)
+        for name, weight in MIXES[options.mix].items()
+        for _ in range(weight)
+    ]
+    if "deposit" not in MIXES[options.mix]:
+        StaffUser.weight = 0
+
+
+class SellerUser(HttpUser):
+    weight = 19
+    wait_time = between(0.05, 0.5)
+
+    def request(self, method, path, name, seller, **kwargs):
+        headers = {"Authorization": f"Token {seller['token']}"}
+        return self.client.request(
+            method, path, name=name, headers=headers, catch_response=True, **kwargs
+        )
+
+    def sale(self):
+        seller = pick_seller()
+        with self.request(
+            "POST",
+            f"/store/sellers/{seller['id']}/sales/",
+            "POST /store/sellers/:id/sales/",
+            seller,
+            json={"amount": str(SALE_AMOUNT), "phone_number": "09123456789"},
+        ) as response:
+            if response.status_code == 201:
+                ledger.add_sales(seller["id"], SALE_AMOUNT)
+                response.success()
+            elif response.status_code == 400 and "amount" in response.text:
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
+
+    def bulk_sale(self):
+        seller = pick_seller()
+        sales = [
+            {"amount": str(SALE_AMOUNT), "phone_number": "09123456789"}
+        ] * BULK_SIZE
+        with self.request(
+            "POST",
+            f"/store/sellers/{seller['id']}/sales/bulk/",
+            "POST /store/sellers/:id/sales/bulk/",
+            seller,
+            json={"sales": sales, "atomic": False},
+        ) as response:
+            if response.status_code == 201:
+                results = response.json()["results"]
+                accepted = [row for row in results if row["status"] == "created"]
+                ledger.add_sales(seller["id"], SALE_AMOUNT * len(accepted))
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
 
+    def deposit(self):
+        seller = pick_seller()
+        with self.request(
+            "POST",
+            f"/store/sellers/{seller['id']}/deposits/",
+            "POST /store/sellers/:id/deposits/",
+            seller,
+            json={"amount": str(DEPOSIT_AMOUNT)},
+        ) as response:
             if response.status_code == 201:
-                self.auth_token = response.json().get("token")
-                self.client.headers.update(
-                    {"Authorization": f"Token {self.auth_token}"}
-                )
+                ledger.add_deposit(seller["id"], response.json()["id"])
+                response.success()
             else:
-                print(f"Failed to authenticate. Status code: {response.status_code}")
-        else:
-            print(f"Failed to register user. Status code: {response.status_code}")
-
-    @task(1)
-    def view_sales(self):
-        seller_id = randint(1, 10)
-        self.client.get(
-            f"/store/sellers/{seller_id}/sales", name="/store/sellers/:id/sales"
+                response.failure(f"status {response.status_code}")
+
+    def read(self, path, name, seller):
+        with self.request("GET", path, name, seller) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
+
+    def list_sales(self):
+        seller = pick_seller()
+        self.read(
+            f"/store/sellers/{seller['id']}/sales/?limit=20",
+            "GET /store/sellers/:id/sales/",
+            seller,
         )
 
-    @task(1)
-    def view_sale_detail(self):
-        seller_id = randint(1, 10)
-        sale_id = randint(1, 10)
-        self.client.get(
-            f"/store/sellers/{seller_id}/sales/{sale_id}",
-            name="/store/sellers/:id/sales/:id",
+    def list_deposits(self):
+        seller = pick_seller()
+        self.read(
+            f"/store/sellers/{seller['id']}/deposits/?limit=20",
+            "GET /store/sellers/:id/deposits/",
+            seller,
         )
 
-    @task(10)
-    def sale(self):
-        seller_id = randint(1, 10)
-        self.client.post(
-            f"/store/sellers/{seller_id}/sales/",
-            name="/store/sellers/:id/sales",
-            json={"amount": 1000, "phone_number": "09123456789"},
+    def retrieve_seller(self):
+        seller = pick_seller()
+        self.read(f"/store/sellers/{seller['id']}/", "GET /store/sellers/:id/", seller)
+
+    def balance(self):
+        seller = pick_seller()
+        self.read(
+            f"/store/credits/{seller['credit']}/balance/",
+            "GET /store/credits/:id/balance/",
+            seller,
+        )
+
+
+class StaffUser(HttpUser):
+    weight = 1
+    wait_time = between(1, 2)
+
+    def on_start(self):
+        self.client.headers["Authorization"] = f"Token {seed['staff_token']}"
+
+    def approve(self):
+        for seller_id, deposit_ids in ledger.take_pending().items():
+            with self.client.post(
+                f"/store/sellers/{seller_id}/deposits/approve/",
+                json={"ids": deposit_ids},
+                name="POST /store/sellers/:id/deposits/approve/",
+                catch_response=True,
+            ) as response:
+                if response.status_code != 200:
+                    response.failure(f"status {response.status_code}")
+
+    tasks = [approve]
+
+
+def percentiles(entry):
+    return {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "rps": round(entry.total_rps, 1),
+        "p50": entry.get_response_time_percentile(0.5),
+        "p95": entry.get_response_time_percentile(0.95),
+        "p99": entry.get_response_time_percentile(0.99),
+    }
+
+
+def check_sellers(host):
+    session = requests.Session()
+    session.headers["Authorization"] = f"Token {seed['staff_token']}"
+
+    problems = []
+    for seller_id in sorted(ledger.touched):
+        data = session.get(f"{host}/store/sellers/{seller_id}/").json()
+        balance = Decimal(str(data["balance"]))
+        deposits = Decimal(str(data["total_deposits"]))
+        sales = Decimal(str(data["total_sales"]))
+
+        if balance < 0:
+            problems.append(f"seller {seller_id}: negative balance {balance}")
+        if balance != deposits - sales:
+            problems.append(
+                f"seller {seller_id}: balance {balance} != "
+                f"deposits {deposits} - sales {sales}"
+            )
+        if sales < ledger.sales[seller_id]:
+            problems.append(
+                f"seller {seller_id}: server sales {sales} < "
+                f"accepted {ledger.sales[seller_id]}"
+            )
+    return problems
+
+
+@events.quitting.add_listener
+def report(environment, **kwargs):
+    options = environment.parsed_options
+    if options is None or environment.runner is None:
+        return
+
+    stats = environment.runner.stats
+    endpoints = {
+        entry.name: percentiles(entry)
+        for entry in sorted(stats.entries.values(), key=lambda entry: entry.name)
+    }
+    endpoints["Aggregated"] = percentiles(stats.total)
+
+    print(f"\nprofile={options.profile} mix={options.mix}")
+    print(
+        f"{'endpoint':<44}{'reqs':>8}{'fail':>6}{'rps':>8}{'p50':>7}{'p95':>7}{'p99':>7}"
+    )
+    for name, row in endpoints.items():
+        print(
+            f"{name:<44}{row['requests']:>8}{row['failures']:>6}{row['rps']:>8}"
+            f"{row['p50']:>7}{row['p95']:>7}{row['p99']:>7}"
         )
 
-    # def on_start(self):
-    #     for seller_id in range(1, 11):
-    #         seller = Seller.objects.get(pk=seller_id)
-    #         seller.credit.balance = 1_000_000
-    #         seller.credit.save(update_fields=["balance"])
+    problems = check_sellers(environment.host)
+    print(f"\noversell check: {len(ledger.touched)} sellers, {len(problems)} problems")
+    for problem in problems:
+        print(f"  {problem}")
+    if problems:
+        environment.process_exit_code = 1
+
+    if options.report_file:
+        with open(options.report_file, "w") as file:
+            json.dump(
+                {
+                    "profile": options.profile,
+                    "mix": options.mix,
+                    "endpoints": endpoints,
+                    "oversell": problems,
+                },
+                file,
+                indent=2,
+            )
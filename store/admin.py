@@ -1,31 +1,76 @@
 from django.db import transaction
-from django.contrib import admin
-from .models import Deposit, CreditTransactionLog, Credit
+from django.contrib import admin, messages
+from .engines import get_engine
+from .exceptions import CreditLocked
+from .models import CreditCheckpoint, Deposit, OutboxEvent, ReconciliationPass
 
 
 class DepositRequestAdmin(admin.ModelAdmin):
     list_display = ["credit", "amount", "status", "created_at", "updated_at"]
+    list_filter = ["status"]
     readonly_fields = ["credit", "amount", "created_at", "updated_at"]
+    actions = ["approve_deposits"]
 
     def get_readonly_fields(self, request, obj=None):
-        if obj and obj.status == Deposit.STATUS_APPROVED:
+        if obj and obj.status != Deposit.STATUS_PENDING:
             return self.readonly_fields + ["status"]
         return self.readonly_fields
 
     @transaction.atomic
     def save_model(self, request, obj, form, change):
+        # approve_deposits checks the stored status, so saving an approved
+        # deposit again does not credit it twice.
         if obj.status == Deposit.STATUS_APPROVED:
-            credit = Credit.objects.select_for_update().get(id=obj.credit.id)
-            credit.balance += obj.amount
-            credit.save(update_fields=["balance"])
-
-            CreditTransactionLog.objects.create(
-                credit=credit,
-                amount=obj.amount,
-                type=CreditTransactionLog.TYPE_DEPOSIT,
-            )
+            get_engine().approve_deposits([obj.id])
 
         super().save_model(request, obj, form, change)
 
+    @admin.action(description="Approve selected deposits")
+    def approve_deposits(self, request, queryset):
+        try:
+            with transaction.atomic():
+                approved = get_engine().approve_deposits(
+                    queryset.values_list("id", flat=True)
+                )
+        except CreditLocked as e:
+            self.message_user(request, e.detail, messages.ERROR)
+            return
+
+        self.message_user(
+            request, f"Approved {len(approved)} deposits.", messages.SUCCESS
+        )
+
 
 admin.site.register(Deposit, DepositRequestAdmin)
+
+
+class CreditCheckpointAdmin(admin.ModelAdmin):
+    list_display = ["credit", "balance", "difference", "last_log_id", "checked_at"]
+    readonly_fields = list_display
+    ordering = ["-difference"]
+
+
+class ReconciliationPassAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "started_at",
+        "finished_at",
+        "chunks",
+        "chunks_done",
+        "credits_checked",
+        "mismatches",
+        "last_log_id",
+    ]
+
+
+admin.site.register(CreditCheckpoint, CreditCheckpointAdmin)
+admin.site.register(ReconciliationPass, ReconciliationPassAdmin)
+
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "type", "seller", "created_at", "dispatched_at"]
+    list_filter = ["type"]
+    readonly_fields = ["type", "seller", "payload", "created_at", "dispatched_at"]
+
+
+admin.site.register(OutboxEvent, OutboxEventAdmin)
@@ -0,0 +1,20 @@
+from config.async_views import AsyncReadMixin as BaseAsyncReadMixin
+
+from .authentication import get_principal
+from .pagination import LimitOffsetOrCursorPagination
+
+
+class AsyncReadMixin(BaseAsyncReadMixin):
+    async def aauthenticate(self, request):
+        await super().aauthenticate(request)
+
+        # Permissions and querysets read the principal synchronously, so its
+        # ids must be loaded before they run.
+        if request.user.is_authenticated:
+            await get_principal(request).aload()
+
+    def get_async_paginator(self, request):
+        paginator = self.paginator
+        if isinstance(paginator, LimitOffsetOrCursorPagination):
+            return paginator.limit_offset, not paginator.is_cursor_request(request)
+        return super().get_async_paginator(request)
@@ -0,0 +1,123 @@
+from django.db.models import F
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from .models import Credit, Seller
+
+
+class Principal:
+    def __init__(self, user, ids=None):
+        self.user = user
+        if ids is not None:
+            self.ids = ids
+
+    @cached_property
+    def ids(self):
+        # Principals built without a token (sessions, force_authenticate in
+        # tests) resolve the ids with one query on first use.
+        ids = Seller.objects.filter(user=self.user).values_list("id", "credit__id")
+        return ids.first() or (None, None)
+
+    async def aload(self):
+        if "ids" not in self.__dict__:
+            ids = Seller.objects.filter(user=self.user).values_list("id", "credit__id")
+            self.ids = await ids.afirst() or (None, None)
+        return self
+
+    @property
+    def seller_id(self):
+        return self.ids[0]
+
+    @property
+    def credit_id(self):
+        return self.ids[1]
+
+    @property
+    def is_staff(self):
+        return self.user.is_staff
+
+    @cached_property
+    def seller(self):
+        # Only the ids are known; engines need nothing else from the seller
+        # and lock or re-read the credit themselves.
+        seller = Seller(id=self.seller_id, user=self.user)
+        seller.credit = Credit(id=self.credit_id, seller=seller)
+        return seller
+
+
+class PrincipalTokenAuthentication(TokenAuthentication):
+    def authenticate(self, request):
+        return self.attach_principal(request, super().authenticate(request))
+
+    def get_token_queryset(self):
+        return (
+            self.get_model()
+            .objects.select_related("user")
+            .annotate(
+                seller_id=F("user__seller__id"),
+                credit_id=F("user__seller__credit__id"),
+            )
+        )
+
+    def authenticate_credentials(self, key):
+        try:
+            token = self.get_token_queryset().get(key=key)
+        except self.get_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        return self.check_token(token)
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        try:
+            token = await self.get_token_queryset().aget(key=key)
+        except self.get_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        return self.attach_principal(request, self.check_token(token))
+
+    def get_key(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. No credentials provided.")
+            )
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header. Token string should not contain spaces.")
+            )
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _(
+                    "Invalid token header. "
+                    "Token string should not contain invalid characters."
+                )
+            )
+
+    def check_token(self, token):
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (token.user, token)
+
+    def attach_principal(self, request, result):
+        if result is not None:
+            user, token = result
+            request.principal = Principal(user, (token.seller_id, token.credit_id))
+        return result
+
+
+def get_principal(request):
+    principal = getattr(request, "principal", None)
+    if principal is None or principal.user is not request.user:
+        principal = request.principal = Principal(request.user)
+    return principal
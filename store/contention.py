@@ -0,0 +1,120 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django_redis import get_redis_connection
+from prometheus_client import Counter, Histogram
+
+from .exceptions import CreditLocked
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+LOCK_WAIT_SECONDS = Histogram(
+    "store_lock_wait_seconds",
+    "Time spent acquiring row locks on seller balances.",
+    ["path"],
+    buckets=BUCKETS + (float("inf"),),
+)
+LOCK_HOLD_SECONDS = Histogram(
+    "store_lock_hold_seconds",
+    "Time from acquiring row locks on seller balances to commit.",
+    ["path"],
+    buckets=BUCKETS + (float("inf"),),
+)
+LOCK_FAILURES = Counter(
+    "store_lock_failures",
+    "Row locks on seller balances given up under NOWAIT or lock_timeout.",
+    ["path"],
+)
+
+WAIT_KEY = "store:contention:wait:{}"
+FAILED_KEY = "store:contention:failed:{}"
+
+
+def get_redis():
+    return get_redis_connection("default")
+
+
+def nowait():
+    return settings.STORE_LOCK_NOWAIT
+
+
+def current_hour():
+    return int(time.time() // 3600)
+
+
+def record(seller_ids, wait, failed=False):
+    hour = current_hour()
+    ttl = (settings.STORE_LOCK_CONTENTION_HOURS + 1) * 3600
+
+    pipeline = get_redis().pipeline(transaction=False)
+    for key, amount in [(WAIT_KEY, wait), (FAILED_KEY, 1 if failed else 0)]:
+        if not amount:
+            continue
+        for seller_id in seller_ids:
+            pipeline.zincrby(key.format(hour), amount, seller_id)
+        pipeline.expire(key.format(hour), ttl)
+    pipeline.execute()
+
+
+def top(count=10, hours=1, by="wait"):
+    """
+    Sellers with the most lock wait seconds, or the most failed locks when
+    ``by`` is "failed", over the last ``hours`` hours, as ``(seller_id,
+    total)`` pairs.
+    """
+    key = {"wait": WAIT_KEY, "failed": FAILED_KEY}[by]
+    hour = current_hour()
+    keys = [key.format(hour - offset) for offset in range(hours)]
+
+    rows = get_redis().zunion(keys, withscores=True)
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return [(int(seller_id), total) for seller_id, total in rows[:count]]
+
+
+def set_lock_timeout(milliseconds=None):
+    with connection.cursor() as cursor:
+        if milliseconds is None:
+            cursor.execute("SET LOCAL lock_timeout = DEFAULT")
+        else:
+            cursor.execute("SET LOCAL lock_timeout = %s", [f"{milliseconds}ms"])
+
+
+@contextmanager
+def timed(path, *seller_ids):
+    """
+    Time the row locks taken inside the block under ``path``. The wait is
+    observed when the block exits and the hold when the transaction commits.
+    Waits of at least STORE_LOCK_CONTENTION_MS count towards the sellers'
+    contention totals. Statements in the block give up on a lock after
+    STORE_LOCK_TIMEOUT_MS, and a lock that cannot be had raises CreditLocked.
+    """
+    timeout = settings.STORE_LOCK_TIMEOUT_MS
+    if timeout:
+        set_lock_timeout(timeout)
+
+    started = time.perf_counter()
+    try:
+        yield
+    except OperationalError as e:
+        if getattr(e.__cause__, "pgcode", None) != LOCK_NOT_AVAILABLE:
+            raise
+        LOCK_FAILURES.labels(path).inc()
+        record(seller_ids, time.perf_counter() - started, failed=True)
+        raise CreditLocked from e
+
+    acquired = time.perf_counter()
+    wait = acquired - started
+    LOCK_WAIT_SECONDS.labels(path).observe(wait)
+    if timeout:
+        set_lock_timeout()
+
+    def committed():
+        LOCK_HOLD_SECONDS.labels(path).observe(time.perf_counter() - acquired)
+        if seller_ids and wait * 1000 >= settings.STORE_LOCK_CONTENTION_MS:
+            record(seller_ids, wait)
+
+    transaction.on_commit(committed)
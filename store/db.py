@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+@contextmanager
+def snapshot(using=DEFAULT_DB_ALIAS):
+    # Reads inside the block see one consistent snapshot. Inside an already
+    # open transaction the isolation level can no longer be changed, so the
+    # block simply joins it.
+    connection = connections[using]
+    is_outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if is_outermost:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        yield
@@ -0,0 +1,370 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import contention, hot_ledger, response_cache, stripes, summaries
+from .models import (
+    Credit,
+    CreditTransactionLog,
+    Deposit,
+    OutboxEvent,
+    Sale,
+    SaleIdempotencyKey,
+    SellerSummary,
+)
+
+
+class InsufficientBalance(Exception):
+    def __init__(self, indexes=(0,)):
+        super().__init__()
+        self.indexes = list(indexes)
+
+
+def plan_sales(balance, items, partial):
+    accepted, rejected = [], []
+    for index, item in enumerate(items):
+        if item["amount"] <= balance:
+            balance -= item["amount"]
+            accepted.append(index)
+        else:
+            rejected.append(index)
+
+    if rejected and not partial:
+        raise InsufficientBalance(rejected)
+    return accepted
+
+
+class LockingEngine:
+    def lock_credit(self, **lookup):
+        return Credit.objects.select_for_update(nowait=contention.nowait()).get(
+            **lookup
+        )
+
+    def create_sale(self, seller, validated_data):
+        with contention.timed("sale", seller.id):
+            credit = self.lock_credit(seller=seller)
+        amount = validated_data["amount"]
+
+        if amount > credit.balance:
+            raise InsufficientBalance
+
+        credit.balance -= amount
+        credit.save(update_fields=["balance"])
+
+        return self.record_sale(
+            credit.id, seller, validated_data, balance_after=credit.balance
+        )
+
+    def create_sales(self, seller, items, partial=False):
+        with contention.timed("sale", seller.id):
+            credit = self.lock_credit(seller=seller)
+        balance = credit.balance
+        accepted = plan_sales(balance, items, partial)
+
+        credit.balance -= sum(items[index]["amount"] for index in accepted)
+        credit.save(update_fields=["balance"])
+
+        return self.record_sales(credit.id, seller, items, accepted, balance)
+
+    def approve_deposits(self, deposit_ids):
+        # Deposit rows are locked before credits, both in id order. A deposit
+        # approved or rejected concurrently no longer matches the filter once
+        # its lock is released, so it is never credited twice.
+        deposits = list(
+            Deposit.objects.select_for_update(of=("self",))
+            .annotate(seller_id=F("credit__seller_id"))
+            .filter(id__in=deposit_ids, status=Deposit.STATUS_PENDING)
+            .order_by("id")
+        )
+        if not deposits:
+            return []
+
+        totals = {}
+        for deposit in deposits:
+            amount, count = totals.get(deposit.credit_id, (0, 0))
+            totals[deposit.credit_id] = (amount + deposit.amount, count + 1)
+
+        # The approval wait also covers crediting the balances, which the
+        # striped engine does stripe by stripe under the same locks.
+        seller_ids = sorted({deposit.seller_id for deposit in deposits})
+        with contention.timed("approval", *seller_ids):
+            balances = self.deposit_totals(
+                {credit_id: amount for credit_id, (amount, _) in totals.items()}
+            )
+
+        logs = []
+        for deposit in deposits:
+            balances[deposit.credit_id] += deposit.amount
+            logs.append(
+                CreditTransactionLog(
+                    credit_id=deposit.credit_id,
+                    amount=deposit.amount,
+                    balance_after=balances[deposit.credit_id],
+                    type=CreditTransactionLog.TYPE_DEPOSIT,
+                )
+            )
+        CreditTransactionLog.objects.bulk_create(logs)
+
+        approved_at = timezone.now()
+        Deposit.objects.filter(id__in=[deposit.id for deposit in deposits]).update(
+            status=Deposit.STATUS_APPROVED, updated_at=approved_at
+        )
+        OutboxEvent.objects.record_deposits(deposits, approved_at)
+        summaries.add_credit_deposits(totals)
+        response_cache.bump_credits(*totals)
+
+        for deposit in deposits:
+            deposit.status = Deposit.STATUS_APPROVED
+        return deposits
+
+    def deposit_totals(self, totals):
+        credits = list(
+            Credit.objects.select_for_update(nowait=contention.nowait())
+            .filter(id__in=totals)
+            .order_by("id")
+        )
+        balances = {credit.id: credit.balance for credit in credits}
+        for credit in credits:
+            credit.balance += totals[credit.id]
+        Credit.objects.bulk_update(credits, ["balance"])
+        return balances
+
+    def record_sale(
+        self, credit_id, seller, validated_data, slot=0, balance_after=None
+    ):
+        CreditTransactionLog.objects.create(
+            credit_id=credit_id,
+            amount=-validated_data["amount"],
+            balance_after=balance_after,
+            type=CreditTransactionLog.TYPE_SALE,
+        )
+        summaries.add_sale(seller.id, validated_data["amount"], slot=slot)
+        sale = Sale.objects.create(seller=seller, **validated_data)
+        SaleIdempotencyKey.objects.record([sale])
+        OutboxEvent.objects.record_sales([sale])
+        response_cache.bump(seller.id)
+        return sale
+
+    def record_sales(self, credit_id, seller, items, accepted, balance):
+        logs = []
+        for index in accepted:
+            balance -= items[index]["amount"]
+            logs.append(
+                CreditTransactionLog(
+                    credit_id=credit_id,
+                    amount=-items[index]["amount"],
+                    balance_after=balance,
+                    type=CreditTransactionLog.TYPE_SALE,
+                )
+            )
+        CreditTransactionLog.objects.bulk_create(logs)
+        sales = Sale.objects.bulk_create(
+            [Sale(seller=seller, **items[index]) for index in accepted]
+        )
+        SaleIdempotencyKey.objects.record(sales)
+        OutboxEvent.objects.record_sales(sales)
+        if accepted:
+            summaries.add_sale(
+                seller.id,
+                sum(items[index]["amount"] for index in accepted),
+                count=len(accepted),
+            )
+            response_cache.bump(seller.id)
+
+        results = [None] * len(items)
+        for index, sale in zip(accepted, sales):
+            results[index] = sale
+        return results
+
+
+class StripedEngine(LockingEngine):
+    def create_sale(self, seller, validated_data):
+        credit_id = seller.credit.id
+        with contention.timed("sale", seller.id):
+            slot = stripes.debit(credit_id, validated_data["amount"])
+        if slot is None:
+            raise InsufficientBalance
+
+        # Summaries are striped like the balance so that the summary row does
+        # not become the new per-seller lock. Only one stripe is held, so the
+        # credit's running balance is unknown and left for balance_at to sum.
+        return self.record_sale(credit_id, seller, validated_data, slot=slot)
+
+    def create_sales(self, seller, items, partial=False):
+        credit_id = seller.credit.id
+        with contention.timed("sale", seller.id):
+            locked = stripes.lock_stripes(credit_id)
+        balance = sum(stripe.balance for stripe in locked)
+        accepted = plan_sales(balance, items, partial)
+
+        if accepted:
+            stripes.debit_locked(
+                locked, sum(items[index]["amount"] for index in accepted)
+            )
+
+        return self.record_sales(credit_id, seller, items, accepted, balance)
+
+    def deposit_totals(self, totals):
+        balances = {}
+        for credit_id in sorted(totals):
+            locked = stripes.deposit(credit_id, totals[credit_id])
+            balances[credit_id] = (
+                sum(stripe.balance for stripe in locked) - totals[credit_id]
+            )
+        return balances
+
+
+class StatementEngine(LockingEngine):
+    SALE_SQL = """
+        WITH debited AS (
+            UPDATE {credit} SET balance = balance - %(amount)s
+            WHERE seller_id = %(seller_id)s AND balance >= %(amount)s
+            RETURNING id, balance
+        ), logged AS (
+            INSERT INTO {log} (credit_id, amount, balance_after, type, created_at)
+            SELECT id, -%(amount)s, balance, %(type)s, %(created_at)s FROM debited
+        ), summarized AS (
+            INSERT INTO {summary} (
+                seller_id,
+                slot,
+                total_sales,
+                sales_count,
+                total_approved_deposits,
+                approved_deposits_count,
+                updated_at
+            )
+            SELECT %(seller_id)s, 0, %(amount)s, 1, 0, 0, %(created_at)s
+            FROM debited
+            ON CONFLICT (seller_id, slot) DO UPDATE SET
+                total_sales = {summary}.total_sales + EXCLUDED.total_sales,
+                sales_count = {summary}.sales_count + 1,
+                updated_at = EXCLUDED.updated_at
+        ), inserted AS (
+            INSERT INTO {sale}
+                (seller_id, amount, phone_number, idempotency_key, created_at)
+            SELECT
+                %(seller_id)s,
+                %(amount)s,
+                %(phone_number)s,
+                %(idempotency_key)s,
+                %(created_at)s
+            FROM debited
+            RETURNING id
+        ), keyed AS (
+            INSERT INTO {sale_key} (seller_id, key, sale_id, created_at)
+            SELECT %(seller_id)s, %(idempotency_key)s, id, %(created_at)s
+            FROM inserted
+            WHERE %(idempotency_key)s IS NOT NULL
+        ), evented AS (
+            INSERT INTO {outbox} (seller_id, type, payload, created_at)
+            SELECT
+                %(seller_id)s,
+                %(event_type)s,
+                jsonb_build_object('id', id) || %(event_payload)s::jsonb,
+                %(created_at)s
+            FROM inserted
+        )
+        SELECT id FROM inserted
+    """
+
+    def get_sale_sql(self):
+        quote_name = connection.ops.quote_name
+        return self.SALE_SQL.format(
+            credit=quote_name(Credit._meta.db_table),
+            log=quote_name(CreditTransactionLog._meta.db_table),
+            sale=quote_name(Sale._meta.db_table),
+            summary=quote_name(SellerSummary._meta.db_table),
+            sale_key=quote_name(SaleIdempotencyKey._meta.db_table),
+            outbox=quote_name(OutboxEvent._meta.db_table),
+        )
+
+    def create_sale(self, seller, validated_data):
+        sale = Sale(seller=seller, created_at=timezone.now(), **validated_data)
+
+        # The guarded UPDATE waits for the credit row inside the statement, so
+        # the whole statement counts as the wait.
+        with contention.timed("sale", seller.id), connection.cursor() as cursor:
+            cursor.execute(
+                self.get_sale_sql(),
+                {
+                    "seller_id": seller.id,
+                    "amount": sale.amount,
+                    "phone_number": sale.phone_number,
+                    "idempotency_key": sale.idempotency_key,
+                    "type": CreditTransactionLog.TYPE_SALE,
+                    "created_at": sale.created_at,
+                    "event_type": OutboxEvent.TYPE_SALE_CREATED,
+                    "event_payload": json.dumps(OutboxEvent.objects.sale_payload(sale)),
+                },
+            )
+            row = cursor.fetchone()
+
+        # The guarded UPDATE matched no row, so nothing was inserted either.
+        if row is None:
+            raise InsufficientBalance
+
+        response_cache.bump(seller.id)
+        sale.id = row[0]
+        sale._state.adding = False
+        return sale
+
+
+class RedisEngine(LockingEngine):
+    def create_sale(self, seller, validated_data):
+        return self.create_sales(seller, [validated_data])[0]
+
+    def create_sales(self, seller, items, partial=False):
+        created_at = timezone.now()
+        sales = [
+            Sale(id=sale_id, seller=seller, created_at=created_at, **item)
+            for sale_id, item in zip(hot_ledger.next_sale_ids(len(items)), items)
+        ]
+
+        # Sales are persisted later by the flush_hot_ledger task; only their ids
+        # come from Postgres here.
+        is_applied, flags = hot_ledger.debit(seller.credit.id, sales, partial)
+        if not is_applied:
+            raise InsufficientBalance(
+                index for index, flag in enumerate(flags) if not flag
+            )
+
+        for sale in sales:
+            sale._state.adding = False
+        return [sale if flag else None for sale, flag in zip(sales, flags)]
+
+    def deposit_totals(self, totals):
+        balances = super().deposit_totals(totals)
+
+        # Incrementing the Redis balance after commit would count the deposit
+        # twice if the balance was reloaded from Postgres in between. The keys
+        # are dropped instead and reloaded on the next sale.
+        transaction.on_commit(lambda: hot_ledger.forget_balances(totals))
+        return balances
+
+
+ENGINES = {
+    "locking": LockingEngine,
+    "striped": StripedEngine,
+    "statement": StatementEngine,
+    "redis": RedisEngine,
+}
+
+
+def get_engine():
+    try:
+        engine_class = ENGINES[settings.STORE_SALE_ENGINE]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown STORE_SALE_ENGINE {settings.STORE_SALE_ENGINE!r}."
+        )
+
+    if engine_class is StripedEngine and not settings.STORE_CREDIT_STRIPES:
+        raise ImproperlyConfigured(
+            "The striped engine requires STORE_CREDIT_STRIPES to be at least 1."
+        )
+
+    return engine_class()
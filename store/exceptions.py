@@ -0,0 +1,15 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class LedgerUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Balances are being rebuilt, try again shortly."
+    default_code = "ledger_unavailable"
+
+
+class CreditLocked(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "This seller's balance is busy, try again shortly."
+    default_code = "credit_locked"
+    wait = 1
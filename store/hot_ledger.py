@@ -0,0 +1,386 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+
+from .exceptions import LedgerUnavailable
+from . import response_cache, summaries
+from .models import (
+    Credit,
+    CreditTransactionLog,
+    OutboxEvent,
+    Sale,
+    SaleIdempotencyKey,
+)
+
+STREAM = "store:hot:ledger"
+GROUP = "store-flusher"
+PAUSED = "store:hot:paused"
+
+CLAIM_IDLE_MS = 30_000
+
+# ARGV holds a partial flag, the number of stream fields per sale and then, for
+# each sale, its amount in cents followed by its stream fields. Returns {-3}
+# while paused, {-1} when the balance was never loaded, otherwise a status
+# (0 applied, -2 rejected as a whole) followed by one accepted flag per sale.
+DEBIT_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    return {-3}
+end
+local balance = redis.call('GET', KEYS[1])
+if not balance then
+    return {-1}
+end
+balance = tonumber(balance)
+local partial = ARGV[1] == '1'
+local width = tonumber(ARGV[2])
+local flags = {}
+local total = 0
+local rejected = false
+for i = 3, #ARGV, width + 1 do
+    local amount = tonumber(ARGV[i])
+    if amount <= balance - total then
+        total = total + amount
+        table.insert(flags, 1)
+    else
+        rejected = true
+        table.insert(flags, 0)
+    end
+end
+if rejected and not partial then
+    return {-2, unpack(flags)}
+end
+local n = 0
+for i = 3, #ARGV, width + 1 do
+    n = n + 1
+    if flags[n] == 1 then
+        redis.call('XADD', KEYS[3], '*', unpack(ARGV, i + 1, i + width))
+    end
+end
+redis.call('DECRBY', KEYS[1], total)
+redis.call('INCRBY', KEYS[2], total)
+return {0, unpack(flags)}
+"""
+
+# Acknowledging an entry and releasing its pending amount happen together, and
+# only for entries this call actually removed from the group's pending list, so
+# a re-claimed entry can never be released twice. Entries flagged as refunds
+# were never written to Postgres and give their amount back to a loaded
+# balance.
+ACK_SCRIPT = """
+local released = 0
+for i = 1, #ARGV, 4 do
+    if redis.call('XACK', KEYS[1], KEYS[2], ARGV[i]) == 1 then
+        redis.call('DECRBY', 'store:hot:pending:' .. ARGV[i + 1], ARGV[i + 2])
+        if ARGV[i + 3] == '1' then
+            local balance = 'store:hot:balance:' .. ARGV[i + 1]
+            if redis.call('EXISTS', balance) == 1 then
+                redis.call('INCRBY', balance, ARGV[i + 2])
+            end
+        end
+        redis.call('XDEL', KEYS[1], ARGV[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+# ARGV holds pairs of a stream entry id and its amount in cents, for entries
+# already written to Postgres, followed by the Postgres balance in cents. The
+# amounts of those still in the stream are still counted as pending, so they
+# are taken off the pending amount.
+LOAD_SCRIPT = """
+local pending = tonumber(redis.call('GET', KEYS[2]) or '0')
+for i = 1, #ARGV - 1, 2 do
+    if #redis.call('XRANGE', KEYS[3], ARGV[i], ARGV[i]) == 1 then
+        pending = pending - tonumber(ARGV[i + 1])
+    end
+end
+redis.call('SET', KEYS[1], tonumber(ARGV[#ARGV]) - pending, 'NX')
+"""
+
+
+def get_redis():
+    return get_redis_connection("default")
+
+
+def balance_key(credit_id):
+    return f"store:hot:balance:{credit_id}"
+
+
+def pending_key(credit_id):
+    return f"store:hot:pending:{credit_id}"
+
+
+def to_cents(amount):
+    return int(amount * 100)
+
+
+def next_sale_ids(count):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [Sale._meta.db_table, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def load_balance(credit_id):
+    redis = get_redis()
+
+    # With the credit locked no flush can commit for it, and with its key
+    # missing no sale can be added to the stream. A flush that committed but
+    # has not acknowledged its entries yet is the only thing left to correct
+    # for, and LOAD_SCRIPT checks which of them are still pending as it sets
+    # the balance.
+    with transaction.atomic():
+        balance = (
+            Credit.objects.select_for_update()
+            .values_list("balance", flat=True)
+            .get(id=credit_id)
+        )
+        entries = [
+            (entry_id, decode(fields))
+            for entry_id, fields in redis.xrange(STREAM)
+            if fields[b"credit_id"] == str(credit_id).encode()
+        ]
+        flushed = set(
+            Sale.objects.filter(
+                id__in=[entry["sale_id"] for _, entry in entries]
+            ).values_list("id", flat=True)
+        )
+        args = []
+        for entry_id, entry in entries:
+            if entry["sale_id"] in flushed:
+                args += [entry_id, to_cents(entry["amount"])]
+
+        keys = [balance_key(credit_id), pending_key(credit_id), STREAM]
+        redis.eval(LOAD_SCRIPT, len(keys), *keys, *args, to_cents(balance))
+
+
+def stream_fields(credit_id, sale):
+    return [
+        "sale_id",
+        sale.id,
+        "seller_id",
+        sale.seller_id,
+        "credit_id",
+        credit_id,
+        "amount",
+        str(sale.amount),
+        "phone_number",
+        sale.phone_number,
+        "idempotency_key",
+        sale.idempotency_key or "",
+        "created_at",
+        sale.created_at.isoformat(),
+    ]
+
+
+def debit(credit_id, sales, partial=False):
+    redis = get_redis()
+    keys = [balance_key(credit_id), pending_key(credit_id), STREAM, PAUSED]
+    args = [int(partial), len(stream_fields(credit_id, sales[0]))]
+    for sale in sales:
+        args += [to_cents(sale.amount), *stream_fields(credit_id, sale)]
+
+    result = redis.eval(DEBIT_SCRIPT, len(keys), *keys, *args)
+    if result[0] == -1:
+        load_balance(credit_id)
+        result = redis.eval(DEBIT_SCRIPT, len(keys), *keys, *args)
+
+    if result[0] == -3:
+        raise LedgerUnavailable
+    return result[0] == 0, [flag == 1 for flag in result[1:]]
+
+
+def forget_balances(credit_ids):
+    get_redis().delete(*[balance_key(credit_id) for credit_id in credit_ids])
+
+
+def ensure_group(redis):
+    try:
+        redis.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def read_batch(redis, consumer, batch_size, claim_idle_ms):
+    claimed = redis.xautoclaim(
+        STREAM, GROUP, consumer, claim_idle_ms, start_id="0-0", count=batch_size
+    )
+    if claimed[1]:
+        return claimed[1]
+
+    batch = redis.xreadgroup(GROUP, consumer, {STREAM: ">"}, count=batch_size)
+    return batch[0][1] if batch else []
+
+
+def decode(fields):
+    fields = {key.decode(): value.decode() for key, value in fields.items()}
+    return {
+        "sale_id": int(fields["sale_id"]),
+        "seller_id": int(fields["seller_id"]),
+        "credit_id": int(fields["credit_id"]),
+        "amount": Decimal(fields["amount"]),
+        "phone_number": fields["phone_number"],
+        "idempotency_key": fields.get("idempotency_key") or None,
+        "created_at": parse_datetime(fields["created_at"]),
+    }
+
+
+def drop_replayed(entries):
+    used = set(
+        SaleIdempotencyKey.objects.filter(
+            seller_id__in={entry["seller_id"] for entry in entries},
+            key__in={
+                entry["idempotency_key"]
+                for entry in entries
+                if entry["idempotency_key"]
+            },
+        ).values_list("seller_id", "key")
+    )
+
+    # A retry that slipped past the idempotency cache was debited twice in
+    # Redis. Only the first sale with a key is kept; the rest are refunded
+    # when their entries are acknowledged.
+    kept, dropped = [], []
+    for entry in entries:
+        key = (entry["seller_id"], entry["idempotency_key"])
+        if entry["idempotency_key"] and key in used:
+            dropped.append(entry)
+            continue
+        used.add(key)
+        kept.append(entry)
+    return kept, dropped
+
+
+@transaction.atomic
+def apply(entries):
+    # The credits are locked before looking for sales that are already
+    # written, so a second flush of the same entries (rebuild claiming a batch
+    # the flusher still works on) waits for the first and then skips them.
+    credits = list(
+        Credit.objects.select_for_update()
+        .filter(id__in={entry["credit_id"] for entry in entries})
+        .order_by("id")
+    )
+    existing = set(
+        Sale.objects.filter(id__in=[entry["sale_id"] for entry in entries]).values_list(
+            "id", flat=True
+        )
+    )
+    entries = [entry for entry in entries if entry["sale_id"] not in existing]
+    entries, dropped = drop_replayed(entries)
+    refunds = {entry["sale_id"] for entry in dropped}
+    if not entries:
+        return refunds
+
+    balances = {credit.id: credit.balance for credit in credits}
+    balances_after = []
+    for entry in entries:
+        balances[entry["credit_id"]] -= entry["amount"]
+        balances_after.append(balances[entry["credit_id"]])
+    for credit in credits:
+        credit.balance = balances[credit.id]
+    Credit.objects.bulk_update(credits, ["balance"])
+
+    sales = Sale.objects.bulk_create(
+        [
+            Sale(
+                id=entry["sale_id"],
+                seller_id=entry["seller_id"],
+                amount=entry["amount"],
+                phone_number=entry["phone_number"],
+                idempotency_key=entry["idempotency_key"],
+                created_at=entry["created_at"],
+            )
+            for entry in entries
+        ]
+    )
+    SaleIdempotencyKey.objects.record(sales)
+    CreditTransactionLog.objects.bulk_create(
+        [
+            CreditTransactionLog(
+                credit_id=entry["credit_id"],
+                amount=-entry["amount"],
+                balance_after=balance_after,
+                type=CreditTransactionLog.TYPE_SALE,
+            )
+            for entry, balance_after in zip(entries, balances_after)
+        ]
+    )
+
+    totals = {}
+    for entry in entries:
+        amount, count = totals.get(entry["seller_id"], (0, 0))
+        totals[entry["seller_id"]] = (amount + entry["amount"], count + 1)
+    summaries.add_sales(totals)
+    response_cache.bump(*totals)
+
+    # auto_now_add overwrites created_at on insert; put back the time the sale
+    # was accepted. Ledger rows keep the flush time, the moment their
+    # balance_after was true, so balance_at stays ordered with deposits
+    # approved between accepting and flushing a sale.
+    for sale, entry in zip(sales, entries):
+        sale.created_at = entry["created_at"]
+    Sale.objects.bulk_update(sales, ["created_at"])
+    OutboxEvent.objects.record_sales(sales)
+    return refunds
+
+
+def flush(consumer="flusher", batch_size=500, claim_idle_ms=CLAIM_IDLE_MS):
+    redis = get_redis()
+    ensure_group(redis)
+
+    batch = read_batch(redis, consumer, batch_size, claim_idle_ms)
+    if not batch:
+        return 0
+
+    entries = [decode(fields) for _, fields in batch]
+    refunds = apply(entries)
+
+    args = []
+    for (entry_id, _), entry in zip(batch, entries):
+        args += [
+            entry_id,
+            entry["credit_id"],
+            to_cents(entry["amount"]),
+            int(entry["sale_id"] in refunds),
+        ]
+    redis.eval(ACK_SCRIPT, 2, STREAM, GROUP, *args)
+    return len(batch)
+
+
+def pause():
+    get_redis().set(PAUSED, timezone.now().isoformat())
+
+
+def is_paused():
+    return bool(get_redis().exists(PAUSED))
+
+
+def resume():
+    get_redis().delete(PAUSED)
+
+
+def rebuild(chunk_size=1000):
+    redis = get_redis()
+    pause()
+    try:
+        while redis.exists(STREAM) and redis.xlen(STREAM):
+            flush(consumer="rebuild", claim_idle_ms=0)
+
+        credits = Credit.objects.values_list("id", "balance").order_by("id")
+        for offset in range(0, credits.count(), chunk_size):
+            pipeline = redis.pipeline()
+            for credit_id, balance in credits[offset : offset + chunk_size]:
+                pipeline.set(balance_key(credit_id), to_cents(balance))
+                pipeline.delete(pending_key(credit_id))
+            pipeline.execute()
+    finally:
+        resume()
@@ -0,0 +1,116 @@
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .authentication import get_principal
+
+
+class IdempotentCreateMixin:
+    idempotency_header = "Idempotency-Key"
+    idempotency_key_max_length = 64
+    idempotency_ttl = 24 * 60 * 60
+    idempotency_wait = 10
+    idempotency_poll_interval = 0.05
+
+    idempotency_key = None
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(super().create, request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(idempotency_key=self.idempotency_key)
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        self.idempotency_key = request.headers.get(self.idempotency_header)
+        if not self.idempotency_key:
+            return handler(request, *args, **kwargs)
+
+        if len(self.idempotency_key) > self.idempotency_key_max_length:
+            raise ValidationError(
+                {
+                    self.idempotency_header: [
+                        f"Ensure this header has no more than "
+                        f"{self.idempotency_key_max_length} characters."
+                    ]
+                }
+            )
+
+        cache_key = self.get_idempotency_cache_key()
+        lock_key = f"{cache_key}:lock"
+        deadline = time.monotonic() + self.idempotency_wait
+
+        while True:
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return self.replay(stored)
+
+            if cache.add(lock_key, 1, timeout=self.idempotency_wait):
+                break
+
+            # Another request with this key is in flight; wait for its result
+            # instead of running the create a second time.
+            if time.monotonic() > deadline:
+                return Response(
+                    {"detail": "A request with this Idempotency-Key is in progress."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            time.sleep(self.idempotency_poll_interval)
+
+        try:
+            try:
+                response = handler(request, *args, **kwargs)
+            except IntegrityError:
+                response = self.get_stored_response()
+
+            if status.is_success(response.status_code):
+                cache.set(
+                    cache_key,
+                    {"status": response.status_code, "data": response.data},
+                    timeout=self.idempotency_ttl,
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    def get_idempotency_cache_key(self):
+        # Keys are scoped to the caller, who owns whatever the create writes,
+        # so two clients picking the same key never see each other's response.
+        return ":".join(
+            [
+                "idempotency",
+                self.basename,
+                self.action,
+                str(get_principal(self.request).user.pk),
+                self.idempotency_key,
+            ]
+        )
+
+    def get_idempotency_queryset(self):
+        return self.get_queryset()
+
+    def get_stored_response(self):
+        # The cache lost the response but the unique key on the row held, so
+        # the earlier request's row is returned instead of a second create.
+        instance = (
+            self.get_idempotency_queryset()
+            .filter(idempotency_key=self.idempotency_key)
+            .first()
+        )
+        if instance is None or self.action != "create":
+            return Response(
+                {"detail": "This Idempotency-Key was already used."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def replay(self, stored):
+        response = Response(stored["data"], status=stored["status"])
+        response["Idempotent-Replayed"] = "true"
+        return response
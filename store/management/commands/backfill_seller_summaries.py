@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from store import summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute stored seller aggregates from sales and approved deposits."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = 0
+        for seller_ids in summaries.seller_id_chunks(options["chunk_size"]):
+            summaries.backfill(seller_ids)
+            count += len(seller_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {count} sellers."))
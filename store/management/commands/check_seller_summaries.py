@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store import summaries
+
+FIELDS = [
+    "total_sales",
+    "sales_count",
+    "total_approved_deposits",
+    "approved_deposits_count",
+]
+
+
+class Command(BaseCommand):
+    help = "Report sellers whose stored aggregates drifted from their history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Backfill the sellers that drifted.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for seller_ids in summaries.seller_id_chunks(options["chunk_size"]):
+            drift = summaries.find_drift(seller_ids)
+            for seller_id, (expected, actual) in drift.items():
+                self.stdout.write(
+                    f"seller {seller_id}: "
+                    + ", ".join(
+                        f"{field} {stored} != {computed}"
+                        for field, computed, stored in zip(FIELDS, expected, actual)
+                        if computed != stored
+                    )
+                )
+
+            if drift and options["fix"]:
+                summaries.backfill(list(drift))
+            drifted += len(drift)
+
+        if drifted and not options["fix"]:
+            raise CommandError(f"{drifted} sellers drifted.")
+        self.stdout.write(self.style.SUCCESS(f"{drifted} sellers drifted."))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store import stripes
+
+
+class Command(BaseCommand):
+    help = "Fold striped balances back into Credit.balance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if settings.STORE_SALE_ENGINE == "striped":
+            raise CommandError(
+                "STORE_SALE_ENGINE is still striped; switch engines first."
+            )
+
+        count = 0
+        for credit_ids in stripes.striped_credit_id_chunks(options["chunk_size"]):
+            for credit_id in credit_ids:
+                stripes.collapse(credit_id)
+            count += len(credit_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Collapsed {count} credits."))
@@ -0,0 +1,65 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store import partitions, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Create sellers with a synthetic history of sales, approved deposits "
+        "and ledger rows, streamed into Postgres with COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, default=1000)
+        parser.add_argument("--sales", type=int, default=1_000_000)
+        parser.add_argument(
+            "--deposits",
+            type=int,
+            help="Planned deposits; top-ups are added where a sale needs one.",
+        )
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument(
+            "--seller-profile", choices=["uniform", "zipf"], default="uniform"
+        )
+        parser.add_argument("--zipf-s", type=float, default=1.1)
+        parser.add_argument(
+            "--time-profile", choices=["uniform", "growth"], default="uniform"
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        end = timezone.now()
+        plan = synthetic.Plan(
+            sellers=options["sellers"],
+            sales=options["sales"],
+            deposits=options["deposits"] or options["sales"] // 20,
+            start=end - timedelta(days=options["days"]),
+            end=end,
+            seller_profile=options["seller_profile"],
+            zipf_s=options["zipf_s"],
+            time_profile=options["time_profile"],
+            seed=options["seed"],
+        )
+
+        for name in partitions.ensure_range(plan.start, plan.end):
+            self.stdout.write(f"created {name}")
+
+        sales, deposits, logs = synthetic.generate(
+            plan,
+            synthetic.seller_chunks(plan, options["prefix"], options["chunk_size"]),
+            workers=options["workers"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {sales} sales, {deposits} deposits and {logs} ledger "
+                f"rows for {plan.sellers} sellers."
+            )
+        )
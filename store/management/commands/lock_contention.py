@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from store import contention
+
+
+class Command(BaseCommand):
+    help = "List the sellers whose balance locks were waited on or failed most."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--hours", type=int, default=1)
+
+    def handle(self, *args, **options):
+        for by, unit in [("wait", "s waited"), ("failed", " failed locks")]:
+            rows = contention.top(options["top"], options["hours"], by=by)
+            self.stdout.write(f"By {by} over the last {options['hours']}h:")
+            for seller_id, total in rows:
+                self.stdout.write(f"  seller {seller_id}: {total:g}{unit}")
+            if not rows:
+                self.stdout.write("  none")
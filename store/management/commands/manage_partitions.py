@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly partitions and detach expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.STORE_PARTITION_MONTHS_AHEAD,
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.STORE_PARTITION_RETENTION_MONTHS,
+            help="Detach partitions older than this many months; 0 keeps all.",
+        )
+
+    def handle(self, *args, **options):
+        for name in partitions.ensure_partitions(options["months_ahead"]):
+            self.stdout.write(f"created {name}")
+
+        if options["retention_months"]:
+            for name in partitions.detach_partitions(options["retention_months"]):
+                self.stdout.write(f"detached {name}")
+
+        for table in partitions.PARTITIONED_TABLES:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{table}: {len(partitions.get_partitions(table))} partitions."
+                )
+            )
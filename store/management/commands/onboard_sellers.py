@@ -0,0 +1,44 @@
+import csv
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from store import onboarding
+from store.serializers import SellerOnboardingSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Create sellers from a CSV file with email, password, first_name and "
+        "last_name columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = skipped = invalid = 0
+
+        with open(options["path"], newline="") as file:
+            reader = enumerate(csv.DictReader(file), start=2)
+            while chunk := list(islice(reader, options["batch_size"])):
+                rows = []
+                for line, row in chunk:
+                    serializer = SellerOnboardingSerializer(data=row)
+                    if serializer.is_valid():
+                        rows.append(serializer.validated_data)
+                    else:
+                        invalid += 1
+                        self.stderr.write(f"Line {line}: {dict(serializer.errors)}")
+
+                sellers, emails = onboarding.onboard(rows, options["batch_size"])
+                created += len(sellers)
+                skipped += len(emails)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} sellers, skipped {skipped} existing emails "
+                f"and {invalid} invalid rows."
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store import hot_ledger
+
+
+class Command(BaseCommand):
+    help = "Drain the Redis sale stream into Postgres and reload hot balances."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        hot_ledger.rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS("Hot balances rebuilt from Postgres."))
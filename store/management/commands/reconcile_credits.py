@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store import reconciliation
+
+
+class Command(BaseCommand):
+    help = "Check credit balances against the ledger rows added since their checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all-credits",
+            action="store_true",
+            help="Also check credits without new ledger rows.",
+        )
+
+    def handle(self, *args, **options):
+        reconciliation_pass = reconciliation.run_pass(options["all_credits"])
+        if reconciliation_pass is None:
+            raise CommandError("Another reconciliation pass is still running.")
+
+        for name, value in reconciliation.get_metrics().items():
+            self.stdout.write(f"{name}: {value}")
+
+        if reconciliation_pass.mismatches:
+            raise CommandError(
+                f"{reconciliation_pass.mismatches} credits do not match their ledger."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{reconciliation_pass.credits_checked} credits checked."
+            )
+        )
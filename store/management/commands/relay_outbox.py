@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store import outbox
+
+
+class Command(BaseCommand):
+    help = "Relay outbox events to the Redis stream, continuously unless --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--interval", type=float, default=0.2)
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options):
+        while True:
+            count = outbox.relay(batch_size=options["batch_size"])
+            if options["once"]:
+                break
+            if not count:
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Relayed {count} events."))
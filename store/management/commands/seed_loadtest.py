@@ -0,0 +1,89 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.authtoken.models import Token
+
+from store import onboarding
+from store.engines import get_engine
+from store.models import Credit, Deposit, Seller
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Create funded sellers and a staff user for the locust harness and write "
+        "their ids and tokens to a JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, default=100)
+        parser.add_argument("--balance", type=Decimal, default=Decimal("1000000"))
+        parser.add_argument("--prefix", default="loadtest")
+        parser.add_argument("--output", default="locustfiles/seed.json")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        emails = [
+            f"{prefix}-{index}@example.com" for index in range(options["sellers"])
+        ]
+        staff_email = f"{prefix}-staff@example.com"
+
+        onboarding.onboard([{"email": email} for email in [staff_email] + emails])
+        User.objects.filter(email=staff_email).update(is_staff=True)
+
+        users = User.objects.filter(email__in=[staff_email] + emails)
+        Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user=user) for user in users],
+            ignore_conflicts=True,
+        )
+        tokens = dict(Token.objects.filter(user__in=users).values_list("user", "key"))
+
+        sellers = list(
+            Seller.objects.filter(user__email__in=emails)
+            .select_related("user", "credit")
+            .order_by("id")
+        )
+        self.fund(sellers, options["balance"])
+
+        seed = {
+            "staff_token": tokens[users.get(email=staff_email).id],
+            "sellers": [
+                {
+                    "id": seller.id,
+                    "credit": seller.credit.id,
+                    "token": tokens[seller.user_id],
+                    "balance": str(options["balance"]),
+                }
+                for seller in sellers
+            ],
+        }
+        with open(options["output"], "w") as file:
+            json.dump(seed, file, indent=2)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(sellers)} sellers with {options['balance']} each "
+                f"into {options['output']}."
+            )
+        )
+
+    @transaction.atomic
+    def fund(self, sellers, balance):
+        # Sellers are topped up through approved deposits so the ledger,
+        # summaries and hot balances agree with the credit rows.
+        credits = Credit.objects.prefetch_related("stripes").in_bulk(
+            [seller.credit.id for seller in sellers]
+        )
+        deposits = Deposit.objects.bulk_create(
+            [
+                Deposit(credit_id=credit.id, amount=balance - credit.total_balance)
+                for credit in credits.values()
+                if credit.total_balance < balance
+            ]
+        )
+        get_engine().approve_deposits([deposit.id for deposit in deposits])
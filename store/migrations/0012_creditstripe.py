@@ -0,0 +1,46 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0011_alter_sale_seller"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CreditStripe",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("index", models.PositiveSmallIntegerField()),
+                (
+                    "balance",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+                ),
+                (
+                    "credit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stripes",
+                        to="store.credit",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="creditstripe",
+            constraint=models.UniqueConstraint(
+                fields=("credit", "index"), name="unique_credit_stripe_index"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0012_creditstripe"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="deposit",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=80, null=True),
+        ),
+        migrations.AddField(
+            model_name="sale",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=80, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="deposit",
+            constraint=models.UniqueConstraint(
+                fields=("credit", "idempotency_key"),
+                name="unique_deposit_idempotency_key",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sale",
+            constraint=models.UniqueConstraint(
+                fields=("seller", "idempotency_key"), name="unique_sale_idempotency_key"
+            ),
+        ),
+    ]
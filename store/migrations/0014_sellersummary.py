@@ -0,0 +1,53 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0013_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SellerSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slot", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "total_sales",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=14),
+                ),
+                ("sales_count", models.PositiveIntegerField(default=0)),
+                (
+                    "total_approved_deposits",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=14),
+                ),
+                ("approved_deposits_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summaries",
+                        to="store.seller",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="sellersummary",
+            constraint=models.UniqueConstraint(
+                fields=("seller", "slot"), name="unique_seller_summary_slot"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("store", "0014_sellersummary"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="credittransactionlog",
+            index=models.Index(
+                fields=["credit", "created_at", "id"], name="log_credit_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="deposit",
+            index=models.Index(
+                fields=["credit", "created_at", "id"], name="deposit_credit_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="sale",
+            index=models.Index(
+                fields=["seller", "created_at", "id"], name="sale_seller_created_idx"
+            ),
+        ),
+    ]
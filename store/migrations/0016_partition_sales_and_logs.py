@@ -0,0 +1,166 @@
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+TABLES = ["store_sale", "store_credittransactionlog"]
+
+# Fixed here rather than read from settings so the migration stays the same
+# whatever the runtime configuration; manage_partitions tops up the rest.
+MONTHS_AHEAD = 3
+
+
+def month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def backfill_sale_keys(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO store_saleidempotencykey (seller_id, key, sale_id, created_at)
+            SELECT seller_id, idempotency_key, id, created_at
+            FROM store_sale
+            WHERE idempotency_key IS NOT NULL
+            """
+        )
+
+
+def partition_table(cursor, table, boundary):
+    legacy = f"{table}_legacy"
+
+    cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id'))", [table])
+    (next_id,) = cursor.fetchone()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = %s AND indexname != %s",
+        [table, f"{table}_pkey"],
+    )
+    indexes = cursor.fetchall()
+
+    # The existing table becomes the partition holding everything up to the
+    # end of the current month. Its keys and indexes are taken over by the
+    # partitioned parent, which reuses the renamed indexes instead of
+    # rebuilding them.
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey")
+    cursor.execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY")
+    for name, _ in foreign_keys:
+        cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {name}")
+    for name, _ in indexes:
+        cursor.execute(f"ALTER INDEX {name} RENAME TO {name[:56]}_legacy")
+
+    cursor.execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    cursor.execute(
+        f"ALTER TABLE {table} ALTER COLUMN id "
+        f"ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id})"
+    )
+    cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+
+    # Validating the bound up front lets ATTACH skip its own full scan.
+    cursor.execute(
+        f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_bound "
+        "CHECK (created_at < %s) NOT VALID",
+        [boundary],
+    )
+    cursor.execute(f"ALTER TABLE {legacy} VALIDATE CONSTRAINT {legacy}_bound")
+    cursor.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        "FOR VALUES FROM (MINVALUE) TO (%s)",
+        [boundary],
+    )
+    cursor.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_bound")
+
+    for _, definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def partition_tables(apps, schema_editor):
+    boundary = add_months(month_start(timezone.now()), 1)
+
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            partition_table(cursor, table, boundary)
+
+            start = boundary
+            for _ in range(MONTHS_AHEAD):
+                end = add_months(start, 1)
+                cursor.execute(
+                    f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table} "
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+                start = end
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0015_created_at_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SaleIdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=80)),
+                ("sale_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="store.seller",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="saleidempotencykey",
+            constraint=models.UniqueConstraint(
+                fields=("seller", "key"), name="unique_sale_idempotency_key_row"
+            ),
+        ),
+        migrations.RunPython(backfill_sale_keys),
+        migrations.RemoveConstraint(
+            model_name="sale",
+            name="unique_sale_idempotency_key",
+        ),
+        migrations.RunPython(partition_tables),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["seller", "idempotency_key"], name="sale_idempotency_key_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.1.2 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+SIGN_SALES_SQL = """
+    UPDATE store_credittransactionlog SET amount = -amount WHERE type = 'SALE'
+"""
+
+# Existing rows are anchored to the current balance of their credit, so the
+# newest row's balance_after matches it and earlier rows step back from there.
+BACKFILL_SQL = """
+    WITH running AS (
+        SELECT
+            log.id,
+            log.created_at,
+            credit.balance
+                + COALESCE(
+                    (
+                        SELECT SUM(stripe.balance)
+                        FROM store_creditstripe stripe
+                        WHERE stripe.credit_id = credit.id
+                    ),
+                    0
+                )
+                - SUM(log.amount) OVER (PARTITION BY log.credit_id)
+                + SUM(log.amount) OVER (
+                    PARTITION BY log.credit_id ORDER BY log.created_at, log.id
+                ) AS balance_after
+        FROM store_credittransactionlog log
+        JOIN store_credit credit ON credit.id = log.credit_id
+    )
+    UPDATE store_credittransactionlog log
+    SET balance_after = running.balance_after
+    FROM running
+    WHERE log.id = running.id AND log.created_at = running.created_at
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0016_partition_sales_and_logs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="credittransactionlog",
+            name="balance_after",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunSQL(
+            SIGN_SALES_SQL,
+            "UPDATE store_credittransactionlog SET amount = -amount WHERE amount < 0",
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
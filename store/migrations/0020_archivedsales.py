@@ -0,0 +1,47 @@
+# Generated by Django 4.1.2 on 2026-10-18 20:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("store", "0019_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("partition", models.CharField(max_length=63)),
+                (
+                    "total_sales",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=14),
+                ),
+                ("sales_count", models.PositiveIntegerField(default=0)),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="store.seller",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="archivedsales",
+            constraint=models.UniqueConstraint(
+                fields=("partition", "seller"), name="unique_archived_sales"
+            ),
+        ),
+    ]
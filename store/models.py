@@ -1,4 +1,7 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery, Sum
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -12,10 +15,62 @@ class Seller(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class SellerSummary(models.Model):
+    seller = models.ForeignKey(
+        Seller, on_delete=models.CASCADE, related_name="summaries"
+    )
+    slot = models.PositiveSmallIntegerField(default=0)
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    sales_count = models.PositiveIntegerField(default=0)
+    total_approved_deposits = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0.00
+    )
+    approved_deposits_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "slot"], name="unique_seller_summary_slot"
+            ),
+        ]
+
+
+class ArchivedSales(models.Model):
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="+")
+    partition = models.CharField(max_length=63)
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    sales_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["partition", "seller"], name="unique_archived_sales"
+            ),
+        ]
+
+
 class Credit(models.Model):
     balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     seller = models.OneToOneField(Seller, on_delete=models.CASCADE)
 
+    @property
+    def total_balance(self):
+        return self.balance + sum(stripe.balance for stripe in self.stripes.all())
+
+
+class CreditStripe(models.Model):
+    credit = models.ForeignKey(Credit, on_delete=models.CASCADE, related_name="stripes")
+    index = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["credit", "index"], name="unique_credit_stripe_index"
+            ),
+        ]
+
 
 class Deposit(models.Model):
     STATUS_PENDING = "PENDING"
@@ -35,18 +90,104 @@ class Deposit(models.Model):
     status = models.CharField(
         max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
     )
+    idempotency_key = models.CharField(max_length=80, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["credit", "idempotency_key"],
+                name="unique_deposit_idempotency_key",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["credit", "created_at", "id"],
+                name="deposit_credit_created_idx",
+            ),
+        ]
+
 
 class Sale(models.Model):
     seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="sales")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     phone_number = models.CharField(max_length=15)
+    idempotency_key = models.CharField(max_length=80, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["seller", "created_at", "id"],
+                name="sale_seller_created_idx",
+            ),
+            models.Index(
+                fields=["seller", "idempotency_key"],
+                name="sale_idempotency_key_idx",
+            ),
+        ]
+
+
+class SaleIdempotencyKeyManager(models.Manager):
+    def record(self, sales):
+        return self.bulk_create(
+            [
+                self.model(
+                    seller_id=sale.seller_id, key=sale.idempotency_key, sale_id=sale.id
+                )
+                for sale in sales
+                if sale.idempotency_key
+            ]
+        )
+
+
+class SaleIdempotencyKey(models.Model):
+    objects = SaleIdempotencyKeyManager()
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=80)
+    sale_id = models.BigIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "key"], name="unique_sale_idempotency_key_row"
+            ),
+        ]
+
+
+class CreditTransactionLogManager(models.Manager):
+    def balance_at(self, credit_id, at):
+        logs = self.filter(credit_id=credit_id, created_at__lte=at)
+
+        # Rows written without a running balance (single-stripe sales) are
+        # added on top of the latest row that has one.
+        unbalanced = logs.filter(
+            Q(created_at__gt=OuterRef("created_at"))
+            | Q(created_at=OuterRef("created_at"), id__gt=OuterRef("id")),
+            balance_after__isnull=True,
+        )
+        latest = (
+            logs.filter(balance_after__isnull=False)
+            .order_by("-created_at", "-id")
+            .annotate(
+                unbalanced=Subquery(
+                    unbalanced.values("credit_id")
+                    .annotate(total=Sum("amount"))
+                    .values("total")
+                )
+            )
+            .values("balance_after", "unbalanced")
+            .first()
+        )
+        if latest is None:
+            return Decimal("0.00")
+        return latest["balance_after"] + (latest["unbalanced"] or 0)
+
 
 class CreditTransactionLog(models.Model):
+    objects = CreditTransactionLogManager()
     TYPE_DEPOSIT = "DEPOSIT"
     TYPE_SALE = "SALE"
 
@@ -59,5 +200,100 @@ class CreditTransactionLog(models.Model):
         Credit, on_delete=models.CASCADE, related_name="transaction_logs"
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["credit", "created_at", "id"],
+                name="log_credit_created_idx",
+            ),
+        ]
+
+
+class CreditCheckpoint(models.Model):
+    credit = models.OneToOneField(
+        Credit, on_delete=models.CASCADE, related_name="checkpoint"
+    )
+    last_log_id = models.BigIntegerField(default=0)
+    balance = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    difference = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    checked_at = models.DateTimeField(null=True)
+
+
+class ReconciliationPass(models.Model):
+    last_log_id = models.BigIntegerField()
+    chunks = models.PositiveIntegerField(default=0)
+    chunks_done = models.PositiveIntegerField(default=0)
+    credits_checked = models.PositiveIntegerField(default=0)
+    mismatches = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+
+
+class OutboxEventManager(models.Manager):
+    def sale_payload(self, sale):
+        return {
+            "seller": sale.seller_id,
+            "amount": str(sale.amount),
+            "phone_number": sale.phone_number,
+            "created_at": sale.created_at.isoformat(),
+        }
+
+    def record_sales(self, sales):
+        return self.bulk_create(
+            [
+                self.model(
+                    seller_id=sale.seller_id,
+                    type=self.model.TYPE_SALE_CREATED,
+                    payload={"id": sale.id, **self.sale_payload(sale)},
+                )
+                for sale in sales
+            ]
+        )
+
+    def record_deposits(self, deposits, approved_at):
+        return self.bulk_create(
+            [
+                self.model(
+                    seller_id=deposit.seller_id,
+                    type=self.model.TYPE_DEPOSIT_APPROVED,
+                    payload={
+                        "id": deposit.id,
+                        "seller": deposit.seller_id,
+                        "credit": deposit.credit_id,
+                        "amount": str(deposit.amount),
+                        "approved_at": approved_at.isoformat(),
+                    },
+                )
+                for deposit in deposits
+            ]
+        )
+
+
+class OutboxEvent(models.Model):
+    TYPE_SALE_CREATED = "sale.created"
+    TYPE_DEPOSIT_APPROVED = "deposit.approved"
+
+    TYPE_CHOICES = [
+        (TYPE_SALE_CREATED, "Sale created"),
+        (TYPE_DEPOSIT_APPROVED, "Deposit approved"),
+    ]
+
+    objects = OutboxEventManager()
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="+")
+    type = models.CharField(max_length=32, choices=TYPE_CHOICES)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(dispatched_at__isnull=True),
+                name="outbox_pending_idx",
+            ),
+        ]
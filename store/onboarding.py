@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from users.hashing import hash_passwords
+
+from .models import Credit, CreditStripe, Seller
+
+User = get_user_model()
+
+
+def split_new(rows):
+    emails = [User.objects.normalize_email(row["email"]) for row in rows]
+    existing = set(
+        User.objects.filter(email__in=emails).values_list("email", flat=True)
+    )
+
+    new, skipped = [], []
+    for row, email in zip(rows, emails):
+        if email in existing:
+            skipped.append(email)
+        else:
+            existing.add(email)
+            new.append({**row, "email": email})
+    return new, skipped
+
+
+@transaction.atomic
+def create_sellers(rows, passwords):
+    users = User.objects.bulk_create(
+        [
+            User(email=row["email"], password=password)
+            for row, password in zip(rows, passwords)
+        ]
+    )
+    sellers = Seller.objects.bulk_create(
+        [
+            Seller(
+                user=user,
+                first_name=row.get("first_name") or None,
+                last_name=row.get("last_name") or None,
+            )
+            for row, user in zip(rows, users)
+        ]
+    )
+    credits = Credit.objects.bulk_create([Credit(seller=seller) for seller in sellers])
+
+    if settings.STORE_SALE_ENGINE == "striped":
+        CreditStripe.objects.bulk_create(
+            [
+                CreditStripe(credit=credit, index=index)
+                for credit in credits
+                for index in range(settings.STORE_CREDIT_STRIPES)
+            ]
+        )
+    return sellers
+
+
+def onboard(rows, batch_size=1000):
+    """
+    Create a user, seller and credit for every row with bulk inserts, without
+    the post_save chain in store.signals.handlers. Emails that already exist,
+    or repeat within the rows, are skipped. Returns the created sellers and the
+    skipped emails.
+    """
+    new, skipped = split_new(rows)
+    passwords = hash_passwords(row.get("password") or None for row in new)
+
+    sellers = []
+    for start in range(0, len(new), batch_size):
+        end = start + batch_size
+        sellers += create_sellers(new[start:end], passwords[start:end])
+    return sellers, skipped
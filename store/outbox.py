@@ -0,0 +1,88 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from .models import OutboxEvent
+
+# First half of the two-key advisory lock taken per partition; the second half
+# is the partition number.
+LOCK_NAMESPACE = 17017
+
+
+def get_redis():
+    return get_redis_connection("default")
+
+
+def try_lock_partition(partition):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)", [LOCK_NAMESPACE, partition]
+        )
+        return cursor.fetchone()[0]
+
+
+def publish(events):
+    pipeline = get_redis().pipeline(transaction=False)
+    for event in events:
+        pipeline.xadd(
+            settings.STORE_OUTBOX_STREAM,
+            {
+                "id": event.id,
+                "type": event.type,
+                "seller": event.seller_id,
+                "payload": json.dumps(event.payload),
+                "created_at": event.created_at.isoformat(),
+            },
+            maxlen=settings.STORE_OUTBOX_STREAM_MAXLEN,
+            approximate=True,
+        )
+    pipeline.execute()
+
+
+@transaction.atomic
+def relay_partition(partition, batch_size=500):
+    # Events reach the stream before the rows are marked, so a crash in
+    # between delivers them again rather than losing them. Ids follow a
+    # seller's commit order only where the engine serializes the seller on
+    # its credit row; a striped sale with a lower id can commit later and is
+    # relayed after it.
+    if not try_lock_partition(partition):
+        return 0
+
+    events = list(
+        OutboxEvent.objects.alias(
+            partition=F("seller_id") % settings.STORE_OUTBOX_PARTITIONS
+        )
+        .filter(dispatched_at__isnull=True, partition=partition)
+        .order_by("id")[:batch_size]
+    )
+    if not events:
+        return 0
+
+    publish(events)
+    OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+        dispatched_at=timezone.now()
+    )
+    return len(events)
+
+
+def relay(batch_size=500, max_batches=20):
+    relayed = 0
+    for partition in range(settings.STORE_OUTBOX_PARTITIONS):
+        for _ in range(max_batches):
+            count = relay_partition(partition, batch_size)
+            relayed += count
+            if count < batch_size:
+                break
+    return relayed
+
+
+def prune(retention_hours):
+    cutoff = timezone.now() - timedelta(hours=retention_hours)
+    deleted, _ = OutboxEvent.objects.filter(dispatched_at__lt=cutoff).delete()
+    return deleted
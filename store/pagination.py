@@ -1,6 +1,69 @@
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+)
 
 
 class DefaultLimitOffsetPagination(LimitOffsetPagination):
     default_limit = 10
     max_limit = 20
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 20
+
+
+class LimitOffsetOrCursorPagination(BasePagination):
+    """
+    Limit/offset by default. Passing ``pagination=cursor`` (or following a
+    ``cursor`` link) switches to keyset pagination on ``(created_at, id)``,
+    which skips the count query and costs the same on every page.
+    """
+
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.limit_offset = DefaultLimitOffsetPagination()
+        self.cursor = CreatedAtCursorPagination()
+        self.paginator = self.limit_offset
+
+    def is_cursor_request(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_request(request):
+            self.paginator = self.cursor
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.limit_offset.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.limit_offset.get_schema_operation_parameters(view),
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' for keyset pagination.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            *[
+                parameter
+                for parameter in self.cursor.get_schema_operation_parameters(view)
+                if parameter["name"] == self.cursor.cursor_query_param
+            ],
+        ]
+
+    def to_html(self):
+        return self.paginator.to_html()
@@ -0,0 +1,160 @@
+import re
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedSales, Sale
+
+PARTITIONED_TABLES = ["store_sale", "store_credittransactionlog"]
+
+ARCHIVE_SALES_SQL = """
+    INSERT INTO {archive} (seller_id, partition, total_sales, sales_count)
+    SELECT seller_id, %s, SUM(amount), COUNT(*)
+    FROM {partition}
+    GROUP BY seller_id
+"""
+
+BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(value, months):
+    month = value.month - 1 + months
+    return value.replace(year=value.year + month // 12, month=month % 12 + 1)
+
+
+def parse_bound(bound):
+    if bound == "MINVALUE":
+        return None
+    return parse_datetime(bound.strip("'")).astimezone(dt_timezone.utc)
+
+
+def get_partitions(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match is None:
+            partitions.append((name, None, None))
+        else:
+            partitions.append(
+                (name, parse_bound(match.group(1)), parse_bound(match.group(2)))
+            )
+    return partitions
+
+
+@transaction.atomic
+def create_partition(table, start):
+    end = add_months(start, 1)
+    name = f"{table}_p{start:%Y%m}"
+    default = f"{table}_default"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} "
+            "WHERE created_at >= %s AND created_at < %s)",
+            [start, end],
+        )
+        (is_in_default,) = cursor.fetchone()
+
+        # Postgres refuses a new partition while the default partition holds
+        # rows for its range, so those rows are moved across first.
+        if is_in_default:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+
+        if is_in_default:
+            cursor.execute(
+                f"INSERT INTO {table} SELECT * FROM {default} "
+                "WHERE created_at >= %s AND created_at < %s",
+                [start, end],
+            )
+            cursor.execute(
+                f"DELETE FROM {default} WHERE created_at >= %s AND created_at < %s",
+                [start, end],
+            )
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+    return name
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    now = now or timezone.now()
+    horizon = add_months(month_start(now), months_ahead + 1)
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        uppers = [upper for _, _, upper in get_partitions(table) if upper]
+        start = max(uppers) if uppers else month_start(now)
+        while start < horizon:
+            created.append(create_partition(table, start))
+            start = add_months(start, 1)
+    return created
+
+
+def ensure_range(start, end):
+    """Create the monthly partitions missing between ``start`` and ``end``."""
+    created = []
+    for table in PARTITIONED_TABLES:
+        bounds = [(lower, upper) for _, lower, upper in get_partitions(table) if upper]
+        month = month_start(start)
+        while month < end:
+            following = add_months(month, 1)
+            is_covered = any(
+                (lower is None or lower < following) and upper > month
+                for lower, upper in bounds
+            )
+            if not is_covered:
+                created.append(create_partition(table, month))
+            month = following
+    return created
+
+
+@transaction.atomic
+def detach_partition(table, name):
+    with connection.cursor() as cursor:
+        # Seller summaries are checked against the sales still attached, so
+        # the totals of a detached month are kept for them to add back.
+        if table == Sale._meta.db_table:
+            cursor.execute(
+                ARCHIVE_SALES_SQL.format(
+                    archive=connection.ops.quote_name(ArchivedSales._meta.db_table),
+                    partition=name,
+                ),
+                [name],
+            )
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+
+
+def detach_partitions(retention_months, now=None):
+    cutoff = add_months(month_start(now or timezone.now()), -retention_months)
+
+    detached = []
+    for table in PARTITIONED_TABLES:
+        for name, _, upper in get_partitions(table):
+            if upper and upper <= cutoff:
+                detach_partition(table, name)
+                detached.append(name)
+    return detached
@@ -1,12 +1,16 @@
 from rest_framework import permissions
 
+from .authentication import get_principal
+
 
 class IsOwnerOrAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         seller_id = int(view.kwargs.get("seller_pk"))
+        principal = get_principal(request)
         if request.method in permissions.SAFE_METHODS:
-            return (request.user.seller.id == seller_id) or request.user.is_staff
-        return request.user.seller.id == seller_id
+            return (principal.seller_id == seller_id) or principal.is_staff
+        return principal.seller_id == seller_id
 
     def has_object_permission(self, request, view, obj):
-        return (obj.seller == request.user.seller) or request.user.is_staff
+        principal = get_principal(request)
+        return (obj.seller_id == principal.seller_id) or principal.is_staff
@@ -0,0 +1,175 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .db import snapshot
+from .models import Credit, CreditCheckpoint, CreditTransactionLog, ReconciliationPass
+
+logger = logging.getLogger(__name__)
+
+PASS_TIMEOUT = timedelta(minutes=30)
+METRICS_KEY = "store:reconciliation:metrics"
+METRICS_TIMEOUT = 5 * 60
+
+NEW_ROWS_SQL = """
+    SELECT
+        log.credit_id,
+        SUM(log.amount),
+        SUM(log.amount) FILTER (WHERE log.id <= %(settled_id)s),
+        MAX(log.id) FILTER (WHERE log.id <= %(settled_id)s)
+    FROM {log} log
+    LEFT JOIN {checkpoint} checkpoint ON checkpoint.credit_id = log.credit_id
+    WHERE log.credit_id = ANY(%(credit_ids)s)
+        AND log.id > COALESCE(checkpoint.last_log_id, 0)
+    GROUP BY log.credit_id
+"""
+
+
+def new_rows_sql():
+    quote_name = connection.ops.quote_name
+    return NEW_ROWS_SQL.format(
+        log=quote_name(CreditTransactionLog._meta.db_table),
+        checkpoint=quote_name(CreditCheckpoint._meta.db_table),
+    )
+
+
+def get_settled_id(since):
+    # Ids are taken at insert but rows only become visible at commit, so a
+    # slow transaction can surface below ids that were already seen. Only rows
+    # older than the settle window are folded into checkpoints.
+    cutoff = timezone.now() - timedelta(seconds=settings.STORE_RECONCILE_SETTLE_SECONDS)
+    settled_id = CreditTransactionLog.objects.filter(
+        id__gt=since, created_at__lt=cutoff
+    ).aggregate(Max("id"))["id__max"]
+    return settled_id or since
+
+
+def start_pass(all_credits=False):
+    if ReconciliationPass.objects.filter(
+        finished_at__isnull=True, started_at__gte=timezone.now() - PASS_TIMEOUT
+    ).exists():
+        return None, []
+
+    previous = (
+        ReconciliationPass.objects.filter(finished_at__isnull=False)
+        .order_by("-id")
+        .first()
+    )
+    since = previous.last_log_id if previous else 0
+    settled_id = get_settled_id(since)
+
+    if all_credits:
+        credit_ids = Credit.objects.values_list("id", flat=True)
+    else:
+        credit_ids = (
+            CreditTransactionLog.objects.filter(id__gt=since, id__lte=settled_id)
+            .order_by()
+            .values_list("credit_id", flat=True)
+            .distinct()
+        )
+    credit_ids = sorted(credit_ids)
+
+    chunk_size = settings.STORE_RECONCILE_CHUNK_SIZE
+    chunks = [
+        credit_ids[start : start + chunk_size]
+        for start in range(0, len(credit_ids), chunk_size)
+    ]
+    reconciliation = ReconciliationPass.objects.create(
+        last_log_id=settled_id,
+        chunks=len(chunks),
+        finished_at=None if chunks else timezone.now(),
+    )
+    return reconciliation, chunks
+
+
+def check_chunk(pass_id, credit_ids, settled_id):
+    now = timezone.now()
+
+    with snapshot():
+        credits = Credit.objects.filter(id__in=credit_ids).prefetch_related("stripes")
+        checkpoints = {
+            checkpoint.credit_id: checkpoint
+            for checkpoint in CreditCheckpoint.objects.filter(credit_id__in=credit_ids)
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(
+                new_rows_sql(), {"credit_ids": credit_ids, "settled_id": settled_id}
+            )
+            new_rows = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        updated, mismatched = [], []
+        for credit in credits:
+            checkpoint = checkpoints.get(credit.id) or CreditCheckpoint(credit=credit)
+            total, settled, last_settled_id = new_rows.get(credit.id, (0, None, None))
+
+            checkpoint.difference = credit.total_balance - checkpoint.balance - total
+            checkpoint.checked_at = now
+            if checkpoint.difference:
+                # The checkpoint is left where it was so the credit keeps being
+                # reported until its balance or ledger is repaired.
+                mismatched.append(checkpoint)
+                logger.warning(
+                    "Credit %s balance is off its ledger by %s.",
+                    credit.id,
+                    checkpoint.difference,
+                )
+            elif last_settled_id is not None:
+                checkpoint.balance += settled
+                checkpoint.last_log_id = last_settled_id
+            updated.append(checkpoint)
+
+        CreditCheckpoint.objects.bulk_create(
+            updated,
+            update_conflicts=True,
+            unique_fields=["credit_id"],
+            update_fields=["last_log_id", "balance", "difference", "checked_at"],
+        )
+
+    # Chunks of one pass finish concurrently, so the pass row is updated
+    # outside the snapshot with relative increments.
+    ReconciliationPass.objects.filter(id=pass_id).update(
+        credits_checked=F("credits_checked") + len(updated),
+        mismatches=F("mismatches") + len(mismatched),
+        chunks_done=F("chunks_done") + 1,
+    )
+    ReconciliationPass.objects.filter(
+        id=pass_id, chunks_done=F("chunks"), finished_at__isnull=True
+    ).update(finished_at=timezone.now())
+    cache.delete(METRICS_KEY)
+    return len(mismatched)
+
+
+def run_pass(all_credits=False):
+    reconciliation, chunks = start_pass(all_credits)
+    if reconciliation is None:
+        return None
+
+    for chunk in chunks:
+        check_chunk(reconciliation.id, chunk, reconciliation.last_log_id)
+    reconciliation.refresh_from_db()
+    return reconciliation
+
+
+def get_metrics():
+    last = (
+        ReconciliationPass.objects.filter(finished_at__isnull=False)
+        .order_by("-id")
+        .first()
+    )
+    return {
+        "last_pass_finished_at": last.finished_at if last else None,
+        "last_pass_credits_checked": last.credits_checked if last else 0,
+        "last_pass_mismatches": last.mismatches if last else 0,
+        "mismatched_credits": CreditCheckpoint.objects.exclude(difference=0).count(),
+    }
+
+
+def get_cached_metrics():
+    # Counting mismatched checkpoints scans the whole table, so scrapes reuse
+    # the figures until a chunk changes them.
+    return cache.get_or_set(METRICS_KEY, get_metrics, timeout=METRICS_TIMEOUT)
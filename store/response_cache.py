@@ -0,0 +1,168 @@
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from config.replicas import primary_reads
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Credit
+
+VERSION_KEY = "store:response:version:{}"
+STATS_KEY = "store:response:stats"
+
+
+def get_redis():
+    return get_redis_connection("default")
+
+
+def bump(*seller_ids):
+    keys = [VERSION_KEY.format(seller_id) for seller_id in seller_ids]
+    if not keys:
+        return
+
+    def incr():
+        pipeline = get_redis().pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(key)
+        pipeline.execute()
+
+    # Bumping inside the transaction stops serving the old version right away;
+    # bumping again after commit drops anything a reader cached from the
+    # pre-commit rows in between.
+    incr()
+    transaction.on_commit(incr)
+
+
+def bump_credits(*credit_ids):
+    bump(*Credit.objects.filter(id__in=credit_ids).values_list("seller_id", flat=True))
+
+
+def get_version(seller_id):
+    return int(get_redis().get(VERSION_KEY.format(seller_id)) or 0)
+
+
+def record(basename, outcome):
+    get_redis().hincrby(STATS_KEY, f"{basename}:{outcome}")
+
+
+def get_stats():
+    return {
+        field.decode(): int(count)
+        for field, count in get_redis().hgetall(STATS_KEY).items()
+    }
+
+
+class CachedResponseMixin:
+    response_cache_timeout = 5 * 60
+    response_cache_wait = 2
+    response_cache_poll_interval = 0.02
+
+    def get_cache_seller_id(self):
+        return None
+
+    def get_response_cache_key(self):
+        seller_id = self.get_cache_seller_id()
+        if seller_id is None:
+            return None
+
+        return ":".join(
+            [
+                "store:response",
+                str(seller_id),
+                str(get_version(seller_id)),
+                type(self).__name__,
+                self.action,
+                self.request.build_absolute_uri(),
+            ]
+        )
+
+    def wait_for_response(self, key):
+        deadline = time.monotonic() + self.response_cache_wait
+        while True:
+            stored = cache.get(key)
+            if stored is not None:
+                return stored, False
+
+            if cache.add(f"{key}:lock", 1, timeout=self.response_cache_wait):
+                return None, True
+
+            # Another request is already rebuilding this response; wait for it
+            # instead of hitting Postgres as well.
+            if time.monotonic() > deadline:
+                return None, False
+            time.sleep(self.response_cache_poll_interval)
+
+    def replay_response(self, stored):
+        record(type(self).__name__, "hit")
+        response = Response(stored["data"], status=stored["status"])
+        response["X-Cache"] = "hit"
+        return response
+
+    def save_response(self, key, is_leader, response):
+        record(type(self).__name__, "miss")
+        if is_leader and response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                {"status": response.status_code, "data": response.data},
+                timeout=self.response_cache_timeout,
+            )
+        response["X-Cache"] = "miss"
+        return response
+
+    def cached(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key()
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        stored, is_leader = self.wait_for_response(key)
+        if stored is not None:
+            return self.replay_response(stored)
+
+        # Cached bodies are built from the primary; a lagging replica would
+        # store old rows under the new version.
+        try:
+            with primary_reads():
+                response = handler(request, *args, **kwargs)
+            return self.save_response(key, is_leader, response)
+        finally:
+            if is_leader:
+                cache.delete(f"{key}:lock")
+
+    async def acached(self, handler, request, *args, **kwargs):
+        # Only Redis is touched here, so the calls may leave the thread that
+        # owns the database connection.
+        call = partial(sync_to_async, thread_sensitive=False)
+
+        key = await call(self.get_response_cache_key)()
+        if key is None:
+            return await handler(request, *args, **kwargs)
+
+        stored, is_leader = await call(self.wait_for_response)(key)
+        if stored is not None:
+            return await call(self.replay_response)(stored)
+
+        try:
+            with primary_reads():
+                response = await handler(request, *args, **kwargs)
+            return await call(self.save_response)(key, is_leader, response)
+        finally:
+            if is_leader:
+                await call(cache.delete)(f"{key}:lock")
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached(super().aretrieve, request, *args, **kwargs)
@@ -1,8 +1,14 @@
+from django.core import exceptions
 from django.db import transaction
 from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
 
 from rest_framework import serializers
 
+from . import onboarding
+from .authentication import get_principal
+from .engines import get_engine, InsufficientBalance
 from .models import Seller, Credit, Deposit, CreditTransactionLog, Sale
 
 User = get_user_model()
@@ -12,6 +18,8 @@ class SellerSerializer(serializers.ModelSerializer):
     balance = serializers.SerializerMethodField(read_only=True)
     total_sales = serializers.SerializerMethodField(read_only=True)
     total_deposits = serializers.SerializerMethodField(read_only=True)
+    sales_count = serializers.SerializerMethodField(read_only=True)
+    deposits_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Seller
@@ -23,33 +31,91 @@ class SellerSerializer(serializers.ModelSerializer):
             "balance",
             "total_sales",
             "total_deposits",
+            "sales_count",
+            "deposits_count",
         ]
 
     def get_balance(self, seller):
-        return seller.credit.balance
+        return seller.credit.total_balance
 
     def get_total_sales(self, seller):
-        return sum(sale.amount for sale in seller.sales.all())
+        return sum(summary.total_sales for summary in seller.summaries.all())
 
     def get_total_deposits(self, seller):
         return sum(
-            deposit.amount
-            for deposit in seller.credit.deposit_requests.all()
-            if deposit.status == "APPROVED"
+            summary.total_approved_deposits for summary in seller.summaries.all()
         )
 
+    def get_sales_count(self, seller):
+        return sum(summary.sales_count for summary in seller.summaries.all())
+
+    def get_deposits_count(self, seller):
+        return sum(
+            summary.approved_deposits_count for summary in seller.summaries.all()
+        )
+
+
+class SellerOnboardingSerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    password = serializers.CharField(
+        max_length=128, required=False, allow_blank=True, write_only=True
+    )
+    first_name = serializers.CharField(max_length=55, required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=55, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if attrs.get("password"):
+            try:
+                validate_password(attrs["password"], User(email=attrs["email"]))
+            except exceptions.ValidationError as e:
+                raise serializers.ValidationError({"password": list(e.messages)})
+        return attrs
+
+
+class OnboardedSellerSerializer(serializers.ModelSerializer):
+    email = serializers.EmailField(source="user.email")
+
+    class Meta:
+        model = Seller
+        fields = ["id", "user", "email"]
+
+
+class BulkSellerSerializer(serializers.Serializer):
+    MAX_SELLERS = 5000
+
+    sellers = SellerOnboardingSerializer(
+        many=True, allow_empty=False, max_length=MAX_SELLERS, write_only=True
+    )
+    created = OnboardedSellerSerializer(many=True, read_only=True)
+    skipped = serializers.ListField(child=serializers.EmailField(), read_only=True)
+
+    def create(self, validated_data):
+        created, skipped = onboarding.onboard(validated_data["sellers"])
+        return {"created": created, "skipped": skipped}
+
 
 class CreditTransactionLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = CreditTransactionLog
-        fields = ["id", "amount", "type", "created_at"]
+        fields = ["id", "amount", "balance_after", "type", "created_at"]
+
+
+class CreditBalanceSerializer(serializers.Serializer):
+    credit = serializers.IntegerField(read_only=True)
+    at = serializers.DateTimeField(default=timezone.now)
+    balance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
 
 class CreditSerializer(serializers.ModelSerializer):
+    balance = serializers.SerializerMethodField(read_only=True)
+
     class Meta:
         model = Credit
         fields = ["id", "seller", "balance"]
 
+    def get_balance(self, credit):
+        return credit.total_balance
+
 
 class DepositSerializer(serializers.ModelSerializer):
     class Meta:
@@ -58,10 +124,28 @@ class DepositSerializer(serializers.ModelSerializer):
         read_only_fields = ["credit", "created_at", "status"]
 
     def create(self, validated_data):
-        validated_data["credit"] = self.context["request"].user.seller.credit
+        validated_data["credit_id"] = get_principal(self.context["request"]).credit_id
         return super().create(validated_data)
 
 
+class DepositApprovalSerializer(serializers.Serializer):
+    MAX_DEPOSITS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_DEPOSITS,
+        write_only=True,
+    )
+    approved = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        ids = validated_data["deposits"].filter(id__in=validated_data["ids"])
+        approved = get_engine().approve_deposits(list(ids.values_list("id", flat=True)))
+        return {"approved": [deposit.id for deposit in approved]}
+
+
 class SaleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sale
@@ -70,11 +154,11 @@ class SaleSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        seller = self.context["request"].user.seller
-        credit = Credit.objects.select_for_update().get(seller=seller)
-        amount = validated_data["amount"]
+        seller = get_principal(self.context["request"]).seller
 
-        if amount > credit.balance:
+        try:
+            return get_engine().create_sale(seller, validated_data)
+        except InsufficientBalance:
             raise serializers.ValidationError(
                 {
                     "amount": [
@@ -83,14 +167,51 @@ class SaleSerializer(serializers.ModelSerializer):
                 }
             )
 
-        credit.balance -= amount
-        credit.save(update_fields=["balance"])
 
-        CreditTransactionLog.objects.create(
-            credit=credit,
-            amount=amount,
-            type=CreditTransactionLog.TYPE_SALE,
-        )
+class BulkSaleSerializer(serializers.Serializer):
+    MAX_SALES = 500
 
-        validated_data["seller"] = seller
-        return super().create(validated_data)
+    sales = SaleSerializer(many=True, allow_empty=False, max_length=MAX_SALES)
+    atomic = serializers.BooleanField(default=True)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        seller = get_principal(self.context["request"]).seller
+        items = validated_data["sales"]
+
+        idempotency_key = validated_data.get("idempotency_key")
+        if idempotency_key:
+            for index, item in enumerate(items):
+                item["idempotency_key"] = f"{idempotency_key}:{index}"
+
+        try:
+            results = get_engine().create_sales(
+                seller, items, partial=not validated_data["atomic"]
+            )
+        except InsufficientBalance as e:
+            raise serializers.ValidationError(
+                {
+                    "sales": [
+                        {"amount": ["Insufficient balance."]}
+                        if index in e.indexes
+                        else {}
+                        for index in range(len(items))
+                    ]
+                }
+            )
+
+        return {"atomic": validated_data["atomic"], "sales": results}
+
+    def to_representation(self, instance):
+        return {
+            "atomic": instance["atomic"],
+            "results": [
+                {"status": "created", "sale": SaleSerializer(sale).data}
+                if sale
+                else {
+                    "status": "rejected",
+                    "errors": {"amount": ["Insufficient balance."]},
+                }
+                for sale in instance["sales"]
+            ],
+        }
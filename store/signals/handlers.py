@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save
-from store.models import Seller, Credit
+from store.models import Seller, Credit, CreditStripe
 
 User = get_user_model()
 
@@ -16,3 +17,14 @@ def create_seller_for_new_user(sender, **kwargs):
 def create_credit_for_new_seller(sender, **kwargs):
     if kwargs["created"]:
         Credit.objects.create(seller=kwargs["instance"])
+
+
+@receiver(post_save, sender=Credit)
+def create_stripes_for_new_credit(sender, **kwargs):
+    if kwargs["created"] and settings.STORE_SALE_ENGINE == "striped":
+        CreditStripe.objects.bulk_create(
+            [
+                CreditStripe(credit=kwargs["instance"], index=index)
+                for index in range(settings.STORE_CREDIT_STRIPES)
+            ]
+        )
@@ -0,0 +1,129 @@
+from decimal import Decimal, ROUND_DOWN
+
+from django.conf import settings
+from django.db import transaction
+
+from .contention import nowait
+from .models import Credit, CreditStripe
+
+CENT = Decimal("0.01")
+
+
+def ensure_stripes(credit_id):
+    credit = Credit.objects.select_for_update(nowait=nowait()).get(id=credit_id)
+    existing = set(
+        CreditStripe.objects.filter(credit=credit).values_list("index", flat=True)
+    )
+    CreditStripe.objects.bulk_create(
+        [
+            CreditStripe(credit=credit, index=index)
+            for index in range(settings.STORE_CREDIT_STRIPES)
+            if index not in existing
+        ]
+    )
+
+    # Funds held on the Credit row itself are moved into the first stripe so
+    # that sales only ever have to look at stripes.
+    if credit.balance:
+        stripe = CreditStripe.objects.select_for_update(nowait=nowait()).get(
+            credit=credit, index=0
+        )
+        stripe.balance += credit.balance
+        stripe.save(update_fields=["balance"])
+        credit.balance = 0
+        credit.save(update_fields=["balance"])
+
+    return credit
+
+
+def lock_stripes(credit_id):
+    ensure_stripes(credit_id)
+    return list(
+        CreditStripe.objects.select_for_update(nowait=nowait())
+        .filter(credit_id=credit_id)
+        .order_by("index")
+    )
+
+
+def _lock_funded_stripe(credit_id, amount, skip_locked):
+    return (
+        CreditStripe.objects.select_for_update(
+            nowait=nowait() and not skip_locked, skip_locked=skip_locked
+        )
+        .filter(credit_id=credit_id, balance__gte=amount)
+        .order_by("?")
+        .first()
+    )
+
+
+def debit(credit_id, amount):
+    stripe = _lock_funded_stripe(
+        credit_id, amount, skip_locked=True
+    ) or _lock_funded_stripe(credit_id, amount, skip_locked=False)
+
+    if stripe is not None:
+        stripe.balance -= amount
+        stripe.save(update_fields=["balance"])
+        return stripe.index
+
+    # No single stripe can cover the sale. Take every stripe in index order and
+    # spread the debit over them if the summed balance is enough.
+    stripes = lock_stripes(credit_id)
+    if sum(stripe.balance for stripe in stripes) < amount:
+        return None
+
+    debit_locked(stripes, amount)
+    return 0
+
+
+def debit_locked(stripes, amount):
+    remaining = amount
+    for stripe in sorted(stripes, key=lambda stripe: stripe.balance, reverse=True):
+        taken = min(stripe.balance, remaining)
+        stripe.balance -= taken
+        remaining -= taken
+        if not remaining:
+            break
+
+    CreditStripe.objects.bulk_update(stripes, ["balance"])
+
+
+def deposit(credit_id, amount):
+    stripes = lock_stripes(credit_id)
+    share = (amount / len(stripes)).quantize(CENT, rounding=ROUND_DOWN)
+
+    for stripe in stripes:
+        stripe.balance += share
+    stripes[0].balance += amount - share * len(stripes)
+
+    CreditStripe.objects.bulk_update(stripes, ["balance"])
+    return stripes
+
+
+@transaction.atomic
+def collapse(credit_id):
+    # Other engines only read Credit.balance, so the stripes are folded back
+    # into it before switching away from the striped engine.
+    credit = Credit.objects.select_for_update().get(id=credit_id)
+    locked = list(
+        CreditStripe.objects.select_for_update().filter(credit=credit).order_by("index")
+    )
+    credit.balance += sum(stripe.balance for stripe in locked)
+    credit.save(update_fields=["balance"])
+    CreditStripe.objects.filter(credit=credit).delete()
+    return credit
+
+
+def striped_credit_id_chunks(chunk_size):
+    credit_ids = (
+        CreditStripe.objects.order_by("credit_id")
+        .values_list("credit_id", flat=True)
+        .distinct()
+    )
+    last_id = 0
+    while True:
+        chunk = list(credit_ids.filter(credit_id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
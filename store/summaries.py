@@ -0,0 +1,188 @@
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .db import snapshot
+from .models import ArchivedSales, Seller, SellerSummary, Sale, Deposit, Credit
+
+UPSERT_SQL = """
+    INSERT INTO {summary} (
+        seller_id,
+        slot,
+        total_sales,
+        sales_count,
+        total_approved_deposits,
+        approved_deposits_count,
+        updated_at
+    )
+    {rows}
+    ON CONFLICT (seller_id, slot) DO UPDATE SET
+        total_sales = {summary}.total_sales + EXCLUDED.total_sales,
+        sales_count = {summary}.sales_count + EXCLUDED.sales_count,
+        total_approved_deposits =
+            {summary}.total_approved_deposits + EXCLUDED.total_approved_deposits,
+        approved_deposits_count =
+            {summary}.approved_deposits_count + EXCLUDED.approved_deposits_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def upsert_sql(rows):
+    return UPSERT_SQL.format(
+        summary=connection.ops.quote_name(SellerSummary._meta.db_table), rows=rows
+    )
+
+
+def add_sales(totals, slot=0):
+    if not totals:
+        return
+
+    # Rows are written in seller order so concurrent batches cannot deadlock.
+    params = []
+    for seller_id, (amount, count) in sorted(totals.items()):
+        params += [seller_id, slot, amount, count, 0, 0, timezone.now()]
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(totals))
+
+    with connection.cursor() as cursor:
+        cursor.execute(upsert_sql(f"VALUES {values}"), params)
+
+
+def add_sale(seller_id, amount, count=1, slot=0):
+    add_sales({seller_id: (amount, count)}, slot=slot)
+
+
+def add_credit_deposits(totals):
+    if not totals:
+        return
+
+    credit_table = connection.ops.quote_name(Credit._meta.db_table)
+    params = [timezone.now()]
+    for credit_id, (amount, count) in sorted(totals.items()):
+        params += [credit_id, amount, count]
+    values = ", ".join(["(%s, %s, %s)"] * len(totals))
+    rows = (
+        f"SELECT credit.seller_id, 0, 0, 0, deposit.amount, deposit.count, %s "
+        f"FROM (VALUES {values}) AS deposit (credit_id, amount, count) "
+        f"JOIN {credit_table} AS credit ON credit.id = deposit.credit_id "
+        f"ORDER BY credit.seller_id"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(upsert_sql(rows), params)
+
+
+def compute(seller_ids):
+    sales = (
+        Sale.objects.filter(seller_id__in=seller_ids)
+        .values("seller_id")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+    archived = (
+        ArchivedSales.objects.filter(seller_id__in=seller_ids)
+        .values("seller_id")
+        .annotate(total=Sum("total_sales"), count=Sum("sales_count"))
+    )
+    deposits = (
+        Deposit.objects.filter(
+            credit__seller_id__in=seller_ids, status=Deposit.STATUS_APPROVED
+        )
+        .values("credit__seller_id")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+
+    aggregates = {seller_id: [0, 0, 0, 0] for seller_id in seller_ids}
+    for row in sales:
+        aggregates[row["seller_id"]][0:2] = [row["total"], row["count"]]
+    for row in archived:
+        aggregates[row["seller_id"]][0] += row["total"]
+        aggregates[row["seller_id"]][1] += row["count"]
+    for row in deposits:
+        aggregates[row["credit__seller_id"]][2:4] = [row["total"], row["count"]]
+    return aggregates
+
+
+def stored(seller_ids):
+    summaries = (
+        SellerSummary.objects.filter(seller_id__in=seller_ids)
+        .values("seller_id")
+        .annotate(
+            total_sales=Sum("total_sales"),
+            sales_count=Sum("sales_count"),
+            total_approved_deposits=Sum("total_approved_deposits"),
+            approved_deposits_count=Sum("approved_deposits_count"),
+        )
+    )
+
+    aggregates = {seller_id: [0, 0, 0, 0] for seller_id in seller_ids}
+    for row in summaries:
+        aggregates[row["seller_id"]] = [
+            row["total_sales"],
+            row["sales_count"],
+            row["total_approved_deposits"],
+            row["approved_deposits_count"],
+        ]
+    return aggregates
+
+
+def find_drift(seller_ids):
+    with snapshot():
+        expected = compute(seller_ids)
+        actual = stored(seller_ids)
+    return {
+        seller_id: (expected[seller_id], actual[seller_id])
+        for seller_id in seller_ids
+        if expected[seller_id] != actual[seller_id]
+    }
+
+
+@transaction.atomic
+def backfill(seller_ids):
+    SellerSummary.objects.bulk_create(
+        [SellerSummary(seller_id=seller_id, slot=0) for seller_id in seller_ids],
+        ignore_conflicts=True,
+    )
+
+    # Holding the summary rows makes concurrent sales and approvals wait, so
+    # their increments land on top of the recomputed totals instead of being
+    # overwritten by them.
+    summaries = list(
+        SellerSummary.objects.select_for_update()
+        .filter(seller_id__in=seller_ids)
+        .order_by("seller_id", "slot")
+    )
+    aggregates = compute(seller_ids)
+
+    for summary in summaries:
+        if summary.slot == 0:
+            (
+                summary.total_sales,
+                summary.sales_count,
+                summary.total_approved_deposits,
+                summary.approved_deposits_count,
+            ) = aggregates[summary.seller_id]
+        else:
+            summary.total_sales = summary.total_approved_deposits = 0
+            summary.sales_count = summary.approved_deposits_count = 0
+        summary.updated_at = timezone.now()
+
+    SellerSummary.objects.bulk_update(
+        summaries,
+        [
+            "total_sales",
+            "sales_count",
+            "total_approved_deposits",
+            "approved_deposits_count",
+            "updated_at",
+        ],
+    )
+
+
+def seller_id_chunks(chunk_size):
+    seller_ids = Seller.objects.order_by("id").values_list("id", flat=True)
+    last_id = 0
+    while True:
+        chunk = list(seller_ids.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
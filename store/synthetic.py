@@ -0,0 +1,272 @@
+import multiprocessing
+import random
+from collections import deque
+from datetime import timedelta
+
+from django.db import connection, connections, transaction
+
+from . import onboarding, response_cache, summaries
+from .models import Credit, CreditTransactionLog, Deposit, Sale
+
+SALE_CENTS = (100, 20_000)
+MIN_DEPOSIT_CENTS = 1_000
+MAX_DEPOSIT_CENTS = 100_000_000
+MAX_BALANCE_CENTS = 9_999_999_999
+
+
+class Plan:
+    """
+    How many sales and deposits each generated seller gets and when. Sellers
+    are ranked in creation order; with the ``zipf`` profile the seller of rank
+    k gets a share proportional to 1 / (k + 1) ** zipf_s. With the ``growth``
+    time profile activity rises linearly from ``start`` to ``end``.
+    """
+
+    def __init__(
+        self,
+        sellers,
+        sales,
+        deposits,
+        start,
+        end,
+        seller_profile="uniform",
+        zipf_s=1.1,
+        time_profile="uniform",
+        seed=0,
+    ):
+        self.sellers = sellers
+        self.sales = sales
+        self.deposits = deposits
+        self.start = start
+        self.end = end
+        self.seller_profile = seller_profile
+        self.zipf_s = zipf_s
+        self.time_profile = time_profile
+        self.seed = seed
+        self.weight_total = sum(self.weight(rank) for rank in range(sellers))
+
+    def weight(self, rank):
+        if self.seller_profile == "zipf":
+            return 1 / (rank + 1) ** self.zipf_s
+        return 1.0
+
+    def counts(self, rank):
+        share = self.weight(rank) / self.weight_total
+        return round(self.sales * share), round(self.deposits * share)
+
+    def timestamp(self, position):
+        if self.time_profile == "growth":
+            position = position**0.5
+        seconds = (self.end - self.start).total_seconds() * position
+        return self.start + timedelta(seconds=seconds)
+
+
+def deposit_cents(rng, sales, deposits, needed=0):
+    # Sized to cover the sales expected before the next deposit.
+    mean_sale = sum(SALE_CENTS) // 2
+    expected = mean_sale * sales / max(deposits, 1) * rng.uniform(0.8, 1.5)
+    return max(needed, MIN_DEPOSIT_CENTS, min(int(expected), MAX_DEPOSIT_CENTS))
+
+
+def history(plan, rank):
+    """
+    Yield ``(created_at, type, cents, balance_after, phone_number)`` for the
+    seller of ``rank`` in time order. Event times are drawn one at a time as
+    sorted uniform order statistics, so no seller's history is ever held in
+    memory. A deposit is added before any sale the balance cannot cover, which
+    keeps every balance_after non-negative. The same plan and rank always
+    yield the same history.
+    """
+    rng = random.Random(plan.seed * 1_000_003 + rank)
+    sales, deposits = plan.counts(rank)
+    balance = 0
+    position = 0.0
+
+    for remaining in range(sales + deposits, 0, -1):
+        position = 1 - (1 - position) * rng.random() ** (1 / remaining)
+        created_at = plan.timestamp(position)
+
+        if rng.random() * remaining < deposits:
+            amount = deposit_cents(rng, sales, deposits)
+            amount = min(amount, MAX_BALANCE_CENTS - balance)
+            deposits -= 1
+            balance += amount
+            yield created_at, CreditTransactionLog.TYPE_DEPOSIT, amount, balance, None
+            continue
+
+        low, high = SALE_CENTS
+        amount = low + int(rng.random() * (high - low + 1))
+        phone_number = f"09{int(rng.random() * 10**9):09d}"
+        if amount > balance:
+            top_up = deposit_cents(rng, sales, deposits + 1, needed=amount - balance)
+            top_up = min(top_up, MAX_BALANCE_CENTS - balance)
+            balance += top_up
+            yield created_at, CreditTransactionLog.TYPE_DEPOSIT, top_up, balance, None
+
+        sales -= 1
+        balance -= amount
+        yield created_at, CreditTransactionLog.TYPE_SALE, amount, balance, phone_number
+
+
+def money(cents):
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+def sale_lines(plan, sellers):
+    for rank, seller_id, _ in sellers:
+        for created_at, type, cents, _, phone_number in history(plan, rank):
+            if type == CreditTransactionLog.TYPE_SALE:
+                yield f"{seller_id}\t{money(cents)}\t{phone_number}\t{created_at}\n"
+
+
+def deposit_lines(plan, sellers):
+    status = Deposit.STATUS_APPROVED
+    for rank, _, credit_id in sellers:
+        for created_at, type, cents, _, _ in history(plan, rank):
+            if type == CreditTransactionLog.TYPE_DEPOSIT:
+                yield (
+                    f"{credit_id}\t{money(cents)}\t{status}\t{created_at}\t"
+                    f"{created_at}\n"
+                )
+
+
+def log_lines(plan, sellers, balances):
+    for rank, _, credit_id in sellers:
+        balance = 0
+        for created_at, type, cents, balance, _ in history(plan, rank):
+            if type == CreditTransactionLog.TYPE_SALE:
+                cents = -cents
+            yield (
+                f"{credit_id}\t{money(cents)}\t{money(balance)}\t{type}\t"
+                f"{created_at}\n"
+            )
+        balances[credit_id] = balance
+
+
+class LineReader:
+    """File-like view of an iterator of COPY lines for ``copy_expert``."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def read(self, size=-1):
+        parts = []
+        length = 0
+        for line in self.lines:
+            parts.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        return "".join(parts)
+
+
+def copy(cursor, model, columns, lines):
+    table = connection.ops.quote_name(model._meta.db_table)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN", LineReader(lines)
+    )
+    return cursor.rowcount
+
+
+@transaction.atomic
+def generate_chunk(plan, sellers):
+    """
+    Write the history of ``sellers``, a list of ``(rank, seller_id,
+    credit_id)``, with one COPY per table, then set their credit balances to
+    the ledger's final balance_after and recompute their summaries. Rows are
+    generated again for each COPY instead of being buffered. Returns the
+    numbers of sales, deposits and ledger rows written.
+    """
+    if not sellers:
+        return 0, 0, 0
+
+    balances = {}
+    with connection.cursor() as cursor:
+        sales = copy(
+            cursor,
+            Sale,
+            ["seller_id", "amount", "phone_number", "created_at"],
+            sale_lines(plan, sellers),
+        )
+        deposits = copy(
+            cursor,
+            Deposit,
+            ["credit_id", "amount", "status", "created_at", "updated_at"],
+            deposit_lines(plan, sellers),
+        )
+        logs = copy(
+            cursor,
+            CreditTransactionLog,
+            ["credit_id", "amount", "balance_after", "type", "created_at"],
+            log_lines(plan, sellers, balances),
+        )
+
+        credit_table = connection.ops.quote_name(Credit._meta.db_table)
+        values = ", ".join(["(%s, %s::numeric)"] * len(balances))
+        params = []
+        for credit_id, cents in sorted(balances.items()):
+            params += [credit_id, money(cents)]
+        cursor.execute(
+            f"UPDATE {credit_table} AS credit SET balance = new.balance "
+            f"FROM (VALUES {values}) AS new (id, balance) WHERE credit.id = new.id",
+            params,
+        )
+
+    seller_ids = [seller_id for _, seller_id, _ in sellers]
+    summaries.backfill(seller_ids)
+    response_cache.bump(*seller_ids)
+    return sales, deposits, logs
+
+
+def seller_chunks(plan, prefix, chunk_size):
+    """
+    Create ``plan.sellers`` sellers named ``{prefix}-{rank}@example.com`` and
+    yield them as ``generate_chunk`` input, ``chunk_size`` at a time. Emails
+    that already exist are skipped along with their ranks.
+    """
+    for first in range(0, plan.sellers, chunk_size):
+        ranks = range(first, min(first + chunk_size, plan.sellers))
+        sellers, _ = onboarding.onboard(
+            [{"email": f"{prefix}-{rank}@example.com"} for rank in ranks]
+        )
+        rank_by_email = {f"{prefix}-{rank}@example.com": rank for rank in ranks}
+        credits = Credit.objects.filter(seller__in=sellers).values_list(
+            "seller_id", "id", "seller__user__email"
+        )
+        yield sorted(
+            (rank_by_email[email], seller_id, credit_id)
+            for seller_id, credit_id, email in credits
+        )
+
+
+def generate(plan, chunks, workers=1):
+    """
+    Run ``generate_chunk`` for every chunk, in ``workers`` forked processes
+    when there is more than one. At most two chunks per worker are queued at a
+    time, so memory stays flat however many sellers are generated. Returns
+    the total numbers of sales, deposits and ledger rows written.
+    """
+    totals = [0, 0, 0]
+
+    def add(counts):
+        for index, count in enumerate(counts):
+            totals[index] += count
+
+    if workers == 1:
+        for sellers in chunks:
+            add(generate_chunk(plan, sellers))
+        return totals
+
+    # Forked workers must not share the parent's database connection.
+    connections.close_all()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        pending = deque()
+        for sellers in chunks:
+            pending.append(pool.apply_async(generate_chunk, (plan, sellers)))
+            if len(pending) >= workers * 2:
+                add(pending.popleft().get())
+        while pending:
+            add(pending.popleft().get())
+    return totals
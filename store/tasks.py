@@ -0,0 +1,55 @@
+from celery import shared_task
+from django.conf import settings
+
+from . import hot_ledger, outbox, partitions, reconciliation
+
+
+@shared_task
+def flush_hot_ledger(batch_size=500, max_batches=20):
+    # rebuild_hot_ledger drains the stream itself while sales are paused.
+    if settings.STORE_SALE_ENGINE != "redis" or hot_ledger.is_paused():
+        return 0
+
+    flushed = 0
+    for _ in range(max_batches):
+        count = hot_ledger.flush(batch_size=batch_size)
+        flushed += count
+        if count < batch_size:
+            break
+    return flushed
+
+
+@shared_task
+def manage_partitions():
+    created = partitions.ensure_partitions(settings.STORE_PARTITION_MONTHS_AHEAD)
+    detached = []
+    if settings.STORE_PARTITION_RETENTION_MONTHS:
+        detached = partitions.detach_partitions(
+            settings.STORE_PARTITION_RETENTION_MONTHS
+        )
+    return {"created": created, "detached": detached}
+
+
+@shared_task
+def reconcile_credits():
+    reconciliation_pass, chunks = reconciliation.start_pass()
+    for chunk in chunks:
+        reconcile_credit_chunk.delay(
+            reconciliation_pass.id, chunk, reconciliation_pass.last_log_id
+        )
+    return len(chunks)
+
+
+@shared_task
+def reconcile_credit_chunk(pass_id, credit_ids, settled_id):
+    return reconciliation.check_chunk(pass_id, credit_ids, settled_id)
+
+
+@shared_task
+def relay_outbox(batch_size=500, max_batches=20):
+    return outbox.relay(batch_size=batch_size, max_batches=max_batches)
+
+
+@shared_task
+def prune_outbox():
+    return outbox.prune(settings.STORE_OUTBOX_RETENTION_HOURS)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase as BaseTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from model_bakery import baker
+from store.engines import get_engine
+from store.models import Deposit, Sale
+from store.views import CreditViewSet, SaleViewSet, SellerViewSet
+from users.views import UserViewSet
+
+User = get_user_model()
+
+
+@override_settings(ASYNC_READS=True)
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = baker.make(User)
+        self.token = None
+
+    def authenticate_with_token(self):
+        self.token = Token.objects.create(user=self.user)
+
+    def call(self, viewset, actions, request, **kwargs):
+        view = viewset.as_view(actions)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+
+        if self.token is not None:
+            request.META["HTTP_AUTHORIZATION"] = f"Token {self.token.key}"
+        response = async_to_sync(view)(request, **kwargs)
+        return response.render()
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestAsyncReads(TestCase):
+    def test_if_user_is_anonymous_returns_401(self):
+        request = self.factory.get("/store/sellers/")
+
+        response = self.call(SellerViewSet, {"get": "list"}, request)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+    def test_if_sellers_are_listed_with_token_returns_200(self):
+        self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+        baker.make(User, _quantity=2)
+        self.authenticate_with_token()
+        request = self.factory.get("/store/sellers/")
+
+        response = self.call(SellerViewSet, {"get": "list"}, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["balance"], 3000)
+
+    def test_if_credit_is_retrieved_returns_200(self):
+        self.authenticate_with_token()
+        credit_id = self.user.seller.credit.id
+        request = self.factory.get(f"/store/credits/{credit_id}/")
+
+        response = self.call(CreditViewSet, {"get": "retrieve"}, request, pk=credit_id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], credit_id)
+
+    def test_if_credit_belongs_to_other_seller_returns_404(self):
+        other = baker.make(User)
+        self.authenticate_with_token()
+        credit_id = other.seller.credit.id
+        request = self.factory.get(f"/store/credits/{credit_id}/")
+
+        response = self.call(CreditViewSet, {"get": "retrieve"}, request, pk=credit_id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_if_sales_of_other_seller_are_listed_returns_403(self):
+        other = baker.make(User)
+        request = self.factory.get("/store/sellers/0/sales/")
+        force_authenticate(request, self.user)
+
+        response = self.call(
+            SaleViewSet, {"get": "list"}, request, seller_pk=other.seller.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_sales_are_paged_with_limit_offset_returns_200(self):
+        sales = baker.make(Sale, seller=self.user.seller, _quantity=3)
+        self.authenticate_with_token()
+        request = self.factory.get("/store/sellers/0/sales/?limit=2&offset=1")
+
+        response = self.call(
+            SaleViewSet, {"get": "list"}, request, seller_pk=self.user.seller.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn(response.data["results"][0]["id"], {sale.id for sale in sales})
+
+    def test_if_cursor_pagination_is_requested_falls_back_to_sync_returns_200(self):
+        baker.make(Sale, seller=self.user.seller, _quantity=3)
+        self.authenticate_with_token()
+        request = self.factory.get("/store/sellers/0/sales/?pagination=cursor")
+
+        response = self.call(
+            SaleViewSet, {"get": "list"}, request, seller_pk=self.user.seller.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_if_sale_is_posted_falls_back_to_sync_returns_201(self):
+        self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+        self.authenticate_with_token()
+        request = self.factory.post(
+            "/store/sellers/0/sales/",
+            json.dumps({"amount": 1000.00, "phone_number": "09123456789"}),
+            content_type="application/json",
+        )
+
+        response = self.call(
+            SaleViewSet,
+            {"get": "list", "post": "create"},
+            request,
+            seller_pk=self.user.seller.id,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_if_users_are_listed_returns_200(self):
+        self.authenticate_with_token()
+        request = self.factory.get("/auth/users/")
+
+        response = self.call(UserViewSet, {"get": "list"}, request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.user.id)
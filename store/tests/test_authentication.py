@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = baker.make(User)
+
+    def authenticate_with_token(self, key=None):
+        key = key or Token.objects.create(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {key}")
+
+    def get_seller(self, seller_id):
+        return self.client.get(reverse("seller-detail", kwargs={"pk": seller_id}))
+
+    def list_sales(self, seller_id):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": seller_id})
+        return self.client.get(url)
+
+
+class TestPrincipalTokenAuthentication(TestCase):
+    def test_if_token_is_invalid_returns_401(self):
+        self.authenticate_with_token("invalid")
+
+        response = self.get_seller(self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_if_user_is_inactive_returns_401(self):
+        self.authenticate_with_token()
+        User.objects.filter(id=self.user.id).update(is_active=False)
+
+        response = self.get_seller(self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_if_seller_is_not_owner_returns_403(self):
+        other = baker.make(User)
+        self.authenticate_with_token()
+
+        response = self.list_sales(other.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_principal_is_loaded_with_token_in_one_query_returns_200(self):
+        self.authenticate_with_token()
+
+        with self.assertNumQueries(2):
+            response = self.list_sales(self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
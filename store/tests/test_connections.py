@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+from config.pooled_postgresql import base
+
+
+class TestConnectionPool(TestCase):
+    def make_wrapper(self, **pool):
+        settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "config.pooled_postgresql",
+            "POOL": {"SIZE": 1, "TIMEOUT": 0.1, **pool},
+        }
+        wrapper = base.DatabaseWrapper(settings_dict, alias=self.id())
+        self.addCleanup(base.clear_pools)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def get_backend_pid(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_if_connection_is_closed_it_is_reused(self):
+        wrapper = self.make_wrapper()
+        pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertEqual(self.get_backend_pid(wrapper), pid)
+
+    def test_if_transaction_is_left_open_it_is_rolled_back_on_close(self):
+        wrapper = self.make_wrapper()
+        wrapper.ensure_connection()
+        wrapper.connection.autocommit = False
+        with wrapper.connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE leftover (id int)")
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.leftover')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_if_pool_is_exhausted_checkout_times_out(self):
+        wrapper = self.make_wrapper()
+        wrapper.ensure_connection()
+        other = base.DatabaseWrapper(wrapper.settings_dict, alias=wrapper.alias)
+
+        with self.assertRaises(OperationalError):
+            other.ensure_connection()
+
+    def test_if_idle_connection_died_it_is_replaced(self):
+        wrapper = self.make_wrapper()
+        pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        with mock.patch.object(base, "CHECK_AFTER_SECONDS", 0):
+            self.assertNotEqual(self.get_backend_pid(wrapper), pid)
+
+    def test_if_connection_outlived_its_lifetime_it_is_replaced(self):
+        wrapper = self.make_wrapper(LIFETIME=0)
+        pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertNotEqual(self.get_backend_pid(wrapper), pid)
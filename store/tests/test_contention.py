@@ -0,0 +1,124 @@
+import json
+import time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.urls import reverse
+from django.test import (
+    TestCase as BaseTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store import contention
+from store.engines import get_engine
+from store.models import Deposit
+
+User = get_user_model()
+
+
+class ClientMixin:
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        with transaction.atomic():
+            self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+
+    def post_sale(self):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        payload = {"amount": 100, "phone_number": "09123456789"}
+        return self.client.post(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestLockTelemetry(ClientMixin, BaseTestCase):
+    def sample(self, name):
+        return REGISTRY.get_sample_value(name, {"path": "sale"}) or 0
+
+    @override_settings(STORE_LOCK_CONTENTION_MS=0)
+    def test_if_sale_is_created_wait_and_hold_are_recorded(self):
+        waits = self.sample("store_lock_wait_seconds_count")
+        holds = self.sample("store_lock_hold_seconds_count")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_sale()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.sample("store_lock_wait_seconds_count"), waits + 1)
+        self.assertEqual(self.sample("store_lock_hold_seconds_count"), holds + 1)
+        self.assertEqual(contention.top(by="wait")[0][0], self.user.seller.id)
+
+    def test_if_wait_is_below_threshold_seller_is_not_ranked(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_sale()
+
+        self.assertEqual(contention.top(by="wait"), [])
+
+    def test_if_command_runs_lists_contended_sellers(self):
+        contention.record([self.user.seller.id], 0.5)
+        contention.record([self.user.seller.id], 0, failed=True)
+        stdout = StringIO()
+
+        call_command("lock_contention", stdout=stdout)
+
+        self.assertIn(f"seller {self.user.seller.id}: 0.5s waited", stdout.getvalue())
+        self.assertIn(
+            f"seller {self.user.seller.id}: 1 failed locks", stdout.getvalue()
+        )
+
+
+class TestLockLimits(ClientMixin, TransactionTestCase):
+    def hold_credit_lock(self):
+        other = connections.create_connection("default")
+        other.set_autocommit(False)
+        with other.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM store_credit WHERE id = %s FOR UPDATE",
+                [self.user.seller.credit.id],
+            )
+        self.addCleanup(other.close)
+        self.addCleanup(other.rollback)
+
+    @override_settings(STORE_LOCK_NOWAIT=True)
+    def test_if_credit_is_locked_and_nowait_is_set_returns_503(self):
+        self.hold_credit_lock()
+
+        response = self.post_sale()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(contention.top(by="failed"), [(self.user.seller.id, 1.0)])
+
+    @override_settings(STORE_SALE_ENGINE="statement", STORE_LOCK_TIMEOUT_MS=100)
+    def test_if_credit_is_locked_past_lock_timeout_returns_503(self):
+        self.hold_credit_lock()
+
+        started = time.monotonic()
+        response = self.post_sale()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    @override_settings(STORE_LOCK_TIMEOUT_MS=100)
+    def test_if_lock_is_free_timeout_does_not_outlive_the_lock(self):
+        response = self.post_sale()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
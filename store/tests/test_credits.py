@@ -0,0 +1,197 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store.engines import get_engine
+from store.models import CreditTransactionLog, Deposit
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+
+    def authenticate(self, is_staff=False):
+        if is_staff:
+            self.user.is_staff = True
+            self.user.save(update_fields=["is_staff"])
+
+        self.client.force_authenticate(self.user)
+
+    def authenticate_with_token(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def post_sale(self, amount):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        payload = {"amount": amount, "phone_number": "09123456789"}
+        return self.client.post(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def get_balance(self, credit_id, at=None):
+        url = reverse("credit-balance", kwargs={"pk": credit_id})
+        return self.client.get(url, {"at": at} if at else {})
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestCreditBalance(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.credit = self.user.seller.credit
+
+    def move_logs(self, *created_at):
+        logs = CreditTransactionLog.objects.filter(credit=self.credit).order_by("id")
+        for log, value in zip(logs, created_at):
+            CreditTransactionLog.objects.filter(id=log.id).update(created_at=value)
+
+    def test_if_user_is_anonymous_returns_401(self):
+        response = self.get_balance(self.credit.id)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_if_credit_belongs_to_other_seller_returns_404(self):
+        other = baker.make(User)
+        self.authenticate()
+
+        response = self.get_balance(other.seller.credit.id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_if_at_is_invalid_returns_400(self):
+        self.authenticate()
+
+        response = self.get_balance(self.credit.id, "yesterday")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_sales_and_deposits_are_logged_amounts_are_signed(self):
+        self.deposit(self.credit.id, Decimal("3000.00"))
+        self.authenticate()
+        self.post_sale(1000.00)
+
+        logs = CreditTransactionLog.objects.filter(credit=self.credit).order_by("id")
+
+        self.assertEqual(
+            [(log.amount, log.balance_after) for log in logs],
+            [(Decimal("3000.00"), Decimal("3000.00")), (-1000, Decimal("2000.00"))],
+        )
+
+    def test_if_at_is_given_returns_balance_at_that_time_200(self):
+        self.deposit(self.credit.id, Decimal("3000.00"))
+        self.authenticate()
+        self.post_sale(1000.00)
+        self.move_logs("2026-01-01T00:00:00Z", "2026-02-01T00:00:00Z")
+
+        before = self.get_balance(self.credit.id, "2025-12-31T00:00:00Z")
+        between = self.get_balance(self.credit.id, "2026-01-15T00:00:00Z")
+        after = self.get_balance(self.credit.id, "2026-02-01T00:00:00Z")
+
+        self.assertEqual(between.status_code, status.HTTP_200_OK)
+        self.assertEqual(before.data["balance"], 0)
+        self.assertEqual(between.data["balance"], 3000)
+        self.assertEqual(after.data["balance"], 2000)
+
+    def test_if_at_is_missing_returns_current_balance_200(self):
+        self.deposit(self.credit.id, Decimal("3000.00"))
+        self.authenticate_with_token()
+        self.post_sale(1000.00)
+
+        with self.assertNumQueries(3):
+            response = self.get_balance(self.credit.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["credit"], self.credit.id)
+        self.assertEqual(response.data["balance"], 2000)
+
+    @override_settings(STORE_SALE_ENGINE="statement")
+    def test_if_statement_engine_logs_balance_returns_200(self):
+        self.deposit(self.credit.id, Decimal("3000.00"))
+        self.authenticate()
+        self.post_sale(1000.00)
+
+        response = self.get_balance(self.credit.id)
+
+        self.assertEqual(response.data["balance"], 2000)
+        self.assertTrue(
+            CreditTransactionLog.objects.filter(
+                amount=-1000, balance_after=2000
+            ).exists()
+        )
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def test_if_striped_sales_have_no_running_balance_they_are_summed_200(self):
+        self.deposit(self.credit.id, Decimal("3000.00"))
+        self.authenticate()
+        self.post_sale(100.00)
+        self.post_sale(200.00)
+
+        response = self.get_balance(self.credit.id)
+
+        self.assertEqual(response.data["balance"], 2700)
+
+
+class TestCursorListTransactionLog(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.credit = self.user.seller.credit
+        self.logs = baker.make(
+            CreditTransactionLog,
+            credit=self.credit,
+            amount=Decimal("1.00"),
+            balance_after=Decimal("1.00"),
+            type=CreditTransactionLog.TYPE_DEPOSIT,
+            _quantity=9,
+        )
+        # Six rows share one created_at, so only the id breaks their tie.
+        CreditTransactionLog.objects.filter(
+            id__in=[log.id for log in self.logs[:6]]
+        ).update(created_at="2024-01-01T00:00:00Z")
+        self.url = reverse(
+            "credit-transaction-logs-list", kwargs={"credit_pk": self.credit.id}
+        )
+
+    def list_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [log["id"] for log in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_if_cursor_mode_pages_newest_first_with_ties_by_id_returns_200(self):
+        self.authenticate(is_staff=True)
+
+        ids = self.list_pages(f"{self.url}?pagination=cursor&limit=4")
+
+        expected = CreditTransactionLog.objects.order_by("-created_at", "-id")
+        self.assertEqual(ids, list(expected.values_list("id", flat=True)))
+
+    def test_if_log_is_added_between_pages_later_pages_do_not_shift(self):
+        self.authenticate(is_staff=True)
+        first = self.client.get(f"{self.url}?pagination=cursor&limit=4")
+        self.deposit(self.credit.id, Decimal("5.00"))
+
+        ids = [log["id"] for log in first.data["results"]]
+        ids += self.list_pages(first.data["next"])
+
+        expected = CreditTransactionLog.objects.filter(
+            id__in=[log.id for log in self.logs]
+        ).order_by("-created_at", "-id")
+        self.assertEqual(ids, list(expected.values_list("id", flat=True)))
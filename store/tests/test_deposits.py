@@ -1,13 +1,18 @@
 import json
+from decimal import Decimal
 
+from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
-from django.test import TestCase as BaseTestCase
+from django.test import TestCase as BaseTestCase, override_settings
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from model_bakery import baker
+from store.admin import DepositRequestAdmin
+from store.models import CreditTransactionLog, Deposit, SellerSummary
 
 User = get_user_model()
 
@@ -24,9 +29,11 @@ class TestCase(BaseTestCase):
 
         self.client.force_authenticate(self.user)
 
-    def post_deposit(self, payload, seller_id):
+    def post_deposit(self, payload, seller_id, **headers):
         url = reverse("seller-deposits-list", kwargs={"seller_pk": seller_id})
-        return self.client.post(url, payload, content_type="application/json")
+        return self.client.post(
+            url, payload, content_type="application/json", **headers
+        )
 
 
 class TestCreateDeposit(TestCase):
@@ -57,3 +64,264 @@ class TestCreateDeposit(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertGreater(response.data["id"], 0)
+
+    def test_if_idempotency_key_is_retried_creates_one_deposit_returns_201(self):
+        cache.clear()
+        payload = {
+            "amount": 1000.00,
+        }
+        self.authenticate()
+
+        first = self.post_deposit(
+            json.dumps(payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="dep-1"
+        )
+        second = self.post_deposit(
+            json.dumps(payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="dep-1"
+        )
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(Deposit.objects.count(), 1)
+
+    def test_if_two_users_share_idempotency_key_each_creates_a_deposit(self):
+        cache.clear()
+        payload = {
+            "amount": 1000.00,
+        }
+        other = baker.make(User)
+        self.authenticate()
+        first = self.post_deposit(
+            json.dumps(payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="dep-1"
+        )
+        self.client.force_authenticate(other)
+
+        second = self.post_deposit(
+            json.dumps(payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="dep-1"
+        )
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(second.data["id"], first.data["id"])
+        self.assertNotIn("Idempotent-Replayed", second)
+        self.assertEqual(
+            Deposit.objects.get(id=second.data["id"]).credit_id,
+            other.seller.credit.id,
+        )
+
+
+class TestApproveDeposits(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.credit = self.user.seller.credit
+
+    def make_deposits(self, *amounts, credit=None, **kwargs):
+        return [
+            baker.make(
+                Deposit, credit=credit or self.credit, amount=Decimal(amount), **kwargs
+            )
+            for amount in amounts
+        ]
+
+    def approve(self, deposits, seller_id=None):
+        url = reverse(
+            "seller-deposits-approve",
+            kwargs={"seller_pk": seller_id or self.user.seller.id},
+        )
+        payload = {"ids": [deposit.id for deposit in deposits]}
+        return self.client.post(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def get_balance(self):
+        self.credit.refresh_from_db()
+        return self.credit.total_balance
+
+    def test_if_user_is_not_staff_returns_403(self):
+        deposits = self.make_deposits("1000.00")
+        self.authenticate()
+
+        response = self.approve(deposits)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_ids_are_missing_returns_400(self):
+        self.authenticate(is_staff=True)
+
+        response = self.approve([])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_deposits_are_pending_credits_them_once_returns_200(self):
+        deposits = self.make_deposits("1000.00", "500.00")
+        self.authenticate(is_staff=True)
+
+        response = self.approve(deposits)
+        logs = CreditTransactionLog.objects.filter(credit=self.credit).order_by("id")
+        summary = SellerSummary.objects.get(seller=self.user.seller, slot=0)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["approved"], [deposit.id for deposit in deposits]
+        )
+        self.assertEqual(self.get_balance(), 1500)
+        self.assertEqual(
+            [(log.amount, log.balance_after) for log in logs],
+            [(1000, 1000), (500, 1500)],
+        )
+        self.assertEqual(summary.total_approved_deposits, 1500)
+        self.assertEqual(summary.approved_deposits_count, 2)
+        self.assertFalse(
+            Deposit.objects.exclude(status=Deposit.STATUS_APPROVED).exists()
+        )
+
+    def test_if_deposits_are_approved_again_skips_them_returns_200(self):
+        deposits = self.make_deposits("1000.00")
+        deposits += self.make_deposits("700.00", status=Deposit.STATUS_APPROVED)
+        self.authenticate(is_staff=True)
+
+        first = self.approve(deposits)
+        second = self.approve(deposits)
+
+        self.assertEqual(first.data["approved"], [deposits[0].id])
+        self.assertEqual(second.data["approved"], [])
+        self.assertEqual(self.get_balance(), 1000)
+
+    def test_if_deposit_was_rejected_skips_it_returns_200(self):
+        deposits = self.make_deposits("1000.00", status=Deposit.STATUS_REJECTED)
+        self.authenticate(is_staff=True)
+
+        response = self.approve(deposits)
+
+        self.assertEqual(response.data["approved"], [])
+        self.assertEqual(self.get_balance(), 0)
+        self.assertEqual(Deposit.objects.get().status, Deposit.STATUS_REJECTED)
+
+    def test_if_deposits_of_many_sellers_are_approved_credits_each(self):
+        other = baker.make(User)
+        deposits = self.make_deposits("1000.00")
+        deposits += self.make_deposits("500.00", credit=other.seller.credit)
+        self.authenticate(is_staff=True)
+
+        response = self.client.post(
+            reverse("deposits-approve"),
+            json.dumps({"ids": [deposit.id for deposit in deposits]}),
+            content_type="application/json",
+        )
+        other.seller.credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["approved"], [deposit.id for deposit in deposits]
+        )
+        self.assertEqual(self.get_balance(), 1000)
+        self.assertEqual(other.seller.credit.total_balance, 500)
+
+    def test_if_deposit_belongs_to_other_seller_skips_it_returns_200(self):
+        other = baker.make(User)
+        deposits = self.make_deposits("1000.00", credit=other.seller.credit)
+        self.authenticate(is_staff=True)
+
+        response = self.approve(deposits)
+
+        self.assertEqual(response.data["approved"], [])
+        self.assertEqual(Deposit.objects.get().status, Deposit.STATUS_PENDING)
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def test_if_engine_is_striped_spreads_deposits_over_stripes_returns_200(self):
+        deposits = self.make_deposits("1000.00", "500.00")
+        self.authenticate(is_staff=True)
+
+        self.approve(deposits)
+        logs = CreditTransactionLog.objects.filter(credit=self.credit).order_by("id")
+
+        self.assertEqual(self.get_balance(), 1500)
+        self.assertEqual(self.credit.stripes.count(), 4)
+        self.assertEqual([log.balance_after for log in logs], [1000, 1500])
+
+
+class TestDepositAdmin(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save(update_fields=["is_staff", "is_superuser"])
+        self.client.force_login(self.user)
+        self.credit = self.user.seller.credit
+
+    def get_balance(self):
+        self.credit.refresh_from_db()
+        return self.credit.balance
+
+    def test_if_approved_deposit_is_saved_again_credits_it_once(self):
+        deposit = baker.make(Deposit, credit=self.credit, amount=Decimal("1000.00"))
+        model_admin = DepositRequestAdmin(Deposit, site)
+
+        deposit.status = Deposit.STATUS_APPROVED
+        model_admin.save_model(None, deposit, None, change=True)
+        model_admin.save_model(None, deposit, None, change=True)
+
+        self.assertEqual(self.get_balance(), 1000)
+        self.assertEqual(CreditTransactionLog.objects.count(), 1)
+
+    def test_if_action_approves_selected_deposits_credits_them(self):
+        deposits = [
+            baker.make(Deposit, credit=self.credit, amount=Decimal("1000.00"))
+            for _ in range(3)
+        ]
+
+        response = self.client.post(
+            reverse("admin:store_deposit_changelist"),
+            {
+                "action": "approve_deposits",
+                "_selected_action": [deposit.id for deposit in deposits[:2]],
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(self.get_balance(), 2000)
+        self.assertEqual(
+            Deposit.objects.filter(status=Deposit.STATUS_APPROVED).count(), 2
+        )
+
+
+class TestCursorListDeposit(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.deposits = baker.make(
+            Deposit, credit=self.user.seller.credit, amount=Decimal("1.00"), _quantity=9
+        )
+        # Six deposits share one created_at, so only the id breaks their tie.
+        Deposit.objects.filter(
+            id__in=[deposit.id for deposit in self.deposits[:6]]
+        ).update(created_at="2024-01-01T00:00:00Z")
+        self.url = reverse(
+            "seller-deposits-list", kwargs={"seller_pk": self.user.seller.id}
+        )
+
+    def list_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [deposit["id"] for deposit in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_if_cursor_mode_pages_newest_first_with_ties_by_id_returns_200(self):
+        self.authenticate()
+
+        ids = self.list_pages(f"{self.url}?pagination=cursor&limit=4")
+
+        expected = Deposit.objects.order_by("-created_at", "-id")
+        self.assertEqual(ids, list(expected.values_list("id", flat=True)))
+
+    def test_if_deposit_is_added_between_pages_later_pages_do_not_shift(self):
+        self.authenticate()
+        first = self.client.get(f"{self.url}?pagination=cursor&limit=4")
+        baker.make(Deposit, credit=self.user.seller.credit, amount=Decimal("1.00"))
+
+        ids = [deposit["id"] for deposit in first.data["results"]]
+        ids += self.list_pages(first.data["next"])
+
+        expected = Deposit.objects.filter(
+            id__in=[deposit.id for deposit in self.deposits]
+        ).order_by("-created_at", "-id")
+        self.assertEqual(ids, list(expected.values_list("id", flat=True)))
@@ -0,0 +1,224 @@
+import asyncio
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config.handlers import ASGIHandler
+from model_bakery import baker
+from store.models import CreditTransactionLog, Deposit, Sale
+
+User = get_user_model()
+
+
+class ClientMixin:
+    def make_client(self, user):
+        client = APIClient()
+        token = Token.objects.create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def make_sales(self, seller, created_at):
+        sales = baker.make(
+            Sale, seller=seller, amount=Decimal("10.00"), _quantity=len(created_at)
+        )
+        for sale, at in zip(sales, created_at):
+            Sale.objects.filter(id=sale.id).update(created_at=at)
+        return sales
+
+
+class TestExports(ClientMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = baker.make(User)
+        self.staff = baker.make(User, is_staff=True)
+        self.client = self.make_client(self.user)
+
+    def test_if_sales_are_exported_as_csv_rows_are_oldest_first(self):
+        newer, older = self.make_sales(
+            self.user.seller, ["2024-02-01T00:00:00Z", "2024-01-01T00:00:00Z"]
+        )
+        url = reverse("seller-sales-export", kwargs={"seller_pk": self.user.seller.id})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="sales.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(
+            rows[0], ["id", "seller", "amount", "phone_number", "created_at"]
+        )
+        self.assertEqual([row[0] for row in rows[1:]], [str(older.id), str(newer.id)])
+        self.assertEqual(rows[1][2], "10.00")
+        self.assertEqual(rows[1][4], "2024-01-01T00:00:00Z")
+
+    def test_if_time_range_is_given_only_rows_inside_are_exported(self):
+        _, inside, _ = self.make_sales(
+            self.user.seller,
+            [
+                "2024-01-01T00:00:00Z",
+                "2024-02-01T00:00:00Z",
+                "2024-03-01T00:00:00Z",
+            ],
+        )
+        url = reverse("seller-sales-export", kwargs={"seller_pk": self.user.seller.id})
+
+        response = self.client.get(
+            url,
+            {
+                "created_at__gte": "2024-01-15T00:00:00Z",
+                "created_at__lt": "2024-03-01T00:00:00Z",
+                "export_format": "ndjson",
+            },
+        )
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([record["id"] for record in records], [inside.id])
+
+    def test_if_ledger_is_exported_by_staff_returns_200(self):
+        credit = self.user.seller.credit
+        baker.make(
+            CreditTransactionLog,
+            credit=credit,
+            amount=Decimal("5.00"),
+            balance_after=Decimal("5.00"),
+            type=CreditTransactionLog.TYPE_DEPOSIT,
+        )
+        url = reverse("credit-transaction-logs-export", kwargs={"credit_pk": credit.id})
+
+        response = self.make_client(self.staff).get(url, {"export_format": "ndjson"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (record,) = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(record["credit"], credit.id)
+        self.assertEqual(record["balance_after"], "5.00")
+
+    def test_if_seller_exports_other_sellers_deposits_returns_403(self):
+        other = baker.make(User)
+        baker.make(Deposit, credit=other.seller.credit, amount=Decimal("1.00"))
+        url = reverse("seller-deposits-export", kwargs={"seller_pk": other.seller.id})
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_global_export_is_requested_by_seller_returns_403(self):
+        response = self.client.get(reverse("sales-export"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_global_export_is_requested_by_staff_every_seller_is_included(self):
+        other = baker.make(User)
+        self.make_sales(self.user.seller, ["2024-01-01T00:00:00Z"])
+        self.make_sales(other.seller, ["2024-01-02T00:00:00Z"])
+
+        response = self.make_client(self.staff).get(reverse("sales-export"))
+
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            [str(self.user.seller.id), str(other.seller.id)],
+        )
+
+    def test_if_format_is_unknown_returns_400(self):
+        response = self.make_client(self.staff).get(
+            reverse("sales-export"), {"export_format": "xml"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(STORE_EXPORT_CHUNK_SIZE=2)
+    def test_if_rows_exceed_chunk_size_they_are_streamed_in_parts(self):
+        self.make_sales(self.user.seller, ["2024-01-01T00:00:00Z"] * 5)
+        url = reverse("seller-sales-export", kwargs={"seller_pk": self.user.seller.id})
+
+        response = self.client.get(url)
+
+        parts = [part for part in response.streaming_content if part]
+        self.assertEqual(len(parts), 3)
+
+    @override_settings(STORE_EXPORT_CHUNK_SIZE=2)
+    def test_if_server_side_cursors_are_disabled_rows_are_still_fetched_in_chunks(
+        self,
+    ):
+        self.make_sales(self.user.seller, ["2024-01-01T00:00:00Z"] * 5)
+        url = reverse("seller-sales-export", kwargs={"seller_pk": self.user.seller.id})
+
+        with patch.dict(
+            connection.settings_dict, {"DISABLE_SERVER_SIDE_CURSORS": True}
+        ):
+            response = self.client.get(url)
+            parts = iter(response.streaming_content)
+            first = next(parts)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT count(*) FROM pg_cursors WHERE name LIKE 'store_export_%%'"
+                )
+                (open_cursors,) = cursor.fetchone()
+            content = (first + b"".join(parts)).decode()
+
+        self.assertEqual(open_cursors, 1)
+        self.assertEqual(len(first.decode().splitlines()), 3)
+        self.assertEqual(len(content.splitlines()), 6)
+
+
+class TestASGIExports(ClientMixin, TransactionTestCase):
+    def request(self, path, token):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 1),
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(ASGIHandler()(scope, receive, send))
+        return messages
+
+    @override_settings(STORE_EXPORT_CHUNK_SIZE=2)
+    def test_if_export_is_served_over_asgi_body_is_streamed(self):
+        user = baker.make(User)
+        self.make_sales(user.seller, ["2024-01-01T00:00:00Z"] * 3)
+        token = Token.objects.create(user=user)
+        path = reverse("seller-sales-export", kwargs={"seller_pk": user.seller.id})
+
+        start, *body, end = self.request(path, token.key)
+
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+        self.assertGreater(len(body), 1)
+        self.assertFalse(end.get("more_body"))
+        content = b"".join(message["body"] for message in body).decode()
+        self.assertEqual(len(content.splitlines()), 4)
@@ -0,0 +1,135 @@
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config.metrics import normalize
+from model_bakery import baker
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    @override_settings(METRICS_TOKEN="secret")
+    def scrape(self):
+        return APIClient().get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+    def get_sales(self):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        return self.client.get(url)
+
+
+class TestMetrics(TestCase):
+    def test_if_route_is_requested_latency_and_queries_are_recorded(self):
+        labels = {"route": "seller-sales-list", "method": "GET"}
+        requests = self.sample(
+            "http_request_duration_seconds_count", status="200", **labels
+        )
+        queries = self.sample("http_request_queries_sum", **labels)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.get_sales()
+
+        self.assertEqual(
+            self.sample("http_request_duration_seconds_count", status="200", **labels),
+            requests + 1,
+        )
+        self.assertEqual(
+            self.sample("http_request_queries_sum", **labels),
+            queries + len(captured),
+        )
+        self.assertGreater(self.sample("http_request_sql_seconds_sum", **labels), 0)
+
+    def test_if_route_is_requested_statements_are_recorded(self):
+        self.get_sales()
+
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'sql_statement_calls_total{route="seller-sales-list",'
+            'statement="SELECT COUNT(*) AS \\"__count\\" FROM \\"store_sale\\"',
+            response.content.decode(),
+        )
+
+    def test_if_statements_differ_only_in_literals_they_are_normalized_alike(self):
+        first = normalize("SELECT x FROM t WHERE id IN (%s, %s) LIMIT 21")
+        second = normalize("SELECT x FROM t WHERE id IN (%s, %s, %s) LIMIT 10")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, "SELECT x FROM t WHERE id IN (%s, ...) LIMIT %s")
+
+    def test_if_savepoints_differ_only_in_name_they_are_normalized_alike(self):
+        first = normalize('SAVEPOINT "s140086725159808_x8"')
+        second = normalize('RELEASE SAVEPOINT "s140086725163904_x12"')
+
+        self.assertEqual(first, 'SAVEPOINT "%s"')
+        self.assertEqual(second, 'RELEASE SAVEPOINT "%s"')
+
+    def test_if_store_figures_are_scraped_they_are_included(self):
+        self.get_sales()
+        self.get_sales()
+
+        response = self.scrape()
+
+        self.assertIn(
+            'store_response_cache_total{outcome="hit",view="SaleViewSet"} 1.0',
+            response.content.decode(),
+        )
+        self.assertIn(
+            "store_reconciliation_mismatched_credits 0.0", response.content.decode()
+        )
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_if_token_is_not_set_outside_debug_returns_403(self):
+        response = APIClient().get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=True)
+    def test_if_token_is_not_set_in_debug_returns_200(self):
+        response = APIClient().get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_if_token_is_set_and_missing_returns_403(self):
+        response = APIClient().get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_if_token_is_set_and_given_returns_200(self):
+        response = APIClient().get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestCreditQueries(TestCase):
+    def test_if_credits_are_listed_transaction_logs_are_not_loaded(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("credit-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any("store_credittransactionlog" in query["sql"] for query in captured)
+        )
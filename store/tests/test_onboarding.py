@@ -0,0 +1,142 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store.models import Credit, CreditStripe, Seller
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = baker.make(User)
+
+    def authenticate(self, is_staff=False):
+        if is_staff:
+            self.user.is_staff = True
+            self.user.save(update_fields=["is_staff"])
+
+        self.client.force_authenticate(self.user)
+
+    def make_rows(self, count, prefix="seller"):
+        return [
+            {"email": f"{prefix}{index}@example.com", "password": f"Kq7!vz{index}x"}
+            for index in range(count)
+        ]
+
+    def post_sellers(self, rows):
+        return self.client.post(
+            reverse("seller-bulk"),
+            json.dumps({"sellers": rows}),
+            content_type="application/json",
+        )
+
+
+class TestBulkSellers(TestCase):
+    def test_if_user_is_not_staff_returns_403(self):
+        self.authenticate()
+
+        response = self.post_sellers(self.make_rows(1))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_data_is_invalid_returns_400(self):
+        self.authenticate(is_staff=True)
+
+        response = self.post_sellers(
+            [{"email": "not-an-email"}, {"email": "a@example.com", "password": "1"}]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data["sellers"][0])
+        self.assertIn("password", response.data["sellers"][1])
+
+    def test_if_data_is_valid_creates_users_sellers_and_credits_returns_201(self):
+        rows = self.make_rows(3)
+        rows[0].update(first_name="Sara", last_name="Ahmadi")
+        self.authenticate(is_staff=True)
+
+        response = self.post_sellers(rows)
+        user = User.objects.get(email="seller0@example.com")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 3)
+        self.assertEqual(response.data["created"][0]["email"], user.email)
+        self.assertEqual(response.data["created"][0]["id"], user.seller.id)
+        self.assertTrue(user.check_password("Kq7!vz0x"))
+        self.assertEqual(user.seller.first_name, "Sara")
+        self.assertEqual(user.seller.credit.balance, 0)
+
+    def test_if_emails_exist_or_repeat_skips_them_returns_201(self):
+        rows = self.make_rows(2) + self.make_rows(1)
+        rows.append({"email": self.user.email})
+        self.authenticate(is_staff=True)
+
+        response = self.post_sellers(rows)
+
+        self.assertEqual(len(response.data["created"]), 2)
+        self.assertEqual(
+            response.data["skipped"], ["seller0@example.com", self.user.email]
+        )
+        self.assertEqual(Seller.objects.count(), 3)
+
+    def test_if_more_sellers_are_posted_query_count_does_not_grow(self):
+        self.authenticate(is_staff=True)
+
+        with CaptureQueriesContext(connection) as few:
+            self.post_sellers(self.make_rows(2, prefix="few"))
+        with CaptureQueriesContext(connection) as many:
+            self.post_sellers(self.make_rows(20, prefix="many"))
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(Credit.objects.count(), 23)
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def test_if_engine_is_striped_creates_stripes_returns_201(self):
+        self.authenticate(is_staff=True)
+
+        self.post_sellers(self.make_rows(2))
+
+        self.assertEqual(
+            CreditStripe.objects.filter(
+                credit__seller__user__email__startswith="seller"
+            ).count(),
+            8,
+        )
+
+
+class TestOnboardSellersCommand(TestCase):
+    def test_if_csv_is_given_creates_valid_rows(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,password,first_name,last_name\n")
+            file.write("a@example.com,Kq7!vz0x,Sara,Ahmadi\n")
+            file.write("b@example.com,,,\n")
+            file.write("broken,Kq7!vz0x,,\n")
+            file.write(f"{self.user.email},Kq7!vz0x,,\n")
+            file.flush()
+
+            call_command(
+                "onboard_sellers",
+                file.name,
+                batch_size=2,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+        self.assertEqual(
+            set(Seller.objects.values_list("user__email", flat=True)),
+            {self.user.email, "a@example.com", "b@example.com"},
+        )
+        self.assertFalse(User.objects.get(email="b@example.com").has_usable_password())
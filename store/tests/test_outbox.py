@@ -0,0 +1,140 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase as BaseTestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store import outbox
+from store.engines import get_engine
+from store.models import Deposit, OutboxEvent
+
+User = get_user_model()
+
+
+@override_settings(STORE_OUTBOX_PARTITIONS=2)
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+        self.client.force_authenticate(self.user)
+        self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+        # Only the events of each test itself are checked.
+        OutboxEvent.objects.all().delete()
+
+    def post_sale(self, amount):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        payload = {"amount": amount, "phone_number": "09123456789"}
+        return self.client.post(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def read_stream(self):
+        entries = outbox.get_redis().xrange("store:events")
+        return [
+            {key.decode(): value.decode() for key, value in fields.items()}
+            for _, fields in entries
+        ]
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestOutbox(TestCase):
+    def test_if_sale_is_created_records_event(self):
+        response = self.post_sale(1000.00)
+
+        event = OutboxEvent.objects.get()
+
+        self.assertEqual(event.type, OutboxEvent.TYPE_SALE_CREATED)
+        self.assertEqual(event.seller_id, self.user.seller.id)
+        self.assertEqual(event.payload["id"], response.data["id"])
+        self.assertEqual(event.payload["amount"], "1000.00")
+        self.assertIsNone(event.dispatched_at)
+
+    @override_settings(STORE_SALE_ENGINE="statement")
+    def test_if_statement_engine_creates_sale_records_same_payload(self):
+        response = self.post_sale(1000.00)
+
+        event = OutboxEvent.objects.get()
+
+        self.assertEqual(
+            set(event.payload),
+            {"id", "seller", "amount", "phone_number", "created_at"},
+        )
+        self.assertEqual(event.payload["id"], response.data["id"])
+        self.assertEqual(event.payload["amount"], "1000.00")
+
+    def test_if_sale_is_rejected_records_no_event(self):
+        self.post_sale(5000.00)
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_if_deposits_are_approved_records_events(self):
+        deposit = baker.make(
+            Deposit, credit=self.user.seller.credit, amount=Decimal("500.00")
+        )
+
+        get_engine().approve_deposits([deposit.id])
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.type, OutboxEvent.TYPE_DEPOSIT_APPROVED)
+        self.assertEqual(event.payload["id"], deposit.id)
+        self.assertEqual(event.payload["seller"], self.user.seller.id)
+
+    def test_if_events_are_relayed_publishes_them_in_order_once(self):
+        self.post_sale(1000.00)
+        self.post_sale(500.00)
+
+        first = outbox.relay(batch_size=1)
+        second = outbox.relay()
+        entries = self.read_stream()
+
+        self.assertEqual(first, 2)
+        self.assertEqual(second, 0)
+        self.assertEqual(
+            [int(entry["id"]) for entry in entries],
+            list(OutboxEvent.objects.order_by("id").values_list("id", flat=True)),
+        )
+        self.assertEqual(json.loads(entries[1]["payload"])["amount"], "500.00")
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at=None).exists())
+
+    def test_if_partition_is_held_by_other_relay_skips_it(self):
+        self.post_sale(1000.00)
+
+        with patch.object(outbox, "try_lock_partition", return_value=False):
+            relayed = outbox.relay()
+
+        self.assertEqual(relayed, 0)
+        self.assertEqual(self.read_stream(), [])
+
+    def test_if_publish_fails_events_stay_pending(self):
+        self.post_sale(1000.00)
+
+        with patch.object(outbox, "publish", side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                outbox.relay()
+
+        self.assertTrue(OutboxEvent.objects.filter(dispatched_at=None).exists())
+
+    def test_if_relayed_events_are_old_prunes_them(self):
+        self.post_sale(1000.00)
+        self.post_sale(500.00)
+        outbox.relay()
+        OutboxEvent.objects.filter(
+            id=OutboxEvent.objects.order_by("id").first().id
+        ).update(dispatched_at=timezone.now() - timedelta(hours=100))
+
+        deleted = outbox.prune(72)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from model_bakery import baker
+from store import partitions, summaries
+from store.models import Sale, SaleIdempotencyKey
+
+User = get_user_model()
+
+
+class TestPartitions(TestCase):
+    def get_partition_names(self, table):
+        return {name for name, _, _ in partitions.get_partitions(table)}
+
+    def test_if_tables_are_partitioned_by_month(self):
+        for table in partitions.PARTITIONED_TABLES:
+            names = self.get_partition_names(table)
+
+            self.assertIn(f"{table}_default", names)
+            self.assertIn(f"{table}_legacy", names)
+
+    def test_if_partitions_are_ensured_ahead_of_time(self):
+        now = datetime(2040, 5, 20, tzinfo=timezone.utc)
+
+        partitions.ensure_partitions(months_ahead=1, now=now)
+
+        for table in partitions.PARTITIONED_TABLES:
+            names = self.get_partition_names(table)
+            self.assertIn(f"{table}_p204005", names)
+            self.assertIn(f"{table}_p204006", names)
+
+    def test_if_partitions_exist_ensuring_again_creates_nothing(self):
+        now = datetime(2040, 5, 20, tzinfo=timezone.utc)
+        partitions.ensure_partitions(months_ahead=1, now=now)
+
+        self.assertEqual(partitions.ensure_partitions(months_ahead=1, now=now), [])
+
+    def test_if_range_is_ensured_only_missing_months_are_created(self):
+        partitions.create_partition(
+            "store_sale", datetime(2042, 2, 1, tzinfo=timezone.utc)
+        )
+
+        created = partitions.ensure_range(
+            datetime(2042, 1, 15, tzinfo=timezone.utc),
+            datetime(2042, 3, 2, tzinfo=timezone.utc),
+        )
+
+        self.assertEqual(
+            created,
+            [
+                "store_sale_p204201",
+                "store_sale_p204203",
+                "store_credittransactionlog_p204201",
+                "store_credittransactionlog_p204202",
+                "store_credittransactionlog_p204203",
+            ],
+        )
+
+    def test_if_default_partition_holds_rows_they_are_moved(self):
+        sale = baker.make(Sale, seller=baker.make(User).seller)
+        Sale.objects.filter(id=sale.id).update(created_at="2050-03-10T00:00:00Z")
+
+        name = partitions.create_partition(
+            "store_sale", datetime(2050, 3, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(name, "store_sale_p205003")
+        self.assertTrue(Sale.objects.filter(id=sale.id).exists())
+
+    def test_if_partitions_expire_they_are_detached(self):
+        partitions.create_partition(
+            "store_sale", datetime(2045, 1, 1, tzinfo=timezone.utc)
+        )
+
+        detached = partitions.detach_partitions(
+            retention_months=1, now=datetime(2045, 6, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertIn("store_sale_p204501", detached)
+        self.assertNotIn("store_sale_p204501", self.get_partition_names("store_sale"))
+
+    def test_if_sales_partition_is_detached_summaries_do_not_drift(self):
+        seller = baker.make(User).seller
+        partitions.create_partition(
+            "store_sale", datetime(2045, 1, 1, tzinfo=timezone.utc)
+        )
+        old, new = baker.make(Sale, seller=seller, amount=100, _quantity=2)
+        Sale.objects.filter(id=old.id).update(created_at="2045-01-10T00:00:00Z")
+        Sale.objects.filter(id=new.id).update(created_at="2045-05-10T00:00:00Z")
+        summaries.backfill([seller.id])
+
+        partitions.detach_partitions(
+            retention_months=1, now=datetime(2045, 6, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(list(Sale.objects.values_list("id", flat=True)), [new.id])
+        self.assertEqual(summaries.find_drift([seller.id]), {})
+        self.assertEqual(summaries.compute([seller.id])[seller.id][:2], [200, 2])
+
+    def test_if_command_runs_reports_partitions(self):
+        stdout = StringIO()
+
+        call_command("manage_partitions", stdout=stdout)
+
+        self.assertIn("store_sale:", stdout.getvalue())
+
+
+class TestSaleIdempotencyKey(TestCase):
+    def test_if_sales_have_keys_rows_are_recorded(self):
+        keyed, unkeyed = baker.make(
+            Sale,
+            seller=baker.make(User).seller,
+            idempotency_key=iter(["abc", None]),
+            _quantity=2,
+        )
+
+        SaleIdempotencyKey.objects.record([keyed, unkeyed])
+
+        self.assertEqual(
+            list(SaleIdempotencyKey.objects.values_list("sale_id", "key")),
+            [(keyed.id, "abc")],
+        )
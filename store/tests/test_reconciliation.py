@@ -0,0 +1,111 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from model_bakery import baker
+from store import reconciliation
+from store.engines import get_engine
+from store.models import (
+    Credit,
+    CreditCheckpoint,
+    CreditTransactionLog,
+    Deposit,
+    ReconciliationPass,
+)
+
+User = get_user_model()
+
+
+@override_settings(STORE_RECONCILE_SETTLE_SECONDS=0, STORE_RECONCILE_CHUNK_SIZE=2)
+class TestReconciliation(TestCase):
+    def setUp(self):
+        self.credits = [baker.make(User).seller.credit for _ in range(3)]
+
+    def deposit(self, credit, amount):
+        deposit = baker.make(Deposit, credit=credit, amount=Decimal(amount))
+        get_engine().approve_deposits([deposit.id])
+
+    def test_if_balances_match_checkpoints_advance(self):
+        for credit in self.credits:
+            self.deposit(credit, "3000.00")
+
+        reconciliation_pass = reconciliation.run_pass()
+
+        last_log = CreditTransactionLog.objects.filter(credit=self.credits[-1]).latest(
+            "id"
+        )
+        checkpoint = CreditCheckpoint.objects.get(credit=self.credits[-1])
+        self.assertEqual(reconciliation_pass.chunks, 2)
+        self.assertEqual(reconciliation_pass.credits_checked, 3)
+        self.assertEqual(reconciliation_pass.mismatches, 0)
+        self.assertIsNotNone(reconciliation_pass.finished_at)
+        self.assertEqual(checkpoint.last_log_id, last_log.id)
+        self.assertEqual(checkpoint.balance, 3000)
+
+    def test_if_pass_runs_again_only_new_activity_is_checked(self):
+        for credit in self.credits:
+            self.deposit(credit, "3000.00")
+        reconciliation.run_pass()
+        self.deposit(self.credits[0], "500.00")
+
+        reconciliation_pass = reconciliation.run_pass()
+
+        self.assertEqual(reconciliation_pass.credits_checked, 1)
+        self.assertEqual(
+            CreditCheckpoint.objects.get(credit=self.credits[0]).balance, 3500
+        )
+
+    def test_if_balance_drifts_from_ledger_mismatch_is_reported(self):
+        self.deposit(self.credits[0], "3000.00")
+        reconciliation.run_pass()
+        Credit.objects.filter(id=self.credits[0].id).update(balance=2500)
+
+        reconciliation_pass = reconciliation.run_pass(all_credits=True)
+
+        checkpoint = CreditCheckpoint.objects.get(credit=self.credits[0])
+        self.assertEqual(reconciliation_pass.mismatches, 1)
+        self.assertEqual(checkpoint.difference, -500)
+        self.assertEqual(checkpoint.balance, 3000)
+        self.assertEqual(reconciliation.get_metrics()["mismatched_credits"], 1)
+
+    def test_if_metrics_are_cached_a_checked_chunk_refreshes_them(self):
+        cache.clear()
+        self.deposit(self.credits[0], "3000.00")
+        reconciliation.run_pass()
+        self.assertEqual(reconciliation.get_cached_metrics()["mismatched_credits"], 0)
+        Credit.objects.filter(id=self.credits[0].id).update(balance=2500)
+
+        with self.assertNumQueries(0):
+            cached = reconciliation.get_cached_metrics()
+        reconciliation.run_pass(all_credits=True)
+
+        self.assertEqual(cached["mismatched_credits"], 0)
+        self.assertEqual(reconciliation.get_cached_metrics()["mismatched_credits"], 1)
+
+    @override_settings(STORE_RECONCILE_SETTLE_SECONDS=3600)
+    def test_if_rows_are_not_settled_checkpoint_stays(self):
+        self.deposit(self.credits[0], "3000.00")
+
+        reconciliation_pass = reconciliation.run_pass(all_credits=True)
+
+        checkpoint = CreditCheckpoint.objects.get(credit=self.credits[0])
+        self.assertEqual(reconciliation_pass.mismatches, 0)
+        self.assertEqual(checkpoint.last_log_id, 0)
+        self.assertEqual(checkpoint.balance, 0)
+
+    def test_if_pass_is_running_new_pass_is_skipped(self):
+        ReconciliationPass.objects.create(last_log_id=0, chunks=1)
+
+        self.assertIsNone(reconciliation.run_pass())
+
+    def test_if_command_finds_mismatch_raises_error(self):
+        self.deposit(self.credits[0], "3000.00")
+        Credit.objects.filter(id=self.credits[0].id).update(balance=0)
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_credits", stdout=StringIO())
@@ -0,0 +1,170 @@
+import json
+from contextlib import ExitStack
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config import replicas
+from model_bakery import baker
+from store.engines import get_engine
+from store.models import Deposit, Sale
+
+User = get_user_model()
+
+
+class ClientMixin:
+    def make_client(self, user):
+        client = APIClient()
+        token = Token.objects.create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def post_sale(self, client, user):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": user.seller.id})
+        payload = {"amount": "10.00", "phone_number": "09123456789"}
+        return client.post(url, json.dumps(payload), content_type="application/json")
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+@override_settings(DATABASE_REPLICAS=["replica0"])
+class TestReplicaRouter(TestCase):
+    def test_if_reads_are_enabled_replica_is_picked(self):
+        router = replicas.ReplicaRouter()
+
+        with replicas.replica_reads():
+            self.assertEqual(router.db_for_read(Sale), "replica0")
+            self.assertEqual(router.db_for_write(Sale), "default")
+        self.assertEqual(router.db_for_read(Sale), "default")
+
+    def test_if_database_is_replica_migrations_are_skipped(self):
+        router = replicas.ReplicaRouter()
+
+        self.assertTrue(router.allow_migrate("default", "store"))
+        self.assertFalse(router.allow_migrate("replica0", "store"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica0"])
+class TestReplicaRouting(ClientMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = baker.make(User)
+        self.staff = baker.make(User, is_staff=True)
+        self.deposit(self.seller.seller.credit.id, Decimal("100.00"))
+
+        # The replica alias does not exist here, so every read is recorded
+        # with the decision the router made and then served by the primary.
+        self.reads = []
+
+        def db_for_read(router, model, **hints):
+            self.reads.append(replicas.reads.get())
+            return "default"
+
+        patcher = mock.patch.object(replicas.ReplicaRouter, "db_for_read", db_for_read)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_if_staff_lists_sellers_they_are_read_from_replica(self):
+        response = self.make_client(self.staff).get(reverse("seller-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(True, self.reads)
+
+    def test_if_staff_lists_ledger_it_is_read_from_replica(self):
+        url = reverse(
+            "credit-transaction-logs-list",
+            kwargs={"credit_pk": self.seller.seller.credit.id},
+        )
+
+        response = self.make_client(self.staff).get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(True, self.reads)
+
+    def test_if_seller_wrote_reads_stay_on_primary(self):
+        client = self.make_client(self.seller)
+        self.assertEqual(
+            self.post_sale(client, self.seller).status_code, status.HTTP_201_CREATED
+        )
+        self.reads.clear()
+
+        url = reverse("credit-detail", kwargs={"pk": self.seller.seller.credit.id})
+        response = client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(True, self.reads)
+
+    def test_if_response_is_cached_it_is_built_from_primary(self):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.seller.seller.id})
+
+        response = self.make_client(self.seller).get(url)
+
+        self.assertEqual(response["X-Cache"], "miss")
+        self.assertNotIn(True, self.reads)
+
+    def test_if_write_is_rejected_client_is_not_sticky(self):
+        client = self.make_client(self.seller)
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.seller.seller.id})
+
+        response = client.post(url, {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(replicas.is_sticky(response.wsgi_request))
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "DATABASE_REPLICA_URLS is not set.")
+class TestReplicaDatabases(ClientMixin, TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.seller = baker.make(User)
+        self.staff = baker.make(User, is_staff=True)
+        with transaction.atomic():
+            self.deposit(self.seller.seller.credit.id, Decimal("100.00"))
+
+    def count_replica_queries(self, request):
+        with ExitStack() as stack:
+            captured = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in settings.DATABASE_REPLICAS
+            ]
+            response = request()
+        return response, sum(len(context) for context in captured)
+
+    def test_if_staff_lists_sellers_replica_is_queried(self):
+        client = self.make_client(self.staff)
+
+        response, queries = self.count_replica_queries(
+            lambda: client.get(reverse("seller-list"))
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(queries, 0)
+
+    def test_if_seller_wrote_replica_is_not_queried(self):
+        client = self.make_client(self.seller)
+        url = reverse(
+            "seller-deposits-list", kwargs={"seller_pk": self.seller.seller.id}
+        )
+        _, before = self.count_replica_queries(lambda: client.get(url))
+        self.post_sale(client, self.seller)
+
+        response, after = self.count_replica_queries(lambda: client.get(url))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(before, 0)
+        self.assertEqual(after, 0)
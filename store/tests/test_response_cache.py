@@ -0,0 +1,128 @@
+import json
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store import response_cache
+from store.engines import get_engine
+from store.models import Deposit
+from store.views import SaleViewSet
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+
+    def get_sales(self):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        return self.client.get(url)
+
+    def get_credit(self):
+        url = reverse("credit-detail", kwargs={"pk": self.user.seller.credit.id})
+        return self.client.get(url)
+
+    def post_sale(self, amount):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        payload = {"amount": amount, "phone_number": "09123456789"}
+        return self.client.post(
+            url, json.dumps(payload), content_type="application/json"
+        )
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestResponseCache(TestCase):
+    def test_if_sales_are_listed_twice_second_is_hit_returns_200(self):
+        first = self.get_sales()
+
+        with self.assertNumQueries(1):
+            second = self.get_sales()
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first["X-Cache"], "miss")
+        self.assertEqual(second["X-Cache"], "hit")
+        self.assertEqual(second.data, first.data)
+
+    def test_if_sale_is_created_list_is_recomputed_returns_200(self):
+        self.get_sales()
+        self.post_sale(1000.00)
+
+        response = self.get_sales()
+
+        self.assertEqual(response["X-Cache"], "miss")
+        self.assertEqual(response.data["count"], 1)
+
+    def test_if_deposit_is_made_credit_is_recomputed_returns_200(self):
+        self.get_credit()
+        self.deposit(self.user.seller.credit.id, Decimal("500.00"))
+
+        response = self.get_credit()
+
+        self.assertEqual(response["X-Cache"], "miss")
+        self.assertEqual(response.data["balance"], 3500)
+
+    def test_if_user_is_staff_seller_list_is_not_cached_returns_200(self):
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+
+        response = self.client.get(reverse("seller-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Cache", response)
+
+    def test_if_responses_are_served_hits_and_misses_are_counted(self):
+        self.get_sales()
+        self.get_sales()
+        self.get_sales()
+
+        stats = response_cache.get_stats()
+
+        self.assertEqual(stats["SaleViewSet:miss"], 1)
+        self.assertEqual(stats["SaleViewSet:hit"], 2)
+
+    def test_if_response_is_being_recomputed_waits_for_it_returns_hit(self):
+        self.get_sales()
+        (key,) = cache.keys("store:response:*")
+        stored = cache.get(key)
+        cache.delete(key)
+        cache.set(f"{key}:lock", 1)
+
+        timer = threading.Timer(0.1, cache.set, args=(key, stored))
+        timer.start()
+        response = self.get_sales()
+        timer.join()
+
+        self.assertEqual(response["X-Cache"], "hit")
+        self.assertEqual(response.data, stored["data"])
+
+    def test_if_recompute_wait_expires_response_is_not_stored(self):
+        self.get_sales()
+        (key,) = cache.keys("store:response:*")
+        cache.delete(key)
+        cache.set(f"{key}:lock", 1)
+
+        with patch.object(SaleViewSet, "response_cache_wait", 0):
+            response = self.get_sales()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "miss")
+        self.assertIsNone(cache.get(key))
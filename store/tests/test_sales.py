@@ -1,20 +1,33 @@
 import json
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.urls import reverse
-from django.test import TestCase as BaseTestCase
+from django.utils import timezone
+from django.db import connection, transaction
+from django.test import TestCase as BaseTestCase, TransactionTestCase, override_settings
 
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
 from model_bakery import baker
-from store.models import Sale
+from store import hot_ledger, stripes, tasks
+from store.engines import get_engine
+from store.models import Credit, CreditStripe, CreditTransactionLog, Deposit, Sale
 
 User = get_user_model()
 
 
 class TestCase(BaseTestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = baker.make(User)
 
@@ -25,8 +38,18 @@ class TestCase(BaseTestCase):
 
         self.client.force_authenticate(self.user)
 
-    def post_sale(self, payload, seller_id):
+    def authenticate_with_token(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def post_sale(self, payload, seller_id, **headers):
         url = reverse("seller-sales-list", kwargs={"seller_pk": seller_id})
+        return self.client.post(
+            url, payload, content_type="application/json", **headers
+        )
+
+    def post_bulk_sales(self, payload, seller_id):
+        url = reverse("seller-sales-bulk", kwargs={"seller_pk": seller_id})
         return self.client.post(url, payload, content_type="application/json")
 
     def list_sale(self, seller_id):
@@ -109,6 +132,556 @@ class TestCreateSale(TestCase):
         self.assertGreater(credit.transaction_logs.count(), 0)
 
 
+class TestCollapseStripes(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.payload = {
+            "amount": 4000.00,
+            "phone_number": "09123456789",
+        }
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def deposit(self, amount):
+        stripes.deposit(self.user.seller.credit.id, amount)
+
+    def test_if_engine_is_switched_stripes_are_folded_into_balance_returns_201(self):
+        self.deposit(Decimal("4000.03"))
+        self.authenticate()
+
+        call_command("collapse_credit_stripes", stdout=StringIO())
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(credit.stripes.count(), 0)
+        self.assertEqual(credit.balance, Decimal("0.03"))
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def test_if_engine_is_still_striped_command_refuses(self):
+        self.deposit(Decimal("4000.03"))
+
+        with self.assertRaises(CommandError):
+            call_command("collapse_credit_stripes", stdout=StringIO())
+
+        self.assertEqual(self.user.seller.credit.stripes.count(), 4)
+
+
+@override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+class TestCreateStripedSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.payload = {
+            "amount": 1000.00,
+            "phone_number": "09123456789",
+        }
+
+    def deposit(self, amount):
+        stripes.deposit(self.user.seller.credit.id, amount)
+
+    def get_seller(self):
+        url = reverse("seller-detail", kwargs={"pk": self.user.seller.id})
+        return self.client.get(url)
+
+    def test_if_deposit_is_spread_across_stripes_returns_201(self):
+        self.deposit(Decimal("4000.03"))
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(credit.stripes.count(), 4)
+        self.assertEqual(credit.total_balance, Decimal("3000.03"))
+
+    def test_if_balance_is_insufficient_returns_400(self):
+        self.deposit(Decimal("999.99"))
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_no_single_stripe_is_funded_debits_across_stripes_returns_201(self):
+        self.deposit(Decimal("1200.00"))
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(credit.total_balance, Decimal("200.00"))
+
+    def test_if_credit_balance_is_moved_into_stripes_returns_201(self):
+        CreditStripe.objects.filter(credit=self.user.seller.credit).delete()
+        credit = self.user.seller.credit
+        credit.balance = 2000
+        credit.save(update_fields=["balance"])
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(credit.balance, 0)
+        self.assertEqual(credit.total_balance, Decimal("1000.00"))
+
+    def test_if_seller_balance_is_summed_returns_200(self):
+        self.deposit(Decimal("3000.00"))
+        self.authenticate()
+
+        response = self.get_seller()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["balance"], Decimal("3000.00"))
+
+
+@override_settings(STORE_SALE_ENGINE="statement")
+class TestCreateStatementSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.payload = {
+            "amount": 1000.00,
+            "phone_number": "09123456789",
+        }
+
+    def set_credit_balance(self, balance):
+        credit = self.user.seller.credit
+        credit.balance = balance
+        credit.save(update_fields=["balance"])
+        return credit
+
+    def test_if_balance_is_insufficient_returns_400(self):
+        credit = self.set_credit_balance(999.99)
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(credit.balance, Decimal("999.99"))
+        self.assertFalse(credit.transaction_logs.exists())
+        self.assertFalse(Sale.objects.exists())
+
+    def test_if_data_is_valid_returns_201(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["id"], Sale.objects.get().id)
+        self.assertEqual(credit.balance, 1000.00)
+        self.assertEqual(credit.transaction_logs.count(), 1)
+
+    def test_if_sale_uses_fixed_number_of_queries_returns_201(self):
+        self.set_credit_balance(2000.00)
+        self.authenticate_with_token()
+
+        with self.assertNumQueries(4):
+            response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+@override_settings(STORE_SALE_ENGINE="redis")
+class TestCreateRedisSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.redis = hot_ledger.get_redis()
+        for key in self.redis.keys("store:hot:*"):
+            self.redis.delete(key)
+        self.payload = {
+            "amount": 1000.00,
+            "phone_number": "09123456789",
+        }
+
+    def set_credit_balance(self, balance):
+        credit = self.user.seller.credit
+        credit.balance = balance
+        credit.save(update_fields=["balance"])
+        return credit
+
+    def test_if_balance_is_insufficient_returns_400(self):
+        self.set_credit_balance(999.99)
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.redis.xlen(hot_ledger.STREAM), 0)
+
+    def test_if_ledger_is_paused_returns_503(self):
+        self.set_credit_balance(2000.00)
+        hot_ledger.pause()
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_if_sale_is_flushed_to_postgres_returns_201(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+
+        response = self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        self.assertFalse(Sale.objects.exists())
+        flushed = hot_ledger.flush()
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(flushed, 1)
+        self.assertEqual(Sale.objects.get().id, response.data["id"])
+        self.assertEqual(credit.balance, 1000.00)
+        self.assertEqual(credit.transaction_logs.count(), 1)
+        self.assertEqual(int(self.redis.get(hot_ledger.pending_key(credit.id))), 0)
+
+    def test_if_entries_are_applied_twice_sale_is_written_once(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+        self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        batch = self.redis.xrange(hot_ledger.STREAM)
+        entries = [hot_ledger.decode(fields) for _, fields in batch]
+
+        hot_ledger.apply(entries)
+        hot_ledger.apply(entries)
+        credit.refresh_from_db()
+
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(credit.balance, 1000.00)
+
+    def test_if_deposit_is_approved_before_flush_balance_at_is_latest(self):
+        credit = self.set_credit_balance(2000.00)
+        deposit = baker.make(Deposit, credit=credit, amount=Decimal("500.00"))
+        self.authenticate()
+        self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        get_engine().approve_deposits([deposit.id])
+        hot_ledger.flush()
+
+        self.assertEqual(
+            CreditTransactionLog.objects.balance_at(credit.id, timezone.now()),
+            Decimal("1500.00"),
+        )
+
+    def test_if_balance_is_reloaded_before_deposit_is_applied_counts_it_once(self):
+        credit = self.user.seller.credit
+        deposit = baker.make(Deposit, credit=credit, amount=Decimal("1000.00"))
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            get_engine().approve_deposits([deposit.id])
+        hot_ledger.load_balance(credit.id)
+        for callback in callbacks:
+            callback()
+        payload = {"amount": 1500.00, "phone_number": "09123456789"}
+        response = self.post_sale(json.dumps(payload), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_flush_is_not_acknowledged_when_balance_loads_it_is_not_lowered(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+        self.post_sale(json.dumps(self.payload), self.user.seller.id)
+        batch = self.redis.xrange(hot_ledger.STREAM)
+
+        # The flush has committed to Postgres but not acknowledged its
+        # entries when the balance is reloaded.
+        hot_ledger.apply([hot_ledger.decode(fields) for _, fields in batch])
+        self.redis.delete(hot_ledger.balance_key(credit.id))
+        hot_ledger.load_balance(credit.id)
+        loaded = int(self.redis.get(hot_ledger.balance_key(credit.id)))
+        hot_ledger.flush()
+
+        self.assertEqual(loaded, 1000_00)
+        self.assertEqual(
+            int(self.redis.get(hot_ledger.balance_key(credit.id))), 1000_00
+        )
+
+    def test_if_retry_was_debited_twice_it_is_refunded_on_flush(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+        self.post_sale(
+            json.dumps(self.payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="a"
+        )
+        cache.clear()
+        self.post_sale(
+            json.dumps(self.payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY="a"
+        )
+
+        hot_ledger.flush()
+        credit.refresh_from_db()
+
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(credit.balance, 1000.00)
+        self.assertEqual(
+            int(self.redis.get(hot_ledger.balance_key(credit.id))), 1000_00
+        )
+
+    def test_if_rebuild_reloads_balances_from_postgres(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+        self.post_sale(json.dumps(self.payload), self.user.seller.id)
+
+        hot_ledger.rebuild()
+        credit.refresh_from_db()
+
+        self.assertEqual(credit.balance, 1000.00)
+        self.assertEqual(
+            int(self.redis.get(hot_ledger.balance_key(credit.id))), 1000_00
+        )
+        self.assertFalse(self.redis.exists(hot_ledger.PAUSED))
+
+
+@override_settings(STORE_SALE_ENGINE="redis")
+class TestRedisFlushRace(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = hot_ledger.get_redis()
+        for key in self.redis.keys("store:hot:*"):
+            self.redis.delete(key)
+        self.user = baker.make(User)
+        Credit.objects.filter(seller=self.user.seller).update(balance=2000)
+
+    def post_sale(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+        client.post(url, {"amount": "1000.00", "phone_number": "09123456789"})
+
+    def test_if_batch_is_applied_twice_at_once_sales_are_written_once(self):
+        self.post_sale()
+        entries = [
+            hot_ledger.decode(fields)
+            for _, fields in self.redis.xrange(hot_ledger.STREAM)
+        ]
+        applied = threading.Event()
+
+        # The flusher holds its batch uncommitted while rebuild applies the
+        # same entries.
+        def flush_slowly():
+            with transaction.atomic():
+                hot_ledger.apply(entries)
+                applied.set()
+                time.sleep(0.3)
+            connection.close()
+
+        flusher = threading.Thread(target=flush_slowly)
+        flusher.start()
+        applied.wait()
+        hot_ledger.apply(entries)
+        flusher.join()
+
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(Credit.objects.get(seller=self.user.seller).balance, 1000)
+
+    def test_if_ledger_is_paused_flush_task_skips_the_stream(self):
+        self.post_sale()
+        hot_ledger.pause()
+        self.addCleanup(hot_ledger.resume)
+
+        flushed = tasks.flush_hot_ledger()
+
+        self.assertEqual(flushed, 0)
+        self.assertEqual(self.redis.xlen(hot_ledger.STREAM), 1)
+
+
+class TestBulkCreateSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sales = [
+            {"amount": 600.00, "phone_number": "09123456789"},
+            {"amount": 500.00, "phone_number": "09123456789"},
+            {"amount": 400.00, "phone_number": "09123456789"},
+        ]
+
+    def set_credit_balance(self, balance):
+        credit = self.user.seller.credit
+        credit.balance = balance
+        credit.save(update_fields=["balance"])
+        return credit
+
+    def test_if_user_is_not_owner_returns_403(self):
+        another_user = baker.make(User)
+        self.client.force_authenticate(another_user)
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales}), self.user.seller.id
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_if_sales_are_empty_returns_400(self):
+        self.authenticate()
+
+        response = self.post_bulk_sales(json.dumps({"sales": []}), self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_batch_is_funded_returns_201(self):
+        credit = self.set_credit_balance(2000.00)
+        self.authenticate()
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales}), self.user.seller.id
+        )
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created"] * 3,
+        )
+        self.assertEqual(credit.balance, 500.00)
+        self.assertEqual(credit.transaction_logs.count(), 3)
+        self.assertEqual(Sale.objects.count(), 3)
+
+    def test_if_atomic_batch_is_underfunded_returns_400(self):
+        credit = self.set_credit_balance(1000.00)
+        self.authenticate()
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales}), self.user.seller.id
+        )
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["sales"][1], {"amount": ["Insufficient balance."]}
+        )
+        self.assertEqual(credit.balance, 1000.00)
+        self.assertFalse(Sale.objects.exists())
+
+    def test_if_partial_batch_is_underfunded_returns_201(self):
+        credit = self.set_credit_balance(1000.00)
+        self.authenticate()
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales, "atomic": False}), self.user.seller.id
+        )
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "rejected", "created"],
+        )
+        self.assertEqual(credit.balance, 0)
+        self.assertEqual(Sale.objects.count(), 2)
+
+    @override_settings(STORE_SALE_ENGINE="striped", STORE_CREDIT_STRIPES=4)
+    def test_if_striped_batch_is_funded_returns_201(self):
+        stripes.deposit(self.user.seller.credit.id, Decimal("2000.00"))
+        self.authenticate()
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales}), self.user.seller.id
+        )
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(credit.total_balance, Decimal("500.00"))
+
+    @override_settings(STORE_SALE_ENGINE="redis")
+    def test_if_redis_partial_batch_is_flushed_returns_201(self):
+        redis = hot_ledger.get_redis()
+        for key in redis.keys("store:hot:*"):
+            redis.delete(key)
+        credit = self.set_credit_balance(1000.00)
+        self.authenticate()
+
+        response = self.post_bulk_sales(
+            json.dumps({"sales": self.sales, "atomic": False}), self.user.seller.id
+        )
+        hot_ledger.flush()
+        credit.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "rejected", "created"],
+        )
+        self.assertEqual(credit.balance, 0)
+        self.assertEqual(Sale.objects.count(), 2)
+
+
+class TestIdempotentCreateSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.payload = {
+            "amount": 1000.00,
+            "phone_number": "09123456789",
+        }
+        credit = self.user.seller.credit
+        credit.balance = 3000
+        credit.save(update_fields=["balance"])
+
+    def post_sale_with_key(self, key):
+        return self.post_sale(
+            json.dumps(self.payload), self.user.seller.id, HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_if_key_is_too_long_returns_400(self):
+        self.authenticate()
+
+        response = self.post_sale_with_key("k" * 65)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_if_key_is_retried_replays_response_returns_201(self):
+        self.authenticate()
+
+        first = self.post_sale_with_key("retry-1")
+        second = self.post_sale_with_key("retry-1")
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(credit.balance, 2000)
+
+    def test_if_cached_response_is_lost_returns_stored_sale_201(self):
+        self.authenticate()
+
+        first = self.post_sale_with_key("retry-2")
+        cache.clear()
+        second = self.post_sale_with_key("retry-2")
+        credit = self.user.seller.credit
+        credit.refresh_from_db()
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(credit.balance, 2000)
+
+    def test_if_keys_differ_creates_both_returns_201(self):
+        self.authenticate()
+
+        self.post_sale_with_key("first")
+        response = self.post_sale_with_key("second")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Sale.objects.count(), 2)
+
+    @override_settings(STORE_SALE_ENGINE="statement")
+    def test_if_statement_engine_retries_key_returns_stored_sale_201(self):
+        self.authenticate()
+
+        first = self.post_sale_with_key("retry-3")
+        cache.clear()
+        second = self.post_sale_with_key("retry-3")
+
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(Sale.objects.count(), 1)
+
+
 class TestListSale(TestCase):
     def setUp(self):
         self.SALES_COUNT = 10
@@ -213,3 +786,52 @@ class TestDeleteSale(TestCase):
         response = self.delete_sale(self.user.seller.id, sale_id)
 
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class TestCursorListSale(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sales = baker.make(Sale, seller=self.user.seller, _quantity=15)
+
+    def list_sale_page(self, url):
+        return self.client.get(url)
+
+    def test_if_cursor_mode_pages_through_all_sales_returns_200(self):
+        self.authenticate()
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+
+        first = self.list_sale_page(f"{url}?pagination=cursor")
+        second = self.list_sale_page(first.data["next"])
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", first.data)
+        self.assertEqual(len(first.data["results"]), 10)
+        self.assertEqual(len(second.data["results"]), 5)
+        self.assertEqual(
+            {sale["id"] for sale in first.data["results"] + second.data["results"]},
+            {sale.id for sale in self.sales},
+        )
+        self.assertIsNone(second.data["next"])
+
+    def test_if_cursor_mode_skips_count_query_returns_200(self):
+        self.authenticate_with_token()
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+
+        with self.assertNumQueries(2):
+            response = self.list_sale_page(f"{url}?pagination=cursor&limit=5")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+
+
+class TestFilterListSale(TestCase):
+    def test_if_created_at_range_is_given_returns_sales_in_range_200(self):
+        old, recent = baker.make(Sale, seller=self.user.seller, _quantity=2)
+        Sale.objects.filter(id=old.id).update(created_at="2020-01-15T00:00:00Z")
+        self.authenticate()
+        url = reverse("seller-sales-list", kwargs={"seller_pk": self.user.seller.id})
+
+        response = self.client.get(f"{url}?created_at__gte=2021-01-01T00:00:00Z")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([sale["id"] for sale in response.data["results"]], [recent.id])
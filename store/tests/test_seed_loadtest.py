@@ -0,0 +1,52 @@
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from rest_framework.authtoken.models import Token
+
+from store.models import Credit, Seller
+
+
+class TestSeedLoadtestCommand(TestCase):
+    def seed(self, path, balance="500"):
+        call_command(
+            "seed_loadtest",
+            sellers=3,
+            balance=Decimal(balance),
+            output=path,
+            stdout=StringIO(),
+        )
+        with open(path) as file:
+            return json.load(file)
+
+    def test_if_run_creates_funded_sellers_with_tokens(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as file:
+            seed = self.seed(file.name)
+
+        credits = Credit.objects.filter(id__in=[s["credit"] for s in seed["sellers"]])
+
+        self.assertEqual(len(seed["sellers"]), 3)
+        self.assertEqual([credit.total_balance for credit in credits], [500] * 3)
+        self.assertTrue(Token.objects.get(key=seed["staff_token"]).user.is_staff)
+        self.assertEqual(
+            Token.objects.get(key=seed["sellers"][0]["token"]).user.seller.id,
+            seed["sellers"][0]["id"],
+        )
+
+    def test_if_run_twice_reuses_sellers_and_tops_them_up(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as file:
+            first = self.seed(file.name, balance="500")
+            second = self.seed(file.name, balance="800")
+
+        credit = Credit.objects.get(id=second["sellers"][0]["credit"])
+
+        self.assertEqual(
+            [seller["id"] for seller in first["sellers"]],
+            [seller["id"] for seller in second["sellers"]],
+        )
+        self.assertEqual(Seller.objects.count(), 4)
+        self.assertEqual(credit.total_balance, 800)
@@ -0,0 +1,115 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from model_bakery import baker
+from store import summaries
+from store.engines import get_engine
+from store.models import Sale, Deposit
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = baker.make(User)
+
+    def authenticate(self, is_staff=False):
+        if is_staff:
+            self.user.is_staff = True
+            self.user.save(update_fields=["is_staff"])
+
+        self.client.force_authenticate(self.user)
+
+    def list_sellers(self):
+        return self.client.get(reverse("seller-list"))
+
+    def get_seller(self, seller_id):
+        return self.client.get(reverse("seller-detail", kwargs={"pk": seller_id}))
+
+    def post_sale(self, payload, seller_id):
+        url = reverse("seller-sales-list", kwargs={"seller_pk": seller_id})
+        return self.client.post(url, payload, content_type="application/json")
+
+    def deposit(self, credit_id, amount):
+        deposit = baker.make(Deposit, credit_id=credit_id, amount=amount)
+        get_engine().approve_deposits([deposit.id])
+
+
+class TestRetrieveSeller(TestCase):
+    def test_if_user_is_anonymous_returns_401(self):
+        response = self.get_seller(self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_if_totals_follow_sales_and_deposits_returns_200(self):
+        self.deposit(self.user.seller.credit.id, Decimal("3000.00"))
+        self.authenticate()
+        self.post_sale(
+            json.dumps({"amount": 1000.00, "phone_number": "09123456789"}),
+            self.user.seller.id,
+        )
+
+        response = self.get_seller(self.user.seller.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["balance"], Decimal("2000.00"))
+        self.assertEqual(response.data["total_sales"], Decimal("1000.00"))
+        self.assertEqual(response.data["sales_count"], 1)
+        self.assertEqual(response.data["total_deposits"], Decimal("3000.00"))
+        self.assertEqual(response.data["deposits_count"], 1)
+
+
+class TestListSeller(TestCase):
+    def test_if_history_grows_query_count_is_constant_returns_200(self):
+        baker.make(User, _quantity=3)
+        self.authenticate(is_staff=True)
+        with self.assertNumQueries(4):
+            self.list_sellers()
+
+        for seller in [self.user.seller] + [user.seller for user in User.objects.all()]:
+            baker.make(Sale, seller=seller, _quantity=20)
+
+        with self.assertNumQueries(4):
+            response = self.list_sellers()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+
+
+class TestSellerSummaryDrift(TestCase):
+    def setUp(self):
+        super().setUp()
+        baker.make(Sale, seller=self.user.seller, amount=100, _quantity=3)
+        baker.make(
+            Deposit,
+            credit=self.user.seller.credit,
+            amount=500,
+            status=Deposit.STATUS_APPROVED,
+        )
+
+    def test_if_history_is_not_summarized_drift_is_found(self):
+        drift = summaries.find_drift([self.user.seller.id])
+
+        self.assertEqual(list(drift), [self.user.seller.id])
+        self.assertRaises(CommandError, call_command, "check_seller_summaries")
+
+    def test_if_backfilled_drift_is_gone(self):
+        call_command("backfill_seller_summaries")
+
+        self.assertEqual(summaries.find_drift([self.user.seller.id]), {})
+        self.assertEqual(
+            summaries.stored([self.user.seller.id])[self.user.seller.id],
+            [Decimal("300.00"), 3, Decimal("500.00"), 1],
+        )
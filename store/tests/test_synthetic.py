@@ -0,0 +1,73 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from store import summaries, synthetic
+from store.models import Credit, CreditTransactionLog, Deposit, Sale, Seller
+
+
+class TestGenerateDatasetCommand(TestCase):
+    def generate(self, **options):
+        call_command(
+            "generate_dataset",
+            sellers=5,
+            sales=400,
+            days=90,
+            workers=1,
+            chunk_size=2,
+            stdout=StringIO(),
+            **options,
+        )
+        return Seller.objects.filter(user__email__startswith="synthetic-")
+
+    def test_if_run_balances_equal_ledger_sums(self):
+        sellers = self.generate()
+
+        for credit in Credit.objects.filter(seller__in=sellers):
+            logs = CreditTransactionLog.objects.filter(credit=credit)
+            last = logs.order_by("created_at", "id").last()
+            self.assertEqual(
+                credit.balance, logs.aggregate(Sum("amount"))["amount__sum"]
+            )
+            self.assertEqual(credit.balance, last.balance_after)
+            self.assertFalse(logs.filter(balance_after__lt=0).exists())
+        self.assertEqual(Sale.objects.filter(seller__in=sellers).count(), 400)
+        self.assertEqual(
+            Deposit.objects.filter(credit__seller__in=sellers).count(),
+            CreditTransactionLog.objects.filter(
+                type=CreditTransactionLog.TYPE_DEPOSIT
+            ).count(),
+        )
+        self.assertEqual(
+            summaries.find_drift(list(sellers.values_list("id", flat=True))), {}
+        )
+
+    def test_if_profile_is_zipf_first_seller_gets_most_sales(self):
+        sellers = self.generate(seller_profile="zipf", zipf_s=1.5)
+
+        counts = [
+            Sale.objects.filter(seller=seller).count()
+            for seller in sellers.order_by("user__email")
+        ]
+
+        self.assertEqual(counts[0], max(counts))
+        self.assertGreater(counts[0], counts[-1] * 5)
+
+
+class TestHistory(TestCase):
+    def test_if_plan_is_repeated_history_is_the_same_and_in_time_order(self):
+        end = timezone.now()
+        plan = synthetic.Plan(
+            3, 300, 5, end - timedelta(days=30), end, time_profile="growth"
+        )
+
+        events = list(synthetic.history(plan, 1))
+
+        self.assertEqual(events, list(synthetic.history(plan, 1)))
+        self.assertEqual([event[0] for event in events], sorted(e[0] for e in events))
+        self.assertTrue(all(event[3] >= 0 for event in events))
+        self.assertTrue(plan.start <= events[0][0] <= events[-1][0] <= plan.end)
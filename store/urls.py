@@ -5,11 +5,19 @@ from .views import (
     CreditTransactionLogViewSet,
     SaleViewSet,
     DepositViewSet,
+    SaleExportViewSet,
+    DepositExportViewSet,
+    CreditTransactionLogExportViewSet,
 )
 
 router = routers.DefaultRouter()
 router.register("sellers", SellerViewSet)
 router.register("credits", CreditViewSet)
+router.register("sales", SaleExportViewSet, basename="sales")
+router.register("deposits", DepositExportViewSet, basename="deposits")
+router.register(
+    "transaction_logs", CreditTransactionLogExportViewSet, basename="transaction-logs"
+)
 
 credit_router = routers.NestedSimpleRouter(router, "credits", lookup="credit")
 credit_router.register(
@@ -1,3 +1,4 @@
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.mixins import (
     ListModelMixin,
     RetrieveModelMixin,
@@ -5,26 +6,57 @@ from rest_framework.mixins import (
     CreateModelMixin,
 )
 from rest_framework.viewsets import GenericViewSet
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
+from config.replicas import ReplicaReadMixin
+
 from .models import Seller, Credit, Deposit, CreditTransactionLog, Sale
 from .serializers import (
     SellerSerializer,
+    BulkSellerSerializer,
     CreditSerializer,
     DepositSerializer,
+    DepositApprovalSerializer,
+    CreditBalanceSerializer,
     CreditTransactionLogSerializer,
     SaleSerializer,
+    BulkSaleSerializer,
 )
-from .pagination import DefaultLimitOffsetPagination
+from .async_views import AsyncReadMixin
+from .authentication import get_principal
+from .exports import ExportMixin
+from .idempotency import IdempotentCreateMixin
+from .pagination import DefaultLimitOffsetPagination, LimitOffsetOrCursorPagination
 from .permissions import IsOwnerOrAdmin
+from .response_cache import CachedResponseMixin, bump
+
+SALE_EXPORT_FIELDS = ["id", "seller", "amount", "phone_number", "created_at"]
+DEPOSIT_EXPORT_FIELDS = ["id", "credit", "amount", "status", "created_at", "updated_at"]
+TRANSACTION_LOG_EXPORT_FIELDS = [
+    "id",
+    "credit",
+    "amount",
+    "balance_after",
+    "type",
+    "created_at",
+]
 
 
 class SellerViewSet(
-    ListModelMixin, RetrieveModelMixin, UpdateModelMixin, GenericViewSet
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    GenericViewSet,
 ):
     queryset = (
         Seller.objects.select_related("credit")
-        .prefetch_related("sales", "credit__deposit_requests")
+        .prefetch_related("summaries", "credit__stripes")
         .all()
     )
     serializer_class = SellerSerializer
@@ -32,57 +64,217 @@ class SellerViewSet(
     pagination_class = DefaultLimitOffsetPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_staff:
-            self.queryset = self.queryset.filter(user=user)
+        principal = get_principal(self.request)
+        if not principal.is_staff:
+            self.queryset = self.queryset.filter(id=principal.seller_id)
         return super().get_queryset()
 
+    def get_cache_seller_id(self):
+        principal = get_principal(self.request)
+        if self.action == "list":
+            return None if principal.is_staff else principal.seller_id
+
+        pk = self.kwargs["pk"]
+        if principal.is_staff or pk == str(principal.seller_id):
+            try:
+                return int(pk)
+            except ValueError:
+                return None
+        return None
+
+    def get_serializer_class(self):
+        if self.action == "bulk":
+            return BulkSellerSerializer
+        return super().get_serializer_class()
 
-class SaleViewSet(CreateModelMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        bump(serializer.instance.id)
+
+    @action(methods=["POST"], detail=False, permission_classes=[IsAdminUser])
+    def bulk(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SaleViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    ExportMixin,
+    IdempotentCreateMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = LimitOffsetOrCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {"created_at": ["gte", "lt"]}
+    export_fields = SALE_EXPORT_FIELDS
+    export_name = "sales"
 
     def get_queryset(self):
         return super().get_queryset().filter(seller=self.kwargs["seller_pk"])
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context["balance"] = self.request.user.seller.credit.balance
-        return context
+    def get_cache_seller_id(self):
+        return int(self.kwargs["seller_pk"])
+
+    def get_serializer_class(self):
+        if self.action == "bulk":
+            return BulkSaleSerializer
+        return super().get_serializer_class()
+
+    @action(methods=["POST"], detail=False)
+    def bulk(self, request, *args, **kwargs):
+        return self.idempotent(self.create_bulk, request, *args, **kwargs)
+
+    def create_bulk(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class DepositApprovalMixin:
+    def get_serializer_class(self):
+        if self.action == "approve":
+            return DepositApprovalSerializer
+        return super().get_serializer_class()
+
+    @action(methods=["POST"], detail=False, permission_classes=[IsAdminUser])
+    def approve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(deposits=self.get_queryset())
+        return Response(serializer.data)
 
 
 class DepositViewSet(
-    CreateModelMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet
+    DepositApprovalMixin,
+    ReplicaReadMixin,
+    AsyncReadMixin,
+    ExportMixin,
+    IdempotentCreateMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
 ):
     queryset = Deposit.objects.all()
     serializer_class = DepositSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = LimitOffsetOrCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {"created_at": ["gte", "lt"]}
+    export_fields = DEPOSIT_EXPORT_FIELDS
+    export_name = "deposits"
 
     def get_queryset(self):
         return super().get_queryset().filter(credit__seller=self.kwargs["seller_pk"])
 
+    def get_idempotency_queryset(self):
+        # Deposits are always made to the caller's own credit.
+        return Deposit.objects.filter(credit=get_principal(self.request).credit_id)
 
-class CreditViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
-    queryset = Credit.objects.prefetch_related("transaction_logs").all()
+    def get_permissions(self):
+        if self.action == "export":
+            return [IsAuthenticated(), IsOwnerOrAdmin()]
+        return super().get_permissions()
+
+
+class CreditViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
+    queryset = Credit.objects.prefetch_related("stripes").all()
     serializer_class = CreditSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.is_staff:
-            self.queryset = self.queryset.filter(seller=user.seller)
+        if self.action == "balance":
+            self.queryset = Credit.objects.all()
+
+        principal = get_principal(self.request)
+        if not principal.is_staff:
+            self.queryset = self.queryset.filter(id=principal.credit_id)
         return super().get_queryset()
 
+    def get_cache_seller_id(self):
+        principal = get_principal(self.request)
+        if principal.is_staff:
+            return None
+        if self.action == "list" or self.kwargs["pk"] == str(principal.credit_id):
+            return principal.seller_id
+        return None
 
-class CreditTransactionLogViewSet(ListModelMixin, GenericViewSet):
+    def get_serializer_class(self):
+        if self.action == "balance":
+            return CreditBalanceSerializer
+        return super().get_serializer_class()
+
+    @action(methods=["GET"], detail=True)
+    def balance(self, request, pk=None):
+        credit = self.get_object()
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        at = serializer.validated_data["at"]
+
+        serializer = self.get_serializer(
+            {
+                "credit": credit.id,
+                "at": at,
+                "balance": CreditTransactionLog.objects.balance_at(credit.id, at),
+            }
+        )
+        return Response(serializer.data)
+
+
+class CreditTransactionLogViewSet(
+    ReplicaReadMixin, AsyncReadMixin, ExportMixin, ListModelMixin, GenericViewSet
+):
     queryset = CreditTransactionLog.objects.all()
     serializer_class = CreditTransactionLogSerializer
     permission_classes = [IsAdminUser]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = LimitOffsetOrCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {"created_at": ["gte", "lt"]}
+    export_fields = TRANSACTION_LOG_EXPORT_FIELDS
+    export_name = "transaction_logs"
 
     def get_queryset(self):
         return super().get_queryset().filter(credit=self.kwargs["credit_pk"])
+
+
+class ExportViewSet(ExportMixin, GenericViewSet):
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {"created_at": ["gte", "lt"]}
+
+
+class SaleExportViewSet(ExportViewSet):
+    queryset = Sale.objects.all()
+    export_fields = SALE_EXPORT_FIELDS
+    export_name = "sales"
+
+
+class DepositExportViewSet(DepositApprovalMixin, ExportViewSet):
+    queryset = Deposit.objects.all()
+    export_fields = DEPOSIT_EXPORT_FIELDS
+    export_name = "deposits"
+
+
+class CreditTransactionLogExportViewSet(ExportViewSet):
+    queryset = CreditTransactionLog.objects.all()
+    export_fields = TRANSACTION_LOG_EXPORT_FIELDS
+    export_name = "transaction_logs"
@@ -0,0 +1,72 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from .exceptions import PasswordCheckUnavailable
+
+_pool = None
+_slots = None
+
+
+def get_workers():
+    # Every web process has its own pool, so together they get one process
+    # per CPU rather than one per CPU each.
+    processes = int(os.environ.get("WEB_CONCURRENCY", 1))
+    return settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 1) // processes)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=get_workers())
+    return _pool
+
+
+def get_slots():
+    global _slots
+    if _slots is None:
+        _slots = threading.BoundedSemaphore(settings.PASSWORD_CHECK_CONCURRENCY)
+    return _slots
+
+
+def hash_passwords(passwords):
+    passwords = list(passwords)
+    workers = get_workers()
+    if workers == 1 or len(passwords) < 2:
+        return [hashers.make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(get_pool().map(hashers.make_password, passwords, chunksize=chunksize))
+
+
+def verify_password(password, encoded):
+    is_correct = hashers.check_password(password, encoded)
+    must_update = False
+    if is_correct:
+        hasher = hashers.identify_hasher(encoded)
+        must_update = (
+            hasher.algorithm != hashers.get_hasher().algorithm
+            or hasher.must_update(encoded)
+        )
+    return is_correct, must_update
+
+
+def check_password(password, encoded):
+    """
+    Verify ``password`` and return ``(is_correct, must_update)``. Raises
+    PasswordCheckUnavailable instead of queueing when this process already has
+    PASSWORD_CHECK_CONCURRENCY checks in flight.
+    """
+    slots = get_slots()
+    if not slots.acquire(blocking=False):
+        raise PasswordCheckUnavailable
+
+    # The request would block on a pool anyway, and the hashers release the
+    # GIL, so the check runs on the request's own thread.
+    try:
+        return verify_password(password, encoded)
+    finally:
+        slots.release()
@@ -1,10 +1,13 @@
 from django.core import exceptions
+from django.db import IntegrityError, transaction
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 
+from .hashing import check_password
+
 User = get_user_model()
 
 
@@ -52,7 +55,7 @@ class LoginSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         try:
-            self.user = User.objects.get(email=value)
+            self.user = User.objects.select_related("auth_token").get(email=value)
         except User.DoesNotExist:
             raise serializers.ValidationError("No user with the given email was found.")
 
@@ -60,14 +63,26 @@ class LoginSerializer(serializers.Serializer):
 
     def validate_password(self, value):
         if self.user:
-            is_valid_password = self.user.check_password(value)
+            is_valid_password, must_update = check_password(value, self.user.password)
             if not is_valid_password:
                 raise serializers.ValidationError(
                     "Unable to log in with provided password."
                 )
 
+            if must_update:
+                self.user.set_password(value)
+                self.user.save(update_fields=["password"])
+
         return value
 
     def get_token(self, obj):
-        (token, created) = Token.objects.get_or_create(user=self.user)
-        return token.key
+        try:
+            return self.user.auth_token.key
+        except Token.DoesNotExist:
+            pass
+
+        try:
+            with transaction.atomic():
+                return Token.objects.create(user=self.user).key
+        except IntegrityError:
+            return Token.objects.get(user=self.user).key
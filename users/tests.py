@@ -1,3 +1,109 @@
-from django.test import TestCase
+import threading
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.urls import reverse
+from django.test import TestCase as BaseTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users import hashing
+
+User = get_user_model()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="seller@example.com", password="Kq7!vz0x"
+        )
+
+    def login(self, password="Kq7!vz0x"):
+        return self.client.post(
+            reverse("login"),
+            {"email": self.user.email, "password": password},
+            format="json",
+        )
+
+
+class TestLogin(TestCase):
+    def test_if_password_is_wrong_returns_400(self):
+        response = self.login("wrong")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("password", response.data)
+
+    def test_if_user_has_no_token_creates_one_returns_200(self):
+        response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["token"], Token.objects.get(user=self.user).key)
+
+    def test_if_user_has_token_reads_it_with_user_returns_200(self):
+        token = Token.objects.create(user=self.user)
+
+        with self.assertNumQueries(1):
+            response = self.login()
+
+        self.assertEqual(response.data["token"], token.key)
+
+    def test_if_password_checks_are_saturated_returns_429(self):
+        with patch.object(hashing, "_slots", threading.BoundedSemaphore(1)):
+            hashing.get_slots().acquire()
+            response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(PASSWORD_CHECK_CONCURRENCY=2, PASSWORD_HASH_WORKERS=8)
+    def test_if_concurrency_is_reached_sheds_logins_until_a_check_ends(self):
+        with patch.object(hashing, "_slots", None):
+            slots = hashing.get_slots()
+            slots.acquire()
+            slots.acquire()
+            shed = self.login()
+            slots.release()
+            response = self.login()
+
+        self.assertEqual(shed.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_hash_is_outdated_rehashes_password_returns_200(self):
+        self.user.password = PBKDF2PasswordHasher().encode(
+            "Kq7!vz0x", "salt", iterations=1000
+        )
+        self.user.save(update_fields=["password"])
+
+        response = self.login()
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("$1000$", self.user.password)
+        self.assertTrue(self.user.check_password("Kq7!vz0x"))
+
+
+class TestHashingPool(BaseTestCase):
+    def test_if_web_processes_share_cpus_each_pool_gets_its_share(self):
+        with patch("os.cpu_count", return_value=8), patch.dict(
+            "os.environ", {"WEB_CONCURRENCY": "3"}
+        ):
+            self.assertEqual(hashing.get_workers(), 2)
+
+    def test_if_web_processes_outnumber_cpus_each_pool_gets_one(self):
+        with patch("os.cpu_count", return_value=1), patch.dict(
+            "os.environ", {"WEB_CONCURRENCY": "3"}
+        ):
+            self.assertEqual(hashing.get_workers(), 1)
+
+    @override_settings(PASSWORD_HASH_WORKERS=8)
+    def test_if_concurrency_is_not_set_login_gate_ignores_the_pool_size(self):
+        with patch.object(hashing, "_slots", None):
+            slots = hashing.get_slots()
+            acquired = 0
+            while slots.acquire(blocking=False):
+                acquired += 1
+
+        self.assertEqual(acquired, 4)
@@ -8,13 +8,15 @@ from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
 from rest_framework.authtoken.models import Token
 
+from config.async_views import AsyncReadMixin
+
 from .serializers import UserSerializer, UserCreateSerializer, LoginSerializer
 from .pagination import DefaultLimitOffsetPagination
 
 User = get_user_model()
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(AsyncReadMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]